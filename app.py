@@ -1,13 +1,10 @@
-import threading
 import traceback
 import uuid
-import time
-from datetime import datetime
-from typing import Dict
+from datetime import datetime, timedelta
 from aiohttp import web
 from aiohttp.web import Request, Response, json_response
 from botbuilder.core.integration import aiohttp_error_middleware
-from botbuilder.schema import Activity, ActivityTypes, ConversationReference
+from botbuilder.schema import Activity, ActivityTypes
 from botbuilder.azure import CosmosDbStorage, CosmosDbConfig
 from dialogs import RemindersDialog
 from bots import ReminderBot
@@ -19,7 +16,17 @@ from botbuilder.core import (
     UserState,
     MemoryStorage,
 )
-from helpers import ReminderHelper
+from helpers import ReminderHelper, RecognizerCache, StateHelper
+from metrics import METRICS
+from scheduler import LeaseManager, ReminderScheduler, ProactiveDispatcher
+from storage import (
+    ConversationRegistry,
+    DispatchJournal,
+    InstrumentedStorage,
+    ReminderArchive,
+    SqliteStorage,
+    WriteBehindStorage,
+)
 
 from dotenv import load_dotenv
 
@@ -35,8 +42,17 @@ APP_ID = CONFIG.APP_ID if CONFIG.APP_ID else uuid.uuid4()
 SETTINGS = BotFrameworkAdapterSettings(CONFIG.APP_ID, CONFIG.APP_PASSWORD)
 ADAPTER = BotFrameworkAdapter(SETTINGS)
 
+TURNS = METRICS.counter("messages.turns")
+TURN_ERRORS = METRICS.counter("messages.errors")
+TURN_LATENCY = METRICS.histogram("messages.turn_latency")
+DISPATCH_DELIVERED = METRICS.counter("dispatch.delivered")
+DISPATCH_FAILED = METRICS.counter("dispatch.failed")
+DISPATCH_RETRIES = METRICS.counter("dispatch.retries")
+DISPATCH_LATENCY = METRICS.histogram("dispatch.latency")
+
 
 async def on_error(context: TurnContext, error: Exception):
+    TURN_ERRORS.inc()
     print(f"\n [on_turn_error] unhandled error: {error}")
     traceback.print_exc()
 
@@ -58,8 +74,10 @@ async def on_error(context: TurnContext, error: Exception):
 
 ADAPTER.on_turn_error = on_error
 
-if CONFIG.DEBUG:
-    MEMORY = MemoryStorage()
+if CONFIG.STORAGE == "memory":
+    BACKEND = MemoryStorage()
+elif CONFIG.STORAGE == "sqlite":
+    BACKEND = SqliteStorage(CONFIG.SQLITE_PATH, CONFIG.SQLITE_POOL_SIZE)
 else:
     cosmos_config = CosmosDbConfig(
         endpoint=CONFIG.COSMOSDB_SERVICE_ENDPOINT,
@@ -67,13 +85,101 @@ else:
         database=CONFIG.COSMOSDB_DATABASE_ID,
         container=CONFIG.COSMOSDB_CONTAINER_ID,
     )
-    MEMORY = CosmosDbStorage(cosmos_config)
+    BACKEND = CosmosDbStorage(cosmos_config)
+
+MEMORY = InstrumentedStorage(
+    BACKEND,
+    (
+        "RemindersState",
+        "TimezoneState",
+        "WelcomeUserState",
+        "DialogState",
+        "ActivityMappingState",
+    ),
+)
+
+if CONFIG.WRITE_BEHIND:
+    MEMORY = WriteBehindStorage(
+        MEMORY,
+        cache_size=CONFIG.STORAGE_CACHE_SIZE,
+        flush_interval=CONFIG.WRITE_BEHIND_FLUSH_INTERVAL,
+        max_batch_size=CONFIG.WRITE_BEHIND_BATCH_SIZE,
+    )
+
+# The conversation registry and scheduler leases rely on e_tag compare-and-swap,
+# which write-behind would defer.
+COORDINATION_STORAGE = (
+    MEMORY.storage if isinstance(MEMORY, WriteBehindStorage) else MEMORY
+)
 
 USER_STATE = UserState(MEMORY)
 CONVERSATION_STATE = ConversationState(MEMORY)
 ACCESSOR = USER_STATE.create_property("RemindersState")
-DIALOG = RemindersDialog(USER_STATE, CONVERSATION_STATE, ACCESSOR)
-CONVERSATION_REFERENCES: Dict[str, ConversationReference] = dict()
+CONVERSATION_REFERENCES = ConversationRegistry(
+    COORDINATION_STORAGE,
+    CONFIG.INSTANCE_ID,
+    CONFIG.INSTANCES,
+    CONFIG.CONVERSATION_SHARDS,
+)
+
+
+DISPATCHER = ProactiveDispatcher(
+    ADAPTER,
+    APP_ID,
+    concurrency=CONFIG.DISPATCH_CONCURRENCY,
+    channel_rate=CONFIG.DISPATCH_CHANNEL_RATE,
+    max_retries=CONFIG.DISPATCH_MAX_RETRIES,
+)
+
+
+async def _dispatch_due_reminders(due_reminders):
+    user_ids = dict.fromkeys(user_id for user_id, _ in due_reminders)
+    conversation_references = await CONVERSATION_REFERENCES.get_many(user_ids)
+    report = await DISPATCHER.dispatch(conversation_references, start_reminder)
+    DISPATCH_DELIVERED.inc(report.delivered)
+    DISPATCH_FAILED.inc(report.failed)
+    DISPATCH_RETRIES.inc(report.retries)
+    DISPATCH_LATENCY.observe(report.latency)
+    failed_users = {reference.user.id for reference in report.failed_references}
+    if failed_users:
+        await SCHEDULER.reschedule(
+            [entry for entry in due_reminders if entry[0] in failed_users],
+            CONFIG.DISPATCH_RETRY_DELAY,
+        )
+
+
+LEASES = (
+    LeaseManager(
+        COORDINATION_STORAGE,
+        CONVERSATION_REFERENCES,
+        CONFIG.LEASE_DURATION,
+        CONFIG.LEASE_RENEW_INTERVAL,
+    )
+    if len(CONFIG.INSTANCES) > 1
+    else None
+)
+SCHEDULER = ReminderScheduler(
+    _dispatch_due_reminders, MEMORY, ACCESSOR.name, leases=LEASES
+)
+ARCHIVE = ReminderArchive(
+    MEMORY,
+    max_reminders=CONFIG.ARCHIVE_MAX_REMINDERS,
+    max_age=timedelta(days=CONFIG.ARCHIVE_MAX_AGE_DAYS),
+)
+# Sent records must be durable, so the journal bypasses write-behind.
+JOURNAL = DispatchJournal(COORDINATION_STORAGE)
+RECOGNIZER_CACHE = RecognizerCache(
+    CONFIG.RECOGNIZER_CACHE_SIZE, CONFIG.RECOGNIZER_CACHE_TTL
+)
+DIALOG = RemindersDialog(
+    USER_STATE,
+    CONVERSATION_STATE,
+    ACCESSOR,
+    SCHEDULER,
+    RECOGNIZER_CACHE,
+    ARCHIVE,
+    CONFIG.SHOW_PAGE_SIZE,
+)
 
 BOT = ReminderBot(
     CONVERSATION_STATE, USER_STATE, DIALOG, CONVERSATION_REFERENCES, ACCESSOR
@@ -90,7 +196,11 @@ async def messages(req: Request) -> Response:
     auth_header = req.headers["Authorization"] if "Authorization" in req.headers else ""
 
     try:
-        response = await ADAPTER.process_activity(activity, auth_header, BOT.on_turn)
+        TURNS.inc()
+        with TURN_LATENCY.time():
+            response = await ADAPTER.process_activity(
+                activity, auth_header, BOT.on_turn
+            )
         if response:
             return json_response(data=response.body, status=response.status)
         return Response(status=201)
@@ -98,35 +208,73 @@ async def messages(req: Request) -> Response:
         raise exception
 
 
+async def metrics(req: Request) -> Response:  # pylint: disable=unused-argument
+    return json_response(METRICS.to_dict())
+
+
 async def notify(req: Request) -> Response:  # pylint: disable=unused-argument
-    await _send_proactive_message()
-    return Response(status=201, text="Proactive messages have been sent")
+    report = await _send_proactive_message()
+    return Response(status=201, text=f"Proactive messages have been sent: {report}")
 
 
 async def _send_proactive_message():
-    for conversation_reference in CONVERSATION_REFERENCES.values():
-        return await ADAPTER.continue_conversation(
-            conversation_reference, start_reminder, APP_ID,
+    return await DISPATCHER.dispatch(
+        await CONVERSATION_REFERENCES.owned_references(), start_reminder
+    )
+
+
+async def start_reminder(turn_context):
+    try:
+        await ReminderHelper.remind_user(
+            turn_context,
+            ACCESSOR,
+            ARCHIVE,
+            JOURNAL,
+            grace=timedelta(minutes=CONFIG.REMINDER_GRACE_MINUTES),
+            timezone_accessor=DIALOG.timezone_accessor,
+            scheduler=SCHEDULER,
         )
+    finally:
+        # Unsent reminders are put back on failure, so save either way.
+        await StateHelper.save_changes(turn_context, USER_STATE)
 
 
-def trigger_reminder():
-    while True:
-        requests.get(f"{CONFIG.APP_HOST_NAME}/api/notify")
-        time.sleep(1)
+async def start_storage(app: web.Application):
+    if isinstance(MEMORY, WriteBehindStorage):
+        MEMORY.start()
 
 
-async def start_reminder(turn_context):
-    return await ReminderHelper.remind_user(turn_context, ACCESSOR)
+async def stop_storage(app: web.Application):
+    if isinstance(MEMORY, WriteBehindStorage):
+        await MEMORY.stop()
+    if isinstance(BACKEND, SqliteStorage):
+        BACKEND.close()
+
+
+async def start_scheduler(app: web.Application):
+    await SCHEDULER.start()
+    await CONVERSATION_REFERENCES.load()
+    reconciled = await JOURNAL.reconcile(SCHEDULER.index.users.values(), ACCESSOR.name)
+    print(f"[DispatchJournal] reconciled {reconciled} delivered reminders")
+    if reconciled:
+        await SCHEDULER.rebuild()
+
+
+async def stop_scheduler(app: web.Application):
+    await SCHEDULER.stop()
 
 
 APP = web.Application(middlewares=[aiohttp_error_middleware])
 APP.router.add_post("/api/messages", messages)
 APP.router.add_get("/api/notify", notify)
+APP.router.add_get("/api/metrics", metrics)
+APP.on_startup.append(start_storage)
+APP.on_startup.append(start_scheduler)
+APP.on_cleanup.append(stop_scheduler)
+APP.on_cleanup.append(stop_storage)
 
 if __name__ == "__main__":
     try:
-        threading.Thread(target=trigger_reminder).start()
         web.run_app(APP, host="localhost", port=CONFIG.PORT)
     except Exception as error:
         raise error
@@ -0,0 +1,180 @@
+"""
+Compares building reminder and snooze cards with the precompiled templates in
+`resources.Cards` against the original dict-literal builders.
+
+    python -m benchmarks.card_benchmark --reminders 1000
+"""
+
+import argparse
+import timeit
+from datetime import datetime, timedelta
+import pytz
+from data_models import Reminder
+from resources import Cards
+
+
+class LegacyCards:
+    @staticmethod
+    def reminder_card(reminder: Reminder):
+        return {
+            "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
+            "type": "AdaptiveCard",
+            "version": "1.0",
+            "id": "",
+            "body": [
+                {
+                    "type": "TextBlock",
+                    "text": reminder.title,
+                    "size": "Large",
+                    "weight": "Bolder",
+                },
+                {
+                    "type": "TextBlock",
+                    "text": datetime.strftime(
+                        reminder.reminder_time, "%Y-%m-%d %I:%M %p"
+                    ),
+                    "isSubtle": True,
+                    "spacing": "None",
+                },
+            ],
+            "actions": [
+                {
+                    "type": "Action.Submit",
+                    "title": "Delete",
+                    "data": {"action": "delete", "reminder_id": "", "activity_id": ""},
+                }
+            ],
+        }
+
+    @staticmethod
+    def snooze_card(reminder: Reminder):
+        return {
+            "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
+            "type": "AdaptiveCard",
+            "version": "1.0",
+            "speak": "<s>Your  meeting about \"Adaptive Card design session\"<break strength='weak'/> is starting at 12:30pm</s><s>Do you want to snooze <break strength='weak'/> or do you want to send a late notification to the attendees?</s>",
+            "body": [
+                {
+                    "type": "ColumnSet",
+                    "columns": [
+                        {
+                            "type": "Column",
+                            "width": 50,
+                            "items": [
+                                {
+                                    "type": "TextBlock",
+                                    "text": (
+                                        reminder.title
+                                        if hasattr(reminder, "title")
+                                        else ""
+                                    ),
+                                    "size": "Large",
+                                    "weight": "Bolder",
+                                },
+                                {
+                                    "type": "TextBlock",
+                                    "text": (
+                                        datetime.strftime(
+                                            reminder.reminder_time, "%Y-%m-%d %I:%M %p"
+                                        )
+                                        if hasattr(reminder, "reminder_time")
+                                        else ""
+                                    ),
+                                    "isSubtle": True,
+                                    "spacing": "None",
+                                },
+                                {"type": "TextBlock", "text": "Snooze for"},
+                                {
+                                    "type": "Input.ChoiceSet",
+                                    "id": "snooze",
+                                    "value": "5 minutes",
+                                    "choices": [
+                                        {"title": "5 minutes", "value": "5 minutes"},
+                                        {"title": "10 minutes", "value": "10 minutes"},
+                                        {"title": "30 minutes", "value": "30 minutes"},
+                                    ],
+                                },
+                            ],
+                            "separator": True,
+                        },
+                        {
+                            "type": "Column",
+                            "width": "auto",
+                            "horizontalAlignment": "Center",
+                            "style": "default",
+                            "backgroundImage": {
+                                "url": "",
+                                "horizontalAlignment": "Center",
+                            },
+                            "verticalContentAlignment": "Center",
+                            "height": "stretch",
+                            "spacing": "None",
+                            "items": [
+                                {"type": "ImageSet"},
+                                {
+                                    "type": "Image",
+                                    "altText": "",
+                                    "url": "https://i.ibb.co/RvYB9Gc/bell-200-transparent.gif",
+                                },
+                            ],
+                        },
+                    ],
+                }
+            ],
+            "actions": [
+                {
+                    "type": "Action.Submit",
+                    "title": "Snooze",
+                    "data": {"action": "snooze", "reminder_id": reminder.id},
+                },
+                {
+                    "type": "Action.Submit",
+                    "title": "Dismiss",
+                    "data": {
+                        "action": "delete",
+                        "reminder_id": reminder.id,
+                        "activity_id": "",
+                    },
+                },
+            ],
+        }
+
+
+def make_reminders(count: int):
+    now = datetime.now(pytz.timezone("Africa/Nairobi"))
+    reminders = []
+    for index in range(count):
+        reminder = Reminder(f"Reminder number {index}")
+        reminder.reminder_time = now + timedelta(minutes=index)
+        reminders.append(reminder)
+    return reminders
+
+
+def measure(label: str, builder, reminders, number: int):
+    elapsed = timeit.timeit(
+        lambda: [builder(reminder) for reminder in reminders], number=number
+    )
+    per_card = elapsed / (number * len(reminders)) * 1_000_000
+    print(f"{label:<24} {per_card:>10.2f} us/card")
+    return per_card
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reminders", type=int, default=1000)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    reminders = make_reminders(args.reminders)
+    for name in ("reminder_card", "snooze_card"):
+        legacy = measure(
+            f"legacy {name}", getattr(LegacyCards, name), reminders, args.number
+        )
+        template = measure(
+            f"template {name}", getattr(Cards, name), reminders, args.number
+        )
+        print(f"templates take {template / legacy:.0%} of the legacy build time")
+
+
+if __name__ == "__main__":
+    main()
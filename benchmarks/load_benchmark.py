@@ -0,0 +1,260 @@
+"""
+Drives simulated users through the real bot stack: ReminderBot.on_turn on
+TestAdapters, the rule-based recognizer (optionally delayed to stand in for
+LUIS) and LatencyStorage, then dispatches the reminders through the
+ProactiveDispatcher as of a `now` past the last one and snoozes them. The
+dialogs themselves run on the system clock.
+
+    python -m benchmarks.load_benchmark --users 200 --reminders 3 --storage-latency 0.002
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Dict, List
+import jsonpickle
+import pytz
+from botbuilder.core import (
+    ConversationState,
+    MemoryStorage,
+    TurnContext,
+    UserState,
+)
+from botbuilder.core.adapters import TestAdapter
+from botbuilder.schema import (
+    Activity,
+    ActivityTypes,
+    ChannelAccount,
+    ConversationAccount,
+)
+from bots import ReminderBot
+from data_models import ReminderLog
+from dialogs import RemindersDialog
+from helpers import ReminderHelper
+from metrics import MetricsRegistry
+from recognizers import RuleBasedRecognizer
+from scheduler import ProactiveDispatcher, ReminderScheduler
+from storage import ConversationRegistry, InstrumentedStorage, LatencyStorage
+
+STATE_PROPERTIES = (
+    "RemindersState",
+    "WelcomeUserState",
+    "DialogState",
+    "ActivityMappingState",
+)
+
+
+class DelayedRecognizer(RuleBasedRecognizer):
+    """
+    Rule-based recognizer that waits `latency` seconds per call, like a
+    remote recognizer would.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        super(DelayedRecognizer, self).__init__()
+        self.latency = latency
+
+    async def recognize(self, turn_context: TurnContext):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await super(DelayedRecognizer, self).recognize(turn_context)
+
+
+class LoadReport:
+    def __init__(self, users: int):
+        self.users = users
+        self.turns = 0
+        self.turn_time = 0.0
+        self.latencies: List[float] = []
+        self.storage_ops = 0
+        self.writes: Dict[str, int] = {}
+        self.dispatched = 0
+        self.dispatch_time = 0.0
+        self.state_bytes = 0
+        self.heap_bytes = None
+
+    def percentile(self, quantile: float) -> float:
+        if not self.latencies:
+            return 0.0
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(quantile * len(latencies)))]
+
+    def __str__(self):
+        lines = [
+            f"users                {self.users}",
+            f"turns                {self.turns}",
+            f"turns/sec            {self.turns / self.turn_time:.1f}",
+            f"turn latency p50     {self.percentile(0.5) * 1000:.2f} ms",
+            f"turn latency p99     {self.percentile(0.99) * 1000:.2f} ms",
+            f"storage ops/turn     {self.storage_ops / self.turns:.2f}",
+            f"reminders dispatched {self.dispatched}",
+            f"dispatched/sec       {self.dispatched / self.dispatch_time:.1f}",
+            f"state bytes/user     {self.state_bytes / self.users:.0f}",
+        ]
+        for name, writes in sorted(self.writes.items()):
+            lines.append(f"writes/turn {name:<20} {writes / self.turns:.2f}")
+        if self.heap_bytes is not None:
+            lines.append(f"heap bytes/user      {self.heap_bytes / self.users:.0f}")
+        return "\n".join(lines)
+
+
+class LoadBenchmark:
+    def __init__(
+        self,
+        users: int,
+        reminders: int,
+        storage_latency: float = 0.0,
+        recognizer_latency: float = 0.0,
+    ):
+        self.users = users
+        self.reminders = reminders
+        self.memory = MemoryStorage()
+        self.backend = LatencyStorage(
+            self.memory, read_latency=storage_latency, write_latency=storage_latency
+        )
+        self.metrics = MetricsRegistry()
+        storage = InstrumentedStorage(self.backend, STATE_PROPERTIES, self.metrics)
+        self.user_state = UserState(storage)
+        self.conversation_state = ConversationState(storage)
+        self.accessor = self.user_state.create_property("RemindersState")
+        self.scheduler = ReminderScheduler(None)
+        self.registry = ConversationRegistry(MemoryStorage())
+        dialog = RemindersDialog(
+            self.user_state,
+            self.conversation_state,
+            self.accessor,
+            self.scheduler,
+            recognizer=DelayedRecognizer(recognizer_latency),
+        )
+        self.bot = ReminderBot(
+            self.conversation_state,
+            self.user_state,
+            dialog,
+            self.registry,
+            self.accessor,
+        )
+        self.adapters = [self._make_adapter(user) for user in range(users)]
+        self.dispatcher = ProactiveDispatcher(TestAdapter(), "bot")
+        self.report = LoadReport(users)
+
+    def _make_adapter(self, user: int) -> TestAdapter:
+        return TestAdapter(
+            self.bot.on_turn,
+            Activity(
+                channel_id="test",
+                service_url="https://test.com",
+                from_property=ChannelAccount(id=f"user-{user}", name=f"User {user}"),
+                recipient=ChannelAccount(id="bot", name="Bot"),
+                conversation=ConversationAccount(id=f"conversation-{user}"),
+            ),
+        )
+
+    async def run(self, trace_memory: bool = False) -> LoadReport:
+        if trace_memory:
+            tracemalloc.start()
+        start_time = datetime.now(pytz.utc)
+
+        await self._turns(self._create_and_show)
+        # Dispatch as of a time past the last reminder so everything is due.
+        await self._dispatch(start_time + timedelta(minutes=self.reminders + 1))
+        await self._turns(self._snooze_and_show)
+
+        if trace_memory:
+            self.report.heap_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+        self.report.state_bytes = sum(
+            len(jsonpickle.encode(document))
+            for key, document in self.memory.memory.items()
+            if "/users/" in key
+        )
+        return self.report
+
+    async def _turns(self, workload):
+        # Storage counts are taken around user turns only, not around dispatch.
+        storage_ops, writes = self._storage_counts()
+        start = time.perf_counter()
+        await asyncio.gather(*[workload(adapter) for adapter in self.adapters])
+        self.report.turn_time += time.perf_counter() - start
+        after_ops, after_writes = self._storage_counts()
+        self.report.storage_ops += after_ops - storage_ops
+        for name, count in after_writes.items():
+            self.report.writes[name] = (
+                self.report.writes.get(name, 0) + count - writes.get(name, 0)
+            )
+
+    def _storage_counts(self):
+        writes = {
+            name[len("storage.writes.") :]: metric.value
+            for name, metric in self.metrics.metrics.items()
+            if name.startswith("storage.writes.")
+        }
+        return self.backend.reads + self.backend.writes + self.backend.deletes, writes
+
+    async def _send(self, adapter: TestAdapter, user_says):
+        start = time.perf_counter()
+        await adapter.send(user_says)
+        self.report.latencies.append(time.perf_counter() - start)
+        self.report.turns += 1
+
+    async def _create_and_show(self, adapter: TestAdapter):
+        for index in range(self.reminders):
+            await self._send(
+                adapter, f"remind me to task {index} in {index + 1} minutes"
+            )
+        await self._send(adapter, "show reminders")
+
+    async def _snooze_and_show(self, adapter: TestAdapter):
+        key = f"test/users/{adapter.template.from_property.id}"
+        reminder_log: ReminderLog = (await self.memory.read([key]))[key][
+            "RemindersState"
+        ]
+        for reminder in reminder_log.old_reminders:
+            await self._send(
+                adapter,
+                Activity(
+                    type=ActivityTypes.message,
+                    value={
+                        "action": "snooze",
+                        "reminder_id": reminder.id,
+                        "snooze": "10 minutes",
+                    },
+                ),
+            )
+        await self._send(adapter, "show reminders")
+
+    async def _dispatch(self, now: datetime):
+        start = time.perf_counter()
+        due = await self.scheduler.pop_due(now.timestamp())
+        user_ids = dict.fromkeys(user_id for user_id, _ in due)
+        references = await self.registry.get_many(user_ids)
+
+        async def remind(turn_context: TurnContext):
+            try:
+                await ReminderHelper.remind_user(turn_context, self.accessor, now=now)
+            finally:
+                await self.user_state.save_changes(turn_context)
+
+        await self.dispatcher.dispatch(references, remind)
+        self.report.dispatched += len(due)
+        self.report.dispatch_time += time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--reminders", type=int, default=3)
+    parser.add_argument("--storage-latency", type=float, default=0.0)
+    parser.add_argument("--recognizer-latency", type=float, default=0.0)
+    parser.add_argument("--trace-memory", action="store_true")
+    args = parser.parse_args()
+
+    benchmark = LoadBenchmark(
+        args.users, args.reminders, args.storage_latency, args.recognizer_latency
+    )
+    print(asyncio.get_event_loop().run_until_complete(benchmark.run(args.trace_memory)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Replays a synthetic workload of reminders through ReminderScheduler on a
+VirtualClock, checks that every reminder is dispatched exactly once and
+reports the dispatch-lag distribution in simulated seconds.
+
+    python -m benchmarks.scheduler_simulation --reminders 1000000 --days 7
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime
+from typing import Dict, List, Set, Tuple
+import pytz
+from clock import VirtualClock
+from data_models import Reminder
+from helpers.reminder_helper import DISPATCH_LAG_BUCKETS
+from metrics import LatencyHistogram
+from scheduler import ReminderScheduler
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+
+
+class SimulationReport:
+    def __init__(self, reminders: int, days: float):
+        self.reminders = reminders
+        self.days = days
+        self.ticks = 0
+        self.delivered = 0
+        self.duplicates = 0
+        self.missed = 0
+        self.retries = 0
+        self.wall_time = 0.0
+        self.lags: List[float] = []
+        self.lag = LatencyHistogram(DISPATCH_LAG_BUCKETS)
+
+    def percentile(self, quantile: float) -> float:
+        if not self.lags:
+            return 0.0
+        return self.lags[min(len(self.lags) - 1, int(quantile * len(self.lags)))]
+
+    def __str__(self):
+        lines = [
+            f"reminders          {self.reminders}",
+            f"simulated days     {self.days:g}",
+            f"wall time          {self.wall_time:.2f} s"
+            f" ({self.days * SECONDS_PER_DAY / self.wall_time:.0f}x real time)",
+            f"ticks              {self.ticks}",
+            f"delivered          {self.delivered}",
+            f"duplicates         {self.duplicates}",
+            f"missed             {self.missed}",
+            f"retries            {self.retries}",
+            f"lag p50            {self.percentile(0.5):.3f} s",
+            f"lag p90            {self.percentile(0.9):.3f} s",
+            f"lag p99            {self.percentile(0.99):.3f} s",
+            f"lag max            {self.lags[-1] if self.lags else 0.0:.3f} s",
+        ]
+        for bucket, count in self.lag.to_dict()["buckets"].items():
+            lines.append(f"lag <= {bucket:<11} {count}")
+        return "\n".join(lines)
+
+
+class SchedulerSimulation:
+    """
+    Reminders are spread over `users` and `days`, with `burst_fraction` of
+    them due on the hour. Every tick advances the clock by the time the
+    dispatch would take: `dispatch_cost` seconds per `concurrency` reminders.
+    A `failure_rate` fraction of deliveries fails and is rescheduled after
+    `retry_delay` seconds.
+    """
+
+    def __init__(
+        self,
+        reminders: int,
+        users: int = 10000,
+        days: float = 1,
+        burst_fraction: float = 0.2,
+        dispatch_cost: float = 0.05,
+        concurrency: int = 100,
+        failure_rate: float = 0.0,
+        retry_delay: float = 60,
+        seed: int = 0,
+    ):
+        self.reminders = reminders
+        self.users = users
+        self.days = days
+        self.burst_fraction = burst_fraction
+        self.dispatch_cost = dispatch_cost
+        self.concurrency = concurrency
+        self.failure_rate = failure_rate
+        self.retry_delay = retry_delay
+        self.random = random.Random(seed)
+        self.start = datetime(2020, 1, 1, tzinfo=pytz.utc).timestamp()
+        self.clock = VirtualClock(self.start)
+        self.scheduler = ReminderScheduler(self._dispatch, clock=self.clock)
+        self.expected: Dict[str, int] = {}
+        self.delivered: Set[str] = set()
+        self.report = SimulationReport(reminders, days)
+
+    async def run(self) -> SimulationReport:
+        started = time.perf_counter()
+        await self._schedule_workload()
+        while True:
+            next_due = self.scheduler.next_due()
+            if next_due is None:
+                break
+            self.clock.advance_to(next_due)
+            await self.scheduler.tick()
+            self.report.ticks += 1
+        self.report.wall_time = time.perf_counter() - started
+
+        self.report.missed = len(self.expected.keys() - self.delivered)
+        self.report.lags.sort()
+        return self.report
+
+    async def _schedule_workload(self):
+        span = int(self.days * SECONDS_PER_DAY)
+        for index in range(self.reminders):
+            offset = self.random.randrange(1, span)
+            if self.random.random() < self.burst_fraction:
+                offset = max(SECONDS_PER_HOUR, offset - offset % SECONDS_PER_HOUR)
+            reminder = Reminder(f"Reminder {index}")
+            reminder.reminder_time = datetime.fromtimestamp(
+                self.start + offset, pytz.utc
+            )
+            self.expected[reminder.id] = int(self.start) + offset
+            await self.scheduler.schedule(
+                reminder, f"user-{self.random.randrange(self.users)}"
+            )
+
+    async def _dispatch(self, due: List[Tuple[str, str]]):
+        failed = []
+        for position, (user_id, reminder_id) in enumerate(due):
+            # Reminders go out `concurrency` at a time, each batch taking `dispatch_cost`.
+            sent_at = (
+                self.clock.time()
+                + (position // self.concurrency + 1) * self.dispatch_cost
+            )
+            if self.random.random() < self.failure_rate:
+                failed.append((user_id, reminder_id))
+                continue
+            if reminder_id in self.delivered:
+                self.report.duplicates += 1
+                continue
+            self.delivered.add(reminder_id)
+            lag = sent_at - self.expected[reminder_id]
+            self.report.lags.append(lag)
+            self.report.lag.observe(lag)
+            self.report.delivered += 1
+        self.clock.advance(-(-len(due) // self.concurrency) * self.dispatch_cost)
+        if failed:
+            self.report.retries += len(failed)
+            await self.scheduler.reschedule(failed, self.retry_delay)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reminders", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--burst-fraction", type=float, default=0.2)
+    parser.add_argument("--dispatch-cost", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--failure-rate", type=float, default=0.001)
+    parser.add_argument("--retry-delay", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    simulation = SchedulerSimulation(
+        args.reminders,
+        args.users,
+        args.days,
+        args.burst_fraction,
+        args.dispatch_cost,
+        args.concurrency,
+        args.failure_rate,
+        args.retry_delay,
+        args.seed,
+    )
+    print(asyncio.get_event_loop().run_until_complete(simulation.run()))
+
+
+if __name__ == "__main__":
+    main()
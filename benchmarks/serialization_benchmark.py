@@ -0,0 +1,71 @@
+"""
+Compares the size and (de)serialization time of ReminderLog documents in the
+legacy attribute-dict encoding and the compact versioned encoding.
+
+    python -m benchmarks.serialization_benchmark --reminders 200
+"""
+
+import argparse
+import timeit
+from datetime import datetime, timedelta
+import jsonpickle
+import pytz
+from data_models import Reminder, ReminderLog
+
+
+class LegacyReminder:
+    def __init__(self, reminder: Reminder):
+        self.title = reminder.title
+        self._reminder_time = reminder.reminder_time
+        self.done = reminder.done
+        self.id = reminder.id
+
+
+class LegacyReminderLog:
+    def __init__(self, reminder_log: ReminderLog):
+        self.new_reminders = [LegacyReminder(r) for r in reminder_log.new_reminders]
+        self.old_reminders = [LegacyReminder(r) for r in reminder_log.old_reminders]
+        self.e_tag = "*"
+
+
+def make_reminder_log(count: int) -> ReminderLog:
+    timezone = pytz.timezone("Africa/Nairobi")
+    now = datetime.now(timezone)
+    reminder_log = ReminderLog()
+    for index in range(count):
+        reminder = Reminder(f"Reminder number {index}")
+        reminder.reminder_time = now + timedelta(minutes=index)
+        if index % 2:
+            reminder.done = True
+            reminder_log.old_reminders.append(reminder)
+        else:
+            reminder_log.add(reminder)
+    return reminder_log
+
+
+def measure(label: str, document, number: int):
+    encoded = jsonpickle.encode(document)
+    encode_time = timeit.timeit(lambda: jsonpickle.encode(document), number=number)
+    decode_time = timeit.timeit(lambda: jsonpickle.decode(encoded), number=number)
+    print(
+        f"{label:<8} {len(encoded):>10} bytes"
+        f" {encode_time / number * 1000:>10.3f} ms encode"
+        f" {decode_time / number * 1000:>10.3f} ms decode"
+    )
+    return len(encoded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reminders", type=int, default=200)
+    parser.add_argument("--number", type=int, default=50)
+    args = parser.parse_args()
+
+    reminder_log = make_reminder_log(args.reminders)
+    legacy_size = measure("legacy", LegacyReminderLog(reminder_log), args.number)
+    compact_size = measure("compact", reminder_log, args.number)
+    print(f"compact documents are {compact_size / legacy_size:.0%} of legacy size")
+
+
+if __name__ == "__main__":
+    main()
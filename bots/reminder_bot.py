@@ -1,4 +1,3 @@
-from typing import Dict
 from botbuilder.core import (
     ActivityHandler,
     ConversationState,
@@ -6,9 +5,10 @@ from botbuilder.core import (
     TurnContext,
 )
 from botbuilder.dialogs import Dialog
-from helpers import DialogHelper, Messages
+from helpers import DialogHelper, Messages, StateHelper
 from data_models import WelcomeUserState
-from botbuilder.schema import Activity, ConversationReference
+from botbuilder.schema import Activity
+from storage import ConversationRegistry
 
 
 class ReminderBot(ActivityHandler):
@@ -17,7 +17,7 @@ class ReminderBot(ActivityHandler):
         conversation_state: ConversationState,
         user_state: UserState,
         dialog: Dialog,
-        conversation_references: Dict[str, ConversationReference],
+        conversation_references: ConversationRegistry,
         accessor,
     ):
         if conversation_state is None:
@@ -40,19 +40,23 @@ class ReminderBot(ActivityHandler):
     async def on_turn(self, turn_context: TurnContext):
         await super().on_turn(turn_context)
 
-        await self.conversation_state.save_changes(turn_context, False)
-        await self.user_state.save_changes(turn_context, False)
+        await StateHelper.save_changes(
+            turn_context, self.conversation_state, self.user_state
+        )
 
     async def on_message_activity(self, turn_context):
-        self._add_conversation_reference(turn_context.activity)
+        await self._add_conversation_reference(turn_context.activity)
         value = turn_context.activity.value
         if value:
             action = value.get("action")
             if action == "delete":
-                message = f"DELETE {value['reminder_id']}"
+                turn_context.activity.text = f"DELETE {value['reminder_id']}"
             elif action == "snooze":
-                message = f"UPDATE {value['reminder_id']} in {value['snooze']}"
-            turn_context.activity.text = message
+                turn_context.activity.text = (
+                    f"UPDATE {value['reminder_id']} in {value['snooze']}"
+                )
+            elif action == "page":
+                turn_context.activity.text = f"SHOW PAGE {value['page']}"
         return await DialogHelper.run_dialog(
             self.dialog,
             turn_context,
@@ -65,11 +69,11 @@ class ReminderBot(ActivityHandler):
                 await self._welcome_user(turn_context)
 
     async def on_conversation_update_activity(self, turn_context):
-        self._add_conversation_reference(turn_context.activity)
+        await self._add_conversation_reference(turn_context.activity)
         return await super().on_conversation_update_activity(turn_context)
 
     async def _welcome_user(self, turn_context: TurnContext):
-        self._add_conversation_reference(turn_context.activity)
+        await self._add_conversation_reference(turn_context.activity)
         welcome_user_state = await self.user_welcome_state_accessor.get(
             turn_context, WelcomeUserState
         )
@@ -81,8 +85,6 @@ class ReminderBot(ActivityHandler):
         else:
             await turn_context.send_activity(Messages.hello)
 
-    def _add_conversation_reference(self, activity: Activity):
+    async def _add_conversation_reference(self, activity: Activity):
         conversation_reference = TurnContext.get_conversation_reference(activity)
-        self.conversation_references[
-            conversation_reference.user.id
-        ] = conversation_reference
+        await self.conversation_references.add(conversation_reference)
@@ -0,0 +1,4 @@
+from .clock import Clock, SYSTEM_CLOCK
+from .virtual_clock import VirtualClock
+
+__all__ = ["Clock", "SYSTEM_CLOCK", "VirtualClock"]
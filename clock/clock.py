@@ -0,0 +1,41 @@
+"""
+Source of the current time for the scheduler, dialogs and data models
+"""
+
+import asyncio
+import time
+from datetime import datetime, tzinfo
+
+
+class Clock:
+    """
+    Wall-clock time. `now()` and `utcnow()` behave like their `datetime`
+    counterparts; VirtualClock overrides `time()` and the waits to run in
+    simulated time.
+    """
+
+    def time(self) -> float:
+        return time.time()
+
+    def now(self, tz: tzinfo = None) -> datetime:
+        return datetime.fromtimestamp(self.time(), tz)
+
+    def utcnow(self) -> datetime:
+        return datetime.utcfromtimestamp(self.time())
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+    async def wait(self, event: asyncio.Event, timeout: float = None) -> bool:
+        """
+        Waits until `event` is set or `timeout` seconds have passed, and
+        returns whether the event was set.
+        """
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+SYSTEM_CLOCK = Clock()
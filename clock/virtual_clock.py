@@ -0,0 +1,59 @@
+"""
+Manually advanced clock for tests and simulations
+"""
+
+import asyncio
+import heapq
+import itertools
+from typing import List, Tuple
+from .clock import Clock
+
+
+class VirtualClock(Clock):
+    """
+    Time only moves when `advance` or `advance_to` is called, which also
+    wakes the sleeps and waits whose deadline has been reached.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self._now = float(start)
+        self._timers: List[Tuple[float, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    def time(self) -> float:
+        return self._now
+
+    def advance(self, seconds: float):
+        self.advance_to(self._now + seconds)
+
+    def advance_to(self, timestamp: float):
+        self._now = max(self._now, float(timestamp))
+        while self._timers and self._timers[0][0] <= self._now:
+            future = heapq.heappop(self._timers)[2]
+            if not future.done():
+                future.set_result(None)
+
+    async def sleep(self, seconds: float):
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_event_loop().create_future()
+        heapq.heappush(
+            self._timers, (self._now + seconds, next(self._sequence), future)
+        )
+        await future
+
+    async def wait(self, event: asyncio.Event, timeout: float = None) -> bool:
+        if timeout is None:
+            await event.wait()
+            return True
+        waiter = asyncio.ensure_future(event.wait())
+        sleeper = asyncio.ensure_future(self.sleep(timeout))
+        try:
+            done, _ = await asyncio.wait(
+                (waiter, sleeper), return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            waiter.cancel()
+            sleeper.cancel()
+        return waiter in done
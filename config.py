@@ -3,10 +3,14 @@ import os
 class DefaultConfig:
     PORT = os.environ.get("PORT", "")
     APP_HOST_NAME = os.environ.get("HostName", "")
-    DEBUG = bool(os.environ.get("DEBUG", 'True'))
+    DEBUG = os.environ.get("DEBUG", "True").lower() in ("true", "1")
     APP_ID = os.environ.get("MicrosoftAppId", "")
     APP_PASSWORD = os.environ.get("MicrosoftAppPassword", "")
 
+    STORAGE = os.environ.get("STORAGE", "memory" if DEBUG else "cosmos").lower()
+    SQLITE_PATH = os.environ.get("SQLITE_PATH", "vk_reminder_bot.db")
+    SQLITE_POOL_SIZE = int(os.environ.get("SQLITE_POOL_SIZE", 4))
+
     COSMOSDB_SERVICE_ENDPOINT = os.environ.get("COSMOSDB_SERVICE_ENDPOINT", "")
     COSMOSDB_KEY = os.environ.get("COSMOSDB_KEY", "")
     COSMOSDB_DATABASE_ID = os.environ.get("COSMOSDB_DATABASE_ID", "")
@@ -14,3 +18,40 @@ class DefaultConfig:
     LUIS_APP_ID = os.environ.get("LuisAppId", "")
     LUIS_API_KEY = os.environ.get("LuisAPIKey", "")
     LUIS_API_HOST_NAME = os.environ.get("LuisAPIHostName", "")
+
+    INSTANCE_ID = os.environ.get("INSTANCE_ID", "default")
+    INSTANCES = [
+        instance
+        for instance in os.environ.get("INSTANCES", INSTANCE_ID).split(",")
+        if instance
+    ]
+    CONVERSATION_SHARDS = int(os.environ.get("CONVERSATION_SHARDS", 64))
+    LEASE_DURATION = float(os.environ.get("LEASE_DURATION", 30))
+    LEASE_RENEW_INTERVAL = float(os.environ.get("LEASE_RENEW_INTERVAL", 10))
+
+    DISPATCH_CONCURRENCY = int(os.environ.get("DISPATCH_CONCURRENCY", 100))
+    DISPATCH_CHANNEL_RATE = float(os.environ.get("DISPATCH_CHANNEL_RATE", 0))
+    DISPATCH_MAX_RETRIES = int(os.environ.get("DISPATCH_MAX_RETRIES", 3))
+    DISPATCH_RETRY_DELAY = float(os.environ.get("DISPATCH_RETRY_DELAY", 60))
+    REMINDER_GRACE_MINUTES = float(os.environ.get("REMINDER_GRACE_MINUTES", 5))
+
+    RECOGNIZER_CACHE_SIZE = int(os.environ.get("RECOGNIZER_CACHE_SIZE", 1024))
+    RECOGNIZER_CACHE_TTL = float(os.environ.get("RECOGNIZER_CACHE_TTL", 300))
+
+    SHOW_PAGE_SIZE = int(os.environ.get("SHOW_PAGE_SIZE", 10))
+
+    RECOGNIZER = os.environ.get("RECOGNIZER", "auto")
+    LUIS_LATENCY_BUDGET = float(os.environ.get("LUIS_LATENCY_BUDGET", 1.0))
+    LUIS_SLOW_CALL_THRESHOLD = float(os.environ.get("LUIS_SLOW_CALL_THRESHOLD", 0.5))
+    LUIS_BREAKER_FAILURES = int(os.environ.get("LUIS_BREAKER_FAILURES", 5))
+    LUIS_BREAKER_COOLDOWN = float(os.environ.get("LUIS_BREAKER_COOLDOWN", 30))
+
+    WRITE_BEHIND = os.environ.get("WRITE_BEHIND", "False").lower() in ("true", "1")
+    WRITE_BEHIND_FLUSH_INTERVAL = float(
+        os.environ.get("WRITE_BEHIND_FLUSH_INTERVAL", 0.5)
+    )
+    WRITE_BEHIND_BATCH_SIZE = int(os.environ.get("WRITE_BEHIND_BATCH_SIZE", 100))
+    STORAGE_CACHE_SIZE = int(os.environ.get("STORAGE_CACHE_SIZE", 10000))
+
+    ARCHIVE_MAX_REMINDERS = int(os.environ.get("ARCHIVE_MAX_REMINDERS", 50))
+    ARCHIVE_MAX_AGE_DAYS = float(os.environ.get("ARCHIVE_MAX_AGE_DAYS", 30))
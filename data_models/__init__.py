@@ -1,6 +1,15 @@
+from .recurrence_rule import RecurrenceRule
 from .reminder import Reminder
 from .reminder_log import ReminderLog
 from .welcome_user_state import WelcomeUserState
 from .activity_mapping_state import ActivityMappingState
+from .timezone_state import TimezoneState
 
-__all__ = ["Reminder", "ReminderLog", "WelcomeUserState", "ActivityMappingState"]
+__all__ = [
+    "RecurrenceRule",
+    "Reminder",
+    "ReminderLog",
+    "WelcomeUserState",
+    "ActivityMappingState",
+    "TimezoneState",
+]
@@ -1,3 +1,86 @@
+import time
+from collections import OrderedDict
+from metrics import METRICS
+from .reminder import SERIALIZATION_VERSION, _decode_id, _encode_id
+
+MAX_ACTIVITIES = 200
+MAX_AGE = 24 * 60 * 60
+EVICTIONS = METRICS.counter("activity_mapping.evictions")
+
+
 class ActivityMappingState:
+    """
+    Maps reminder ids to the id of the activity their card was sent in.
+
+    The mapping is an LRU bounded to `MAX_ACTIVITIES` entries, and entries not
+    touched for `MAX_AGE` seconds expire. It is persisted as a list of
+    [encoded reminder id, activity id, last used epoch seconds] in LRU order.
+    """
+
     def __init__(self):
-        self.activities = {}
+        self.activities = OrderedDict()
+        self.evictions = 0
+
+    def __getstate__(self):
+        return {
+            "v": SERIALIZATION_VERSION,
+            "a": [
+                [_encode_id(reminder_id), activity_id, used]
+                for reminder_id, (activity_id, used) in self.activities.items()
+            ],
+            "evictions": self.evictions,
+        }
+
+    def __setstate__(self, state):
+        if "v" not in state:
+            self.__dict__.update(state)
+            return
+        self.activities = OrderedDict(
+            (_decode_id(reminder_id), (activity_id, used))
+            for reminder_id, activity_id, used in state["a"]
+        )
+        self.evictions = state.get("evictions", 0)
+
+    def set(self, reminder_id: str, activity_id: str, now: float = None):
+        now = int(now if now is not None else time.time())
+        self.activities[reminder_id] = (activity_id, now)
+        self.activities.move_to_end(reminder_id)
+        self._evict(now)
+
+    def get(self, reminder_id: str, now: float = None) -> str:
+        now = int(now if now is not None else time.time())
+        self._evict(now)
+        entry = self.activities.get(reminder_id)
+        if entry is None:
+            return None
+        self.activities[reminder_id] = (entry[0], now)
+        self.activities.move_to_end(reminder_id)
+        return entry[0]
+
+    def pop(self, reminder_id: str, now: float = None) -> str:
+        self._evict(int(now if now is not None else time.time()))
+        entry = self.activities.pop(reminder_id, None)
+        return entry[0] if entry is not None else None
+
+    def is_referenced(self, activity_id: str, now: float = None) -> bool:
+        self._evict(int(now if now is not None else time.time()))
+        return any(entry[0] == activity_id for entry in self.activities.values())
+
+    def _evict(self, now: int):
+        if not isinstance(self.activities, OrderedDict):
+            # Documents written before the bounded mapping hold a plain dict.
+            self.activities = OrderedDict(
+                (reminder_id, (activity_id, now))
+                for reminder_id, activity_id in self.activities.items()
+            )
+            self.evictions = 0
+        evicted = 0
+        while self.activities:
+            reminder_id, (_, used) = next(iter(self.activities.items()))
+            if len(self.activities) <= MAX_ACTIVITIES and now - used <= MAX_AGE:
+                break
+            del self.activities[reminder_id]
+            evicted += 1
+        if evicted:
+            self.evictions += evicted
+            EVICTIONS.inc(evicted)
@@ -0,0 +1,198 @@
+"""
+Recurrence of a reminder as a cron expression in the user's timezone
+"""
+
+import re
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Iterable, List, Optional
+import pytz
+
+DEFAULT_TIMEZONE = "Africa/Nairobi"
+WEEKDAY_NAMES = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+# A rule for 29 February can go eight years without firing (e.g. 2096 to 2104).
+MAX_SEARCH_DAYS = 8 * 366
+SET_TIMEX_PATTERN = re.compile(
+    r"^(?:XXXX-WXX-(?P<weekday>[1-7])|XXXX-XX-(?P<day>\d{2}))?"
+    r"(?:T(?P<hour>\d{2})(?::(?P<minute>\d{2}))?)?$"
+)
+
+
+class RecurrenceRule:
+    """
+    A standard five-field cron expression (minute, hour, day of month, month,
+    day of week, with Sunday as 0 or 7) evaluated in `timezone`.
+
+    Only the next occurrence of a recurring reminder is ever stored; it is
+    computed with `next_after` when the previous one is dispatched.
+    """
+
+    def __init__(self, expression: str, timezone: str = None):
+        _parse(expression)
+        self.expression = " ".join(expression.split())
+        self.timezone = timezone
+
+    @staticmethod
+    def daily(hour: int, minute: int = 0) -> "RecurrenceRule":
+        return RecurrenceRule(f"{minute} {hour} * * *")
+
+    @staticmethod
+    def weekdays(hour: int, minute: int = 0) -> "RecurrenceRule":
+        return RecurrenceRule(f"{minute} {hour} * * 1-5")
+
+    @staticmethod
+    def weekly(days: Iterable[int], hour: int, minute: int = 0) -> "RecurrenceRule":
+        """
+        `days` are cron weekdays, 0 (Sunday) to 6 (Saturday).
+        """
+        return RecurrenceRule(
+            f"{minute} {hour} * * {','.join(str(day) for day in sorted(set(days)))}"
+        )
+
+    @staticmethod
+    def monthly(day: int, hour: int, minute: int = 0) -> "RecurrenceRule":
+        return RecurrenceRule(f"{minute} {hour} {day} * *")
+
+    @staticmethod
+    def from_timex(timexes: Iterable[str]) -> Optional["RecurrenceRule"]:
+        """
+        Builds a rule from the timex values of LUIS `set` datetime entities and
+        the times and dates that accompany them, e.g. "XXXX-WXX-1T09" (every
+        Monday at 9), "P1D" with "T07", or "P1M" with "XXXX-XX-15T10".
+        """
+        timexes = list(timexes)
+        weekdays, days, hour, minute = set(), set(), None, 0
+        for timex in timexes:
+            match = SET_TIMEX_PATTERN.match(timex)
+            if match is None:
+                continue
+            if match.group("weekday"):
+                weekdays.add(int(match.group("weekday")) % 7)
+            if match.group("day"):
+                days.add(int(match.group("day")))
+            if match.group("hour") and hour is None:
+                hour = int(match.group("hour"))
+                minute = int(match.group("minute") or 0)
+        if hour is None:
+            hour = 9
+        if weekdays:
+            return RecurrenceRule.weekly(weekdays, hour, minute)
+        if days:
+            return RecurrenceRule(
+                f"{minute} {hour} {','.join(str(day) for day in sorted(days))} * *"
+            )
+        if "P1D" in timexes:
+            return RecurrenceRule.daily(hour, minute)
+        return None
+
+    def to_compact(self) -> list:
+        return [self.expression, self.timezone]
+
+    @classmethod
+    def from_compact(cls, values: list) -> "RecurrenceRule":
+        expression, timezone = values
+        return cls(expression, timezone)
+
+    def next_after(self, after: float) -> Optional[int]:
+        """
+        Returns the first occurrence strictly after epoch seconds `after`, as
+        epoch seconds, or None when the rule never fires again.
+        """
+        minutes, hours, days, months, weekdays, any_day, any_weekday = _parse(
+            self.expression
+        )
+        timezone = pytz.timezone(self.timezone or DEFAULT_TIMEZONE)
+        start = datetime.fromtimestamp(after, timezone).date()
+        for offset in range(MAX_SEARCH_DAYS):
+            day = start + timedelta(days=offset)
+            if day.month not in months:
+                continue
+            in_month, in_week = day.day in days, (day.weekday() + 1) % 7 in weekdays
+            # As in cron, a day matches either restricted day field.
+            if not any_day and not any_weekday:
+                matches = in_month or in_week
+            else:
+                matches = in_month and in_week
+            if not matches:
+                continue
+            for hour in hours:
+                for minute in minutes:
+                    due = _timestamp(timezone, day, hour, minute)
+                    if due > after:
+                        return due
+        return None
+
+    def describe(self) -> str:
+        minutes, hours, days, months, weekdays, any_day, any_weekday = _parse(
+            self.expression
+        )
+        if len(minutes) == 1 and len(hours) == 1 and any_day and len(months) == 12:
+            at = f"at {hours[0]:02d}:{minutes[0]:02d}"
+            if any_weekday:
+                return f"daily {at}"
+            if weekdays == frozenset(range(1, 6)):
+                return f"weekdays {at}"
+            names = ", ".join(
+                WEEKDAY_NAMES[day].title()
+                for day in sorted(weekdays, key=_monday_first)
+            )
+            return f"every {names} {at}"
+        if len(minutes) == 1 and len(hours) == 1 and any_weekday and len(months) == 12:
+            ordinals = ", ".join(str(day) for day in sorted(days))
+            return f"monthly on day {ordinals} at {hours[0]:02d}:{minutes[0]:02d}"
+        return f"cron {self.expression}"
+
+
+def _monday_first(weekday: int) -> int:
+    return (weekday - 1) % 7
+
+
+def _timestamp(timezone, day: date, hour: int, minute: int) -> int:
+    return int(timezone.localize(datetime.combine(day, time(hour, minute))).timestamp())
+
+
+@lru_cache(maxsize=1024)
+def _parse(expression: str):
+    fields = expression.split()
+    if len(fields) != 5:
+        raise ValueError(f"Expected 5 cron fields, got {expression!r}")
+    values: List[frozenset] = [
+        _parse_field(field, low, high)
+        for field, (low, high) in zip(fields, FIELD_RANGES)
+    ]
+    minutes, hours, days, months, weekdays = values
+    weekdays = frozenset(day % 7 for day in weekdays)
+    return (
+        sorted(minutes),
+        sorted(hours),
+        days,
+        months,
+        weekdays,
+        fields[2] == "*",
+        fields[4] == "*",
+    )
+
+
+def _parse_field(field: str, low: int, high: int) -> frozenset:
+    values = set()
+    for part in field.lower().split(","):
+        part, _, step = part.partition("/")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (_parse_value(value) for value in part.split("-", 1))
+        else:
+            start = end = _parse_value(part)
+        if step and "-" not in part and part != "*":
+            end = high
+        if not low <= start <= end <= high:
+            raise ValueError(f"Cron field {field!r} is outside {low}-{high}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return frozenset(values)
+
+
+def _parse_value(value: str) -> int:
+    if value[:3] in WEEKDAY_NAMES:
+        return WEEKDAY_NAMES.index(value[:3])
+    return int(value)
@@ -2,43 +2,140 @@
 Create a reminder store item
 """
 
+import base64
 import uuid
-from datetime import datetime
+from datetime import datetime, tzinfo
 import pytz
-from botbuilder.core import StoreItem
+from clock import SYSTEM_CLOCK
+from .recurrence_rule import RecurrenceRule
 
+ID_PREFIX = "Reminder-"
+SERIALIZATION_VERSION = 1
+DEFAULT_TIMEZONE = pytz.timezone("Africa/Nairobi")
+
+
+class Reminder:
+    """
+    Reminders keep their due time as UTC epoch seconds in `due`, so that
+    comparing, sorting and indexing them are integer operations; they are
+    converted to a user's local time only for display.
+
+    Reminders are persisted inside a ReminderLog using a compact, versioned
+    encoding: [id, title, epoch seconds, done], where ids of the form
+    "Reminder-<uuid>" are stored as the base64 of the UUID bytes. Recurring
+    reminders append their RecurrenceRule and keep only the next occurrence
+    in `due`.
+    """
+
+    __slots__ = ("title", "due", "done", "id", "recurrence")
+
+    # Resolves "HH:MM" reminder times to today; replaced in simulations.
+    clock = SYSTEM_CLOCK
 
-class Reminder(StoreItem):
     def __init__(self, title: str = None, reminder_time: str = None, done=False):
         """
         Creates a reminder store item
         """
-        super(Reminder, self).__init__()
         self.title: str = title
-        self.reminder_time: str = reminder_time
+        self.due: int = None
+        self.reminder_time = reminder_time
         self.done = done
-        self.id = "Reminder-" + str(uuid.uuid4())
+        self.id = self.new_id()
+        self.recurrence: RecurrenceRule = None
+
+    @staticmethod
+    def new_id() -> str:
+        return ID_PREFIX + str(uuid.uuid4())
+
+    def __getstate__(self):
+        return {"v": SERIALIZATION_VERSION, "r": self.to_compact()}
+
+    def __setstate__(self, state):
+        if "v" in state:
+            self._restore_compact(state["r"])
+        else:
+            # Documents written before the compact encoding hold the raw attributes.
+            self.title = state.get("title")
+            self.reminder_time = state.get("_reminder_time")
+            self.done = state.get("done", False)
+            self.id = state.get("id")
+            self.recurrence = None
+
+    def to_compact(self) -> list:
+        values = [_encode_id(self.id), self.title, self.due, int(bool(self.done))]
+        recurrence = self.get_recurrence()
+        if recurrence is not None:
+            values.append(recurrence.to_compact())
+        return values
+
+    @classmethod
+    def from_compact(cls, values: list) -> "Reminder":
+        reminder = cls.__new__(cls)
+        reminder._restore_compact(values)
+        return reminder
+
+    def _restore_compact(self, values: list):
+        encoded_id, self.title, self.due, done = values[:4]
+        self.id = _decode_id(encoded_id)
+        self.done = bool(done)
+        self.recurrence = (
+            RecurrenceRule.from_compact(values[4]) if len(values) > 4 else None
+        )
+
+    def get_recurrence(self) -> RecurrenceRule:
+        # Legacy documents are restored attribute by attribute and lack the slot.
+        return getattr(self, "recurrence", None)
+
+    def advance(self, now: float) -> bool:
+        """
+        Moves a recurring reminder to its first occurrence after both its
+        current one and `now`, so that occurrences missed during downtime are
+        skipped rather than replayed. Returns False when there is none.
+        """
+        recurrence = self.get_recurrence()
+        if recurrence is None:
+            return False
+        due = recurrence.next_after(max(self.due or 0, now))
+        if due is None:
+            return False
+        self.due = due
+        self.done = False
+        return True
 
     def __lt__(self, other):
-        return self.reminder_time > other.reminder_time
+        return self.due < other.due
 
     @property
-    def reminder_time(self):
-        return self._reminder_time
+    def reminder_time(self) -> datetime:
+        return self.local_time()
 
     @reminder_time.setter
     def reminder_time(self, reminder_time):
-        self._reminder_time = self._validate_time(reminder_time)
+        if isinstance(reminder_time, str):
+            reminder_time = self.parse_time(reminder_time)
+        self.due = int(reminder_time.timestamp()) if reminder_time else None
 
-    def _validate_time(self, reminder_time=None):
-        if not reminder_time or not isinstance(reminder_time, str):
-            return reminder_time
+    # Legacy documents restored attribute by attribute set the old slot name.
+    _reminder_time = reminder_time
+
+    def local_time(self, timezone: tzinfo = None) -> datetime:
+        if self.due is None:
+            return None
+        return datetime.fromtimestamp(self.due, timezone or DEFAULT_TIMEZONE)
+
+    @classmethod
+    def parse_time(cls, reminder_time: str, timezone: tzinfo = None) -> datetime:
+        """
+        Parses "HH:MM" (today), "YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS" in
+        `timezone`.
+        """
         try:
             ptime = None
             if ":" in reminder_time and reminder_time.index(":") == 2:
                 t = reminder_time.split(":")
-                ptime = datetime.now().replace(
-                    hour=int(t[0]), minute=int(t[1]), second=0
+                today = cls.clock.now(timezone or DEFAULT_TIMEZONE)
+                ptime = today.replace(
+                    hour=int(t[0]), minute=int(t[1]), second=0, tzinfo=None
                 )
             elif ":" not in reminder_time:
                 ptime = datetime.strptime(reminder_time, "%Y-%m-%d").replace(
@@ -46,11 +143,23 @@ class Reminder(StoreItem):
                 )
             elif reminder_time.index("-") == 4:
                 ptime = datetime.strptime(reminder_time, "%Y-%m-%d %H:%M:%S")
-            return self.__datetime_from_utc_to_local(ptime)
+            return (timezone or DEFAULT_TIMEZONE).localize(ptime)
         except Exception as exception:
             print("Exception occured while Validating Time:", str(exception))
 
-    def __datetime_from_utc_to_local(self, utc_datetime):
-        timezone = pytz.timezone("Africa/Nairobi")
-        result = timezone.localize(utc_datetime)
-        return result
+
+def _encode_id(reminder_id: str) -> str:
+    if reminder_id and reminder_id.startswith(ID_PREFIX):
+        try:
+            raw = uuid.UUID(reminder_id[len(ID_PREFIX) :]).bytes
+            return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+        except ValueError:
+            pass
+    return "=" + reminder_id if reminder_id is not None else None
+
+
+def _decode_id(encoded_id: str) -> str:
+    if encoded_id is None or encoded_id.startswith("="):
+        return encoded_id[1:] if encoded_id else encoded_id
+    raw = base64.urlsafe_b64decode(encoded_id + "==")
+    return ID_PREFIX + str(uuid.UUID(bytes=raw))
@@ -1,9 +1,17 @@
+import heapq
+from datetime import datetime
+from typing import List, Union
 from botbuilder.core import StoreItem
+from .reminder import Reminder, SERIALIZATION_VERSION
+
+HEAP_VERSION = 1
 
 
 class ReminderLog(StoreItem):
     """
     Class for storing a log of reminder objects.
+
+    `new_reminders` is kept as a min-heap ordered by reminder time.
     """
 
     def __init__(self):
@@ -11,3 +19,76 @@ class ReminderLog(StoreItem):
         self.new_reminders = []
         self.old_reminders = []
         self.e_tag = "*"
+        self.heap_version = HEAP_VERSION
+
+    def __getstate__(self):
+        state = {
+            "v": SERIALIZATION_VERSION,
+            "new": [reminder.to_compact() for reminder in self.new_reminders],
+            "old": [reminder.to_compact() for reminder in self.old_reminders],
+            "heap": getattr(self, "heap_version", None),
+        }
+        if hasattr(self, "e_tag"):
+            state["e_tag"] = self.e_tag
+        return state
+
+    def __setstate__(self, state):
+        if "v" not in state:
+            # Documents written before the compact encoding hold the raw attributes.
+            self.__dict__.update(state)
+            return
+        self.new_reminders = [Reminder.from_compact(values) for values in state["new"]]
+        self.old_reminders = [Reminder.from_compact(values) for values in state["old"]]
+        if state.get("heap") is not None:
+            self.heap_version = state["heap"]
+        if "e_tag" in state:
+            self.e_tag = state["e_tag"]
+
+    def add(self, reminder: Reminder):
+        self._ensure_heap()
+        heapq.heappush(self.new_reminders, reminder)
+
+    def peek(self) -> Reminder:
+        self._ensure_heap()
+        return self.new_reminders[0] if self.new_reminders else None
+
+    @property
+    def next_due_time(self) -> datetime:
+        reminder = self.peek()
+        return reminder.reminder_time if reminder else None
+
+    def pop(self) -> Reminder:
+        self._ensure_heap()
+        return heapq.heappop(self.new_reminders)
+
+    def pop_due(self, now: Union[datetime, float]) -> List[Reminder]:
+        """
+        Removes and returns, in order, every pending reminder due at or before
+        `now`, a datetime or epoch seconds.
+        """
+        if isinstance(now, datetime):
+            now = now.timestamp()
+        due = []
+        while self.new_reminders and self.peek().due <= now:
+            due.append(self.pop())
+        return due
+
+    def remove(self, reminder_id: str) -> Reminder:
+        """
+        Removes the pending or completed reminder with `reminder_id` and returns it.
+        """
+        for index, reminder in enumerate(self.new_reminders):
+            if reminder.id == reminder_id:
+                self.new_reminders.pop(index)
+                heapq.heapify(self.new_reminders)
+                return reminder
+        for index, reminder in enumerate(self.old_reminders):
+            if reminder.id == reminder_id:
+                return self.old_reminders.pop(index)
+        return None
+
+    def _ensure_heap(self):
+        # Logs persisted before the heap ordering was introduced are unsorted.
+        if getattr(self, "heap_version", None) != HEAP_VERSION:
+            heapq.heapify(self.new_reminders)
+            self.heap_version = HEAP_VERSION
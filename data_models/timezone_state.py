@@ -0,0 +1,3 @@
+class TimezoneState:
+    def __init__(self, timezone: str = None):
+        self.timezone = timezone
@@ -10,6 +10,7 @@ from botbuilder.dialogs import (
 from botbuilder.schema import Activity, ActivityTypes, InputHints
 from botbuilder.core import MessageFactory, CardFactory
 from resources import Cards
+from helpers import Messages
 
 
 class CancelAndHelpDialog(ComponentDialog):
@@ -28,14 +29,14 @@ class CancelAndHelpDialog(ComponentDialog):
             text = inner_dc.context.activity.text.lower()
             help_message = Activity(
                 type=ActivityTypes.message,
-                attachments=[CardFactory.adaptive_card(Cards.help_card)],
+                attachments=[CardFactory.adaptive_card(Cards.help_card())],
             )
 
             if text in ("help", "?"):
                 await inner_dc.context.send_activity(help_message)
                 return DialogTurnResult(DialogTurnStatus.Waiting)
 
-            cancel_message_text = "Cancelled."
+            cancel_message_text = Messages.cancelled
             cancel_message = MessageFactory.text(
                 cancel_message_text, cancel_message_text, InputHints.ignoring_input
             )
@@ -1,4 +1,4 @@
-from datetime import datetime
+import math
 import pytz
 from botbuilder.core import (
     MessageFactory,
@@ -21,14 +21,24 @@ from botbuilder.dialogs.prompts import (
 from botbuilder.schema import (
     ActivityTypes,
     Activity,
+    AttachmentLayoutTypes,
     CardAction,
     ActionTypes,
     SuggestedActions,
 )
-from data_models import Reminder, ActivityMappingState, ReminderLog
+from clock import Clock, SYSTEM_CLOCK
+from data_models import Reminder, ActivityMappingState, ReminderLog, TimezoneState
 from resources import Cards
-from helpers import LuisHelper, Intent, Messages
-from recognizers import ReminderRecognizer
+from helpers import (
+    DatetimeHelper,
+    LuisHelper,
+    CommandRouter,
+    Intent,
+    Messages,
+    RecognizerCache,
+    TimezoneHelper,
+)
+from recognizers import create_recognizer
 from .cancel_and_help_dialog import CancelAndHelpDialog
 
 
@@ -38,6 +48,12 @@ class RemindersDialog(CancelAndHelpDialog):
         user_state: UserState,
         conversation_state: ConversationState,
         reminders_accessor,
+        scheduler=None,
+        recognizer_cache: RecognizerCache = None,
+        archive=None,
+        page_size: int = 10,
+        recognizer=None,
+        clock: Clock = SYSTEM_CLOCK,
     ):
         super(RemindersDialog, self).__init__(RemindersDialog.__name__)
 
@@ -48,6 +64,12 @@ class RemindersDialog(CancelAndHelpDialog):
             "ActivityMappingState"
         )
         self.reminders_accessor = reminders_accessor
+        self.timezone_accessor = self.user_state.create_property("TimezoneState")
+        self.scheduler = scheduler
+        self.recognizer_cache = recognizer_cache
+        self.archive = archive
+        self.page_size = page_size
+        self.clock = clock
         self.add_dialog(TextPrompt(TextPrompt.__name__))
         self.add_dialog(DateTimePrompt(DateTimePrompt.__name__))
         self.add_dialog(ConfirmPrompt(ConfirmPrompt.__name__))
@@ -64,26 +86,34 @@ class RemindersDialog(CancelAndHelpDialog):
         )
 
         self.initial_dialog_id = "WFDialog"
-        self.recognizer = ReminderRecognizer()
+        self.recognizer = recognizer if recognizer is not None else create_recognizer()
 
     async def choice_step(self, step_context: WaterfallStepContext) -> DialogTurnResult:
-        intent, recognizer_result = await LuisHelper.execute_luis_query(
-            self.recognizer, step_context.context
+        # Picks up the timezone the channel reports on the user's first message,
+        # before the recognizer resolves clock times in it.
+        await TimezoneHelper.resolve(step_context.context, self.timezone_accessor)
+        routed = CommandRouter.route(
+            step_context.context.activity.text, self.clock.now(pytz.utc)
         )
+        if routed is not None:
+            intent, recognizer_result = routed
+        else:
+            intent, recognizer_result = await LuisHelper.execute_luis_query(
+                self.recognizer,
+                step_context.context,
+                self.recognizer_cache,
+                self.clock,
+            )
         step_context.values[self.REMINDER] = recognizer_result
-        text = (
-            step_context.context.activity.text
-            if step_context.context.activity.text
-            else ""
-        ).lower()
         if intent == Intent.SNOOZE_REMINDER.value:
             await self._snooze_reminder(step_context.context, recognizer_result)
             return await step_context.end_dialog()
-        elif text.startswith("delete"):
+        elif intent == Intent.DELETE_REMINDER.value:
             await self._delete_reminder(step_context.context)
             return await step_context.end_dialog()
-        elif text.startswith("show"):
-            await self._show_reminders(step_context.context)
+        elif intent == Intent.SHOW_REMINDERS.value:
+            page = recognizer_result if isinstance(recognizer_result, int) else 0
+            await self._show_reminders(step_context.context, page)
             return await step_context.end_dialog()
 
         elif intent == Intent.CREATE_REMINDER.value:
@@ -96,6 +126,12 @@ class RemindersDialog(CancelAndHelpDialog):
             )
             await step_context.context.send_activity(message)
             return await step_context.end_dialog()
+        elif intent == Intent.SET_TIMEZONE.value:
+            await self._set_timezone(step_context.context, recognizer_result)
+            return await step_context.end_dialog()
+        elif intent == Intent.CANCEL.value:
+            await step_context.context.send_activity(Messages.cancelled)
+            return await step_context.end_dialog()
         else:
             await step_context.context.send_activity(Messages.missed)
             await self._send_suggested_actions(step_context.context)
@@ -118,7 +154,13 @@ class RemindersDialog(CancelAndHelpDialog):
         reminder = step_context.values[self.REMINDER]
         if step_context.result:
             reminder.title = step_context.result.title()
-        if not reminder.reminder_time:
+        if reminder.recurrence is not None:
+            timezone = await TimezoneHelper.resolve(
+                step_context.context, self.timezone_accessor
+            )
+            reminder.recurrence.timezone = timezone.zone
+            reminder.due = reminder.recurrence.next_after(self.clock.time())
+        if reminder.due is None:
             prompt_options = PromptOptions(
                 prompt=MessageFactory.text(Messages.get_time),
                 retry_prompt=MessageFactory.text(Messages.time_retry),
@@ -131,19 +173,30 @@ class RemindersDialog(CancelAndHelpDialog):
         self, step_context: WaterfallStepContext
     ) -> DialogTurnResult:
         reminder: Reminder = step_context.values[self.REMINDER]
-        reminder.reminder_time = (
-            step_context.result[0].value
-            if not reminder.reminder_time
-            else reminder.reminder_time
+        timezone = await TimezoneHelper.resolve(
+            step_context.context, self.timezone_accessor
         )
+        if reminder.due is None:
+            # DateTimePrompt resolves relative times against the server's
+            # clock, so the answer is resolved again against the user's.
+            datetime_entities = DatetimeHelper.resolve_datetime_entities(
+                step_context.context.activity.text,
+                self.clock.now(timezone).replace(tzinfo=None),
+            )
+            if datetime_entities:
+                reminder.reminder_time = DatetimeHelper.format_datetime(
+                    datetime_entities[0]["timex"][0], timezone
+                )
+            else:
+                reminder.reminder_time = Reminder.parse_time(
+                    step_context.result[0].value, timezone
+                )
 
-        if reminder.reminder_time < datetime.now().astimezone(
-            pytz.timezone("Africa/Nairobi")
-        ):
+        if reminder.due < self.clock.time():
             await step_context.context.send_activity(Messages.bad_time)
             return await step_context.end_dialog()
         await step_context.context.send_activity(Messages.done)
-        reminder_card = Cards.reminder_card(reminder)
+        reminder_card = Cards.reminder_card(reminder, timezone)
         await step_context.context.send_activity(
             Activity(
                 type=ActivityTypes.message,
@@ -158,39 +211,84 @@ class RemindersDialog(CancelAndHelpDialog):
         reminder_log = await self.reminders_accessor.get(
             step_context.context, ReminderLog
         )
-        reminder_log.new_reminders.append(reminder)
+        reminder_log.add(reminder)
+        await self._schedule_reminder(step_context.context, reminder)
 
-    async def _show_reminders(self, turn_context: TurnContext):
+    async def _show_reminders(self, turn_context: TurnContext, page: int = 0):
         reminder_log = await self.reminders_accessor.get(turn_context, ReminderLog)
-        reminder_list = reminder_log.new_reminders + reminder_log.old_reminders
+        if self.archive is not None:
+            await self.archive.compact_turn(
+                self.user_state.get_storage_key(turn_context), reminder_log
+            )
+        reminder_list = sorted(reminder_log.new_reminders) + reminder_log.old_reminders
         if len(reminder_list) == 0:
             await turn_context.send_activity(Messages.no_reminders)
+            return
+
+        page_size = self.page_size
+        if len(reminder_list) > page_size > 1:
+            # The navigation card counts against the channel's carousel limit.
+            page_size -= 1
+        page_count = math.ceil(len(reminder_list) / page_size)
+        page = min(max(page, 0), page_count - 1)
+        page_reminders = reminder_list[page * page_size : (page + 1) * page_size]
+        timezone = await TimezoneHelper.resolve(turn_context, self.timezone_accessor)
+        attachments = [
+            CardFactory.adaptive_card(Cards.reminder_card(reminder, timezone))
+            for reminder in page_reminders
+        ]
+        if page_count > 1:
+            attachments.append(
+                CardFactory.adaptive_card(Cards.page_card(page, page_count))
+            )
+        message = Activity(
+            type=ActivityTypes.message,
+            attachment_layout=AttachmentLayoutTypes.carousel,
+            attachments=attachments,
+        )
+        sent_activity = await turn_context.send_activity(message)
 
         activity_mapping_state = await self.conversation_state_accessor.get(
             turn_context, ActivityMappingState
         )
-        for reminder in reminder_list:
-            reminder_card = Cards.reminder_card(reminder)
-            message = Activity(
-                type=ActivityTypes.message,
-                attachments=[CardFactory.adaptive_card(reminder_card)],
-            )
-            sent_activity = await turn_context.send_activity(message)
-            activity_mapping_state.activities[reminder.id] = sent_activity.id
+        for reminder in page_reminders:
+            activity_mapping_state.set(reminder.id, sent_activity.id)
 
     async def _snooze_reminder(self, turn_context: TurnContext, new_reminder):
         reminder_log = await self.reminders_accessor.get(turn_context, ReminderLog)
         old_reminders = reminder_log.old_reminders
-        reminder = list(
-            filter(lambda reminder: reminder.id == new_reminder.id, old_reminders)
-        )[0]
+        matches = [
+            reminder for reminder in old_reminders if reminder.id == new_reminder.id
+        ]
+        reminder = matches[0] if matches else None
+        if reminder is None:
+            # A delivered recurring reminder is already pending again, so its
+            # snooze becomes a one-off copy.
+            recurring = [
+                reminder
+                for reminder in reminder_log.new_reminders
+                if reminder.id == new_reminder.id
+                and reminder.get_recurrence() is not None
+            ]
+            if recurring:
+                reminder = recurring[0]
+                new_reminder.id = Reminder.new_id()
+        if reminder is None and self.archive is not None:
+            reminder = await self.archive.find(
+                self.user_state.get_storage_key(turn_context), new_reminder.id
+            )
+        if reminder is None:
+            await turn_context.send_activity(Messages.reminder_not_found)
+            return
 
         new_reminder.title = reminder.title
         new_reminder.done = False
-        reminder_log.new_reminders.append(new_reminder)
+        reminder_log.add(new_reminder)
+        await self._schedule_reminder(turn_context, new_reminder)
 
         await turn_context.send_activity(Messages.updated)
-        reminder_card = Cards.reminder_card(new_reminder)
+        timezone = await TimezoneHelper.resolve(turn_context, self.timezone_accessor)
+        reminder_card = Cards.reminder_card(new_reminder, timezone)
         message = Activity(
             type=ActivityTypes.message,
             attachments=[CardFactory.adaptive_card(reminder_card)],
@@ -200,7 +298,20 @@ class RemindersDialog(CancelAndHelpDialog):
         activity_mapping_state = await self.conversation_state_accessor.get(
             turn_context, ActivityMappingState
         )
-        activity_mapping_state.activities[reminder.id] = sent_activity.id
+        activity_mapping_state.set(new_reminder.id, sent_activity.id)
+
+    async def _set_timezone(self, turn_context: TurnContext, name: str):
+        timezone = TimezoneHelper.get_timezone(name)
+        if timezone is None:
+            await turn_context.send_activity(
+                Messages.unknown_timezone.format(timezone=name)
+            )
+            return
+        timezone_state = await self.timezone_accessor.get(turn_context, TimezoneState)
+        timezone_state.timezone = timezone.zone
+        await turn_context.send_activity(
+            Messages.timezone_set.format(timezone=timezone.zone)
+        )
 
     async def _delete_reminder(self, turn_context: TurnContext):
         try:
@@ -208,12 +319,32 @@ class RemindersDialog(CancelAndHelpDialog):
                 turn_context, ActivityMappingState
             )
             reminder_id = turn_context.activity.text.split()[1]
-            activity_id = activity_mapping_state.activities.get(reminder_id)
-            await turn_context.delete_activity(activity_id)
+            reminder_log = await self.reminders_accessor.get(turn_context, ReminderLog)
+            reminder = reminder_log.remove(reminder_id)
+            if reminder is not None and self.scheduler is not None:
+                await self.scheduler.unschedule(reminder_id)
+
+            # The mapping is bounded, so the card's activity may have been evicted.
+            activity_id = activity_mapping_state.pop(reminder_id)
+            if activity_id is None and reminder is None:
+                raise KeyError(reminder_id)
+            # A page of reminders shares one activity; keep it for the others.
+            if activity_id is not None and not activity_mapping_state.is_referenced(
+                activity_id
+            ):
+                await turn_context.delete_activity(activity_id)
             await turn_context.send_activity("Reminder Deleted Successfully.")
         except Exception as e:
             await turn_context.send_activity("Failed to delete Reminder")
 
+    async def _schedule_reminder(self, turn_context: TurnContext, reminder: Reminder):
+        if self.scheduler is not None:
+            await self.scheduler.schedule(
+                reminder,
+                turn_context.activity.from_property.id,
+                self.user_state.get_storage_key(turn_context),
+            )
+
     async def _send_suggested_actions(self, turn_context: TurnContext):
         reply = MessageFactory.text(Messages.help)
 
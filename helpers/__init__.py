@@ -1,14 +1,24 @@
 from .dialog_helper import DialogHelper
 from .luis_helper import LuisHelper, Intent
+from .command_router import CommandRouter
+from .recognizer_cache import RecognizerCache
+from .circuit_breaker import CircuitBreaker
+from .state_helper import StateHelper
 from .reminder_helper import ReminderHelper
 from .datetime_helper import DatetimeHelper
+from .timezone_helper import TimezoneHelper
 from .messages import Messages
 
 __all__ = [
     "DialogHelper",
     "LuisHelper",
+    "CommandRouter",
+    "RecognizerCache",
+    "CircuitBreaker",
+    "StateHelper",
     "ReminderHelper",
     "Intent",
     "DatetimeHelper",
+    "TimezoneHelper",
     "Messages",
 ]
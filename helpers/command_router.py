@@ -0,0 +1,58 @@
+"""
+Routes card actions and exact commands without a recognizer round-trip
+"""
+
+import re
+from datetime import datetime, timedelta
+import pytz
+from data_models import Reminder
+from .luis_helper import Intent
+
+SNOOZE_PATTERN = re.compile(
+    r"^update\s+(?P<id>\S+)\s+in\s+(?P<amount>\d+)\s*(?P<unit>second|minute|hour|day|week)s?$",
+    re.IGNORECASE,
+)
+SHOW_PAGE_PATTERN = re.compile(r"^show\s+page\s+(?P<page>\d+)$", re.IGNORECASE)
+DELETE_PATTERN = re.compile(r"^delete\s+\S+", re.IGNORECASE)
+TIMEZONE_PATTERN = re.compile(
+    r"^(?:set\s+(?:my\s+)?)?time\s*zone\s+(?:to\s+)?(?P<name>\S+)$", re.IGNORECASE
+)
+HELP_COMMANDS = ("help", "?")
+CANCEL_COMMANDS = ("cancel", "quit", "exit")
+
+
+class CommandRouter:
+    @staticmethod
+    def route(text: str, now: datetime = None) -> (Intent, object):
+        """
+        Returns (intent, result) for deterministic commands, or None when the
+        text has to go through the recognizer. Snoozes are relative to `now`.
+        """
+        text = (text or "").strip()
+        command = text.lower()
+
+        if command in HELP_COMMANDS:
+            return Intent.HELP.value, None
+        if command in CANCEL_COMMANDS:
+            return Intent.CANCEL.value, None
+        if command.startswith("show"):
+            match = SHOW_PAGE_PATTERN.match(text)
+            return Intent.SHOW_REMINDERS.value, (
+                int(match.group("page")) if match else None
+            )
+        if DELETE_PATTERN.match(text):
+            return Intent.DELETE_REMINDER.value, None
+        match = TIMEZONE_PATTERN.match(text)
+        if match:
+            return Intent.SET_TIMEZONE.value, match.group("name")
+
+        match = SNOOZE_PATTERN.match(text)
+        if match:
+            amount = int(match.group("amount"))
+            delta = timedelta(**{match.group("unit").lower() + "s": amount})
+            result = Reminder()
+            result.id = match.group("id")
+            result.reminder_time = (now or datetime.now(pytz.utc)) + delta
+            return Intent.SNOOZE_REMINDER.value, result
+
+        return None
@@ -1,13 +1,57 @@
-from datetime import datetime
+from datetime import datetime, tzinfo
 import pytz
+from recognizers_date_time import recognize_datetime, Culture
 
 
 class DatetimeHelper:
     @staticmethod
-    def format_datetime(_dtime):
-        _datetime = pytz.utc.localize(
+    def format_datetime(_dtime, timezone: tzinfo = None):
+        # Timex values are wall-clock times in the user's timezone.
+        return (timezone or pytz.utc).localize(
             datetime.strptime(_dtime.replace("T", " "), "%Y-%m-%d %H:%M:%S")
         )
-        timezone = pytz.timezone("Africa/Nairobi")
-        local_time = _datetime.astimezone(timezone)
-        return local_time
+
+    @staticmethod
+    def resolve_datetime_entities(text: str, reference: datetime = None):
+        """
+        Resolves datetime expressions in `text` locally, in the same shape as
+        the LUIS `datetime` entities: wall-clock timex values relative to
+        `reference`, the user's local time (default: UTC now).
+        """
+        reference = reference or datetime.utcnow()
+        entities = []
+        for model_result in recognize_datetime(
+            text, Culture.English, reference=reference
+        ):
+            values = [
+                DatetimeHelper._resolution_to_datetime(value, reference)
+                for value in model_result.resolution.get("values", [])
+            ]
+            values = [value for value in values if value is not None]
+            future_values = [value for value in values if value >= reference]
+            values = future_values or values
+            if values:
+                entities.append(
+                    {
+                        "timex": [values[0].strftime("%Y-%m-%dT%H:%M:%S")],
+                        "type": "datetime",
+                        "text": model_result.text,
+                    }
+                )
+        return entities
+
+    @staticmethod
+    def _resolution_to_datetime(value: dict, reference: datetime):
+        try:
+            if value.get("type") == "datetime":
+                return datetime.strptime(value["value"], "%Y-%m-%d %H:%M:%S")
+            if value.get("type") == "time":
+                return datetime.combine(
+                    reference.date(),
+                    datetime.strptime(value["value"], "%H:%M:%S").time(),
+                )
+            if value.get("type") == "date":
+                return datetime.strptime(value["value"], "%Y-%m-%d")
+        except (KeyError, ValueError):
+            pass
+        return None
@@ -4,8 +4,16 @@ from enum import Enum
 from typing import Dict
 from botbuilder.ai.luis import LuisRecognizer
 from botbuilder.core import IntentScore, TopIntent, TurnContext
-from data_models import Reminder
+from clock import Clock, SYSTEM_CLOCK
+from data_models import RecurrenceRule, Reminder
+from metrics import METRICS
 from .datetime_helper import DatetimeHelper
+from .recognizer_cache import RecognizerCache
+from .timezone_helper import TimezoneHelper
+
+RECOGNIZER_LATENCY = METRICS.histogram("recognizer.latency")
+RECOGNIZER_CALLS = METRICS.counter("recognizer.calls")
+RECOGNIZER_CACHE_HITS = METRICS.counter("recognizer.cache_hits")
 
 
 class Intent(Enum):
@@ -14,6 +22,8 @@ class Intent(Enum):
     HELP = "Help"
     SNOOZE_REMINDER = "Snooze"
     DELETE_REMINDER = "DeleteReminder"
+    CANCEL = "Cancel"
+    SET_TIMEZONE = "SetTimezone"
     NONE_INTENT = None
 
 
@@ -32,7 +42,10 @@ def top_intent(intents: Dict[Intent, dict]) -> TopIntent:
 class LuisHelper:
     @staticmethod
     async def execute_luis_query(
-        luis_recognizer: LuisRecognizer, turn_context: TurnContext
+        luis_recognizer: LuisRecognizer,
+        turn_context: TurnContext,
+        cache: RecognizerCache = None,
+        clock: Clock = SYSTEM_CLOCK,
     ) -> (Intent, object):
         """
         Returns an object with preformatted LUIS results for the bot's dialogs to consume.
@@ -41,7 +54,19 @@ class LuisHelper:
         intent = None
 
         try:
-            recognizer_result = await luis_recognizer.recognize(turn_context)
+            text = turn_context.activity.text
+            # Recognizers resolve clock times in the user's timezone.
+            timezone = TimezoneHelper.for_turn(turn_context)
+            now = clock.now(timezone).replace(tzinfo=None)
+            recognizer_result = cache.get(text, now) if cache is not None else None
+            if recognizer_result is None:
+                RECOGNIZER_CALLS.inc()
+                with RECOGNIZER_LATENCY.time():
+                    recognizer_result = await luis_recognizer.recognize(turn_context)
+                if cache is not None:
+                    cache.set(text, recognizer_result)
+            else:
+                RECOGNIZER_CACHE_HITS.inc()
             intent = LuisRecognizer.top_intent(recognizer_result)
             print("INTENT", intent)
 
@@ -57,11 +82,18 @@ class LuisHelper:
 
                 date_entities = recognizer_result.entities.get("datetime", [])
 
-                if date_entities:
+                if any(entity.get("type") == "set" for entity in date_entities):
+                    # The first occurrence is resolved in the user's timezone.
+                    result.recurrence = RecurrenceRule.from_timex(
+                        timex for entity in date_entities for timex in entity["timex"]
+                    )
+                elif date_entities:
                     timex = date_entities[0]["timex"]
 
                     if timex:
-                        result.reminder_time = DatetimeHelper.format_datetime(timex[0])
+                        result.reminder_time = DatetimeHelper.format_datetime(
+                            timex[0], timezone
+                        )
 
                 else:
                     result.reminder_time = None
@@ -76,7 +108,9 @@ class LuisHelper:
                     timex = date_entities[0]["timex"]
 
                     if timex:
-                        result.reminder_time = DatetimeHelper.format_datetime(timex[0])
+                        result.reminder_time = DatetimeHelper.format_datetime(
+                            timex[0], timezone
+                        )
 
         except Exception as exception:
             print(exception)
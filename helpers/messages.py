@@ -10,3 +10,10 @@ class Messages:
     time_retry = "Please enter a valid time:"
     bad_time = "Can't set reminders in the past, Reminder discarded."
     no_reminders = "You don't have any reminders!"
+    cancelled = "Cancelled."
+    reminder_not_found = "I couldn't find that reminder."
+    missed_reminders = "You missed {count} reminder(s) while I was away:"
+    timezone_set = "Your timezone is now {timezone}."
+    unknown_timezone = (
+        "I don't know the timezone {timezone}. Try one like Europe/London."
+    )
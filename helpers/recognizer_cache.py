@@ -0,0 +1,88 @@
+"""
+LRU + TTL cache of recognizer results keyed by normalized utterance
+"""
+
+import re
+import time
+from collections import OrderedDict
+from copy import deepcopy
+from datetime import datetime
+from typing import Callable
+from botbuilder.core import RecognizerResult
+from .datetime_helper import DatetimeHelper
+
+WHITESPACE = re.compile(r"\s+")
+
+
+class RecognizerCache:
+    """
+    Caches intents and entities per utterance. Datetime entities are not
+    reused as-is: they are resolved again against `now`, the user's local
+    time, on every hit, so "in 10 minutes" stays relative to the turn that
+    asked for it.
+    Recurrences (`set` entities) are reused as-is.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 300,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return WHITESPACE.sub(" ", (text or "").lower()).strip(" .!?")
+
+    def get(self, text: str, now: datetime = None) -> RecognizerResult:
+        key = self.normalize(text)
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+
+        expires_at, cached_result = item
+        if expires_at <= self.clock():
+            del self._items[key]
+            self.misses += 1
+            return None
+
+        result = deepcopy(cached_result)
+        result.text = text
+        if "datetime" in result.entities and not RecognizerCache._is_recurrence(
+            result.entities["datetime"]
+        ):
+            datetime_entities = DatetimeHelper.resolve_datetime_entities(text, now)
+            if not datetime_entities:
+                self.misses += 1
+                return None
+            result.entities["datetime"] = datetime_entities
+
+        self._items.move_to_end(key)
+        self.hits += 1
+        return result
+
+    @staticmethod
+    def _is_recurrence(datetime_entities) -> bool:
+        # Recurrences and the times that go with them do not depend on the clock.
+        return any(entity.get("type") == "set" for entity in datetime_entities)
+
+    def set(self, text: str, recognizer_result: RecognizerResult):
+        key = self.normalize(text)
+        if not key or recognizer_result is None:
+            return
+        self._items[key] = (self.clock() + self.ttl, deepcopy(recognizer_result))
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+            self.evictions += 1
@@ -1,30 +1,140 @@
-from datetime import datetime
-import pytz
+from datetime import datetime, timedelta, tzinfo
 from botbuilder.core import TurnContext, CardFactory
 from resources import Cards
 from data_models import ReminderLog
-from botbuilder.schema import ActivityTypes, Activity
+from botbuilder.schema import ActivityTypes, Activity, AttachmentLayoutTypes
+from clock import Clock, SYSTEM_CLOCK
+from metrics import METRICS
+from .messages import Messages
+from .state_helper import StateHelper
+from .timezone_helper import TimezoneHelper
+
+# Channels such as Teams show at most 10 cards in a carousel.
+CATCH_UP_BATCH_SIZE = 10
+DISPATCH_LAG_BUCKETS = (0.1, 0.5, 1, 5, 15, 30, 60, 300, 900, 3600, 21600, 86400)
+DISPATCH_LAG = METRICS.histogram("dispatch.lag", DISPATCH_LAG_BUCKETS)
+REMINDERS_SENT = METRICS.counter("dispatch.reminders_sent")
+SEND_FAILURES = METRICS.counter("dispatch.send_failures")
 
 
 class ReminderHelper:
     @staticmethod
-    async def remind_user(turn_context: TurnContext, accessor):
+    async def remind_user(
+        turn_context: TurnContext,
+        accessor,
+        archive=None,
+        journal=None,
+        now: datetime = None,
+        grace: timedelta = timedelta(minutes=5),
+        clock: Clock = SYSTEM_CLOCK,
+        timezone_accessor=None,
+        scheduler=None,
+    ):
+        """
+        Sends every reminder due by `now` and marks it done, or, for recurring
+        reminders, moves it to its next occurrence and hands it back to
+        `scheduler`. Reminders more than
+        `grace` overdue, e.g. after downtime, are sent together in catch-up
+        messages instead of one message each.
+
+        When a send fails, the unsent reminders are put back and the error is
+        re-raised so that the caller can retry; reminders the journal shows as
+        sent are not resent.
+        """
         reminder_log = await accessor.get(turn_context, ReminderLog)
-        timezone = pytz.timezone("Africa/Nairobi")
-        now_local = datetime.now().astimezone(timezone)
-        now = datetime.strftime(now_local, "%Y-%m-%d %I:%M")
-        if len(reminder_log.new_reminders) > 0:
-            reminder_time = datetime.strftime(
-                sorted(reminder_log.new_reminders)[0].reminder_time,
-                "%Y-%m-%d %I:%M %p",
+        now_epoch = int(now.timestamp()) if now is not None else int(clock.time())
+        due_reminders = reminder_log.pop_due(now_epoch)
+        if not due_reminders:
+            return
+        timezone = await TimezoneHelper.resolve(turn_context, timezone_accessor)
+
+        user_key = StateHelper.storage_key(turn_context, accessor)
+        entries = await journal.load(user_key) if journal is not None else {}
+        unsent = [
+            reminder
+            for reminder in due_reminders
+            if journal is None or not journal.is_sent(entries, reminder)
+        ]
+        missed = [
+            reminder
+            for reminder in unsent
+            if reminder.due < now_epoch - grace.total_seconds()
+        ]
+        batches = [
+            (
+                missed[start : start + CATCH_UP_BATCH_SIZE],
+                ReminderHelper._catch_up_message(
+                    missed[start : start + CATCH_UP_BATCH_SIZE], len(missed), timezone
+                ),
             )
-            if now in reminder_time:
-                reminder = reminder_log.new_reminders.pop(0)
-                snooze_card = Cards.snooze_card(reminder)
-                message = Activity(
-                    type=ActivityTypes.message,
-                    attachments=[CardFactory.adaptive_card(snooze_card)],
-                )
+            for start in range(0, len(missed), CATCH_UP_BATCH_SIZE)
+        ]
+        batches.extend(
+            ([reminder], ReminderHelper._reminder_message(reminder, timezone))
+            for reminder in unsent
+            if reminder not in missed
+        )
+
+        failure = None
+        delivered = set(due_reminders) - set(unsent)
+        for reminders, message in batches:
+            try:
+                await turn_context.send_activity(message)
+            except Exception as exception:
+                SEND_FAILURES.inc()
+                failure = exception
+                if journal is not None:
+                    for reminder in reminders:
+                        journal.record(entries, reminder, journal.FAILED)
+                break
+            delivered.update(reminders)
+            sent_at = now.timestamp() if now is not None else clock.time()
+            for reminder in reminders:
+                DISPATCH_LAG.observe(max(0.0, sent_at - reminder.due))
+            REMINDERS_SENT.inc(len(reminders))
+            if journal is not None:
+                for reminder in reminders:
+                    journal.record(entries, reminder, journal.SENT)
+
+        rearmed = []
+        for reminder in due_reminders:
+            if reminder not in delivered:
+                reminder_log.add(reminder)
+            elif reminder.advance(now_epoch):
+                reminder_log.add(reminder)
+                rearmed.append(reminder)
+            else:
                 reminder.done = True
                 reminder_log.old_reminders.append(reminder)
-                await turn_context.send_activity(message)
+
+        if journal is not None:
+            await journal.save(user_key, entries)
+        if archive is not None:
+            await archive.compact_turn(user_key, reminder_log)
+        if scheduler is not None:
+            user_id = turn_context.activity.from_property.id
+            for reminder in rearmed:
+                await scheduler.schedule(reminder, user_id)
+        if failure is not None:
+            raise failure
+
+    @staticmethod
+    def _reminder_message(reminder, timezone: tzinfo) -> Activity:
+        return Activity(
+            type=ActivityTypes.message,
+            attachments=[
+                CardFactory.adaptive_card(Cards.snooze_card(reminder, timezone))
+            ],
+        )
+
+    @staticmethod
+    def _catch_up_message(reminders, missed_count: int, timezone: tzinfo) -> Activity:
+        return Activity(
+            type=ActivityTypes.message,
+            text=Messages.missed_reminders.format(count=missed_count),
+            attachment_layout=AttachmentLayoutTypes.carousel,
+            attachments=[
+                CardFactory.adaptive_card(Cards.snooze_card(reminder, timezone))
+                for reminder in reminders
+            ],
+        )
@@ -0,0 +1,42 @@
+from typing import Dict
+from botbuilder.core import BotState, TurnContext
+
+
+class StateHelper:
+    @staticmethod
+    async def save_changes(turn_context: TurnContext, *bot_states: BotState):
+        """
+        Writes only the states whose content changed during the turn, and
+        coalesces states that share a storage into a single write call.
+        """
+        batches: Dict[int, tuple] = {}
+        for bot_state in bot_states:
+            cached_state = bot_state.get_cached_state(turn_context)
+            if not StateHelper.is_changed(cached_state):
+                continue
+            storage = bot_state._storage  # pylint: disable=protected-access
+            _, changes, saved = batches.setdefault(id(storage), (storage, {}, []))
+            changes[bot_state.get_storage_key(turn_context)] = cached_state.state
+            saved.append(cached_state)
+
+        for storage, changes, saved in batches.values():
+            await storage.write(changes)
+            for cached_state in saved:
+                cached_state.hash = cached_state.compute_hash(cached_state.state)
+
+    @staticmethod
+    def storage_key(turn_context: TurnContext, accessor) -> str:
+        """
+        Key of the state document that `accessor`'s property is stored in.
+        """
+        bot_state = accessor._bot_state  # pylint: disable=protected-access
+        return bot_state.get_storage_key(turn_context)
+
+    @staticmethod
+    def is_changed(cached_state) -> bool:
+        if cached_state is None or not cached_state.is_changed:
+            return False
+        # A state that was never stored and is still empty has nothing to save.
+        return bool(
+            cached_state.state
+        ) or cached_state.hash != cached_state.compute_hash(None)
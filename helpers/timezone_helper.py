@@ -0,0 +1,53 @@
+from datetime import tzinfo
+from functools import lru_cache
+import pytz
+from botbuilder.core import TurnContext
+from data_models import TimezoneState
+from data_models.reminder import DEFAULT_TIMEZONE
+
+TURN_STATE_KEY = "TimezoneHelper.timezone"
+
+
+class TimezoneHelper:
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_timezone(name: str) -> tzinfo:
+        """
+        Returns the timezone named `name`, or None when there is no such timezone.
+        """
+        try:
+            return pytz.timezone(name)
+        except pytz.UnknownTimeZoneError:
+            return None
+
+    @staticmethod
+    async def resolve(turn_context: TurnContext, accessor) -> tzinfo:
+        """
+        Returns the user's timezone: the one in their TimezoneState, else the
+        `local_timezone` their channel reports, which is then kept in their
+        TimezoneState, else the default timezone.
+        """
+        timezone = DEFAULT_TIMEZONE
+        if accessor is not None:
+            timezone_state = await accessor.get(turn_context, TimezoneState)
+            if timezone_state.timezone is None:
+                local_timezone = TimezoneHelper.get_timezone(
+                    turn_context.activity.local_timezone
+                )
+                if local_timezone is not None:
+                    timezone_state.timezone = local_timezone.zone
+            if timezone_state.timezone is not None:
+                timezone = (
+                    TimezoneHelper.get_timezone(timezone_state.timezone)
+                    or DEFAULT_TIMEZONE
+                )
+        turn_context.turn_state[TURN_STATE_KEY] = timezone
+        return timezone
+
+    @staticmethod
+    def for_turn(turn_context: TurnContext) -> tzinfo:
+        """
+        Returns the timezone `resolve` found for this turn, so recognizers can
+        resolve clock times in it, else the default timezone.
+        """
+        return turn_context.turn_state.get(TURN_STATE_KEY, DEFAULT_TIMEZONE)
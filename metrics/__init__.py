@@ -0,0 +1,5 @@
+from .counter import Counter
+from .latency_histogram import LatencyHistogram
+from .metrics_registry import METRICS, MetricsRegistry
+
+__all__ = ["Counter", "LatencyHistogram", "METRICS", "MetricsRegistry"]
@@ -0,0 +1,21 @@
+"""
+Monotonic counter
+"""
+
+
+class Counter:
+    """
+    A plain integer increment. Metrics are only recorded from the event loop
+    thread, so no lock is needed.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+    def to_dict(self) -> int:
+        return self.value
@@ -0,0 +1,77 @@
+"""
+Fixed-bucket latency histogram
+"""
+
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Sequence
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class LatencyHistogram:
+    """
+    Counts observations (in seconds) into fixed upper-bounded buckets.
+    Observing is a bisect and two additions, cheap enough for hot paths.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        """
+        Returns the upper bound of the bucket holding the `quantile` observation,
+        or None when it is above the largest bucket and has no bound. JSON has
+        no infinity, so None keeps `to_dict()` serializable.
+        """
+        if not self.count:
+            return 0.0
+        rank = quantile * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.buckets[index] if index < len(self.buckets) else None
+        return None
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "buckets": dict(
+                zip([str(bucket) for bucket in self.buckets] + ["+Inf"], self.counts)
+            ),
+        }
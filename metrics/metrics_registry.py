@@ -0,0 +1,37 @@
+"""
+Named counters and latency histograms exposed on /api/metrics
+"""
+
+from typing import Dict, Sequence
+from .counter import Counter
+from .latency_histogram import DEFAULT_BUCKETS, LatencyHistogram
+
+
+class MetricsRegistry:
+    """
+    Creates metrics on first use and returns the same instance afterwards, so
+    hot paths can look a metric up once at import and keep the reference.
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+
+    def counter(self, name: str) -> Counter:
+        return self.register(name, Counter)
+
+    def histogram(
+        self, name: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> LatencyHistogram:
+        return self.register(name, lambda: LatencyHistogram(buckets))
+
+    def register(self, name: str, factory):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = factory()
+        return metric
+
+    def to_dict(self) -> Dict:
+        return {name: metric.to_dict() for name, metric in sorted(self.metrics.items())}
+
+
+METRICS = MetricsRegistry()
@@ -1,3 +1,12 @@
 from .reminder_recognizer import ReminderRecognizer
+from .rule_based_recognizer import RuleBasedRecognizer
+from .fallback_recognizer import FallbackRecognizer, RecognizerUnavailableError
+from .recognizer_factory import create_recognizer
 
-__all__ = ["ReminderRecognizer"]
+__all__ = [
+    "ReminderRecognizer",
+    "RuleBasedRecognizer",
+    "FallbackRecognizer",
+    "RecognizerUnavailableError",
+    "create_recognizer",
+]
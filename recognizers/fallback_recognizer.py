@@ -0,0 +1,73 @@
+import asyncio
+import time
+from botbuilder.core import RecognizerResult, TurnContext
+from helpers import CircuitBreaker
+from metrics import METRICS
+
+LUIS_LATENCY = METRICS.histogram("recognizer.luis_latency")
+FALLBACK_LATENCY = METRICS.histogram("recognizer.fallback_latency")
+RECOGNIZER_FALLBACKS = METRICS.counter("recognizer.fallbacks")
+
+
+class RecognizerUnavailableError(Exception):
+    pass
+
+
+class FallbackRecognizer:
+    """
+    Calls `recognizer` with a per-call deadline of `latency_budget` seconds
+    and falls back to `fallback` when it fails or times out.
+
+    Failures and calls slower than `slow_call_threshold` are reported to the
+    circuit breaker; while it is open the recognizer is skipped entirely.
+    """
+
+    def __init__(
+        self,
+        recognizer,
+        fallback=None,
+        latency_budget: float = None,
+        circuit_breaker: CircuitBreaker = None,
+        slow_call_threshold: float = None,
+    ):
+        self.recognizer = recognizer
+        self.fallback = fallback
+        self.latency_budget = latency_budget
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.slow_call_threshold = slow_call_threshold
+        self.latency = LUIS_LATENCY
+        self.fallback_latency = FALLBACK_LATENCY
+        self.fallbacks = 0
+
+    async def recognize(self, turn_context: TurnContext) -> RecognizerResult:
+        if not self.circuit_breaker.allow_request():
+            return await self._fallback(turn_context, "circuit open")
+
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                self.recognizer.recognize(turn_context), self.latency_budget
+            )
+        except Exception as exception:
+            self.latency.observe(time.perf_counter() - start)
+            self.circuit_breaker.record_failure()
+            return await self._fallback(
+                turn_context, f"{type(exception).__name__}: {exception}"
+            )
+
+        elapsed = time.perf_counter() - start
+        self.latency.observe(elapsed)
+        if self.slow_call_threshold is not None and elapsed > self.slow_call_threshold:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        return result
+
+    async def _fallback(self, turn_context: TurnContext, reason: str):
+        if self.fallback is None:
+            raise RecognizerUnavailableError(reason)
+        print(f"[FallbackRecognizer] using fallback: {reason}")
+        self.fallbacks += 1
+        RECOGNIZER_FALLBACKS.inc()
+        with self.fallback_latency.time():
+            return await self.fallback.recognize(turn_context)
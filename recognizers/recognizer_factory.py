@@ -0,0 +1,32 @@
+import dotenv
+
+dotenv.load_dotenv()
+from config import DefaultConfig
+from helpers import CircuitBreaker
+from .fallback_recognizer import FallbackRecognizer
+from .reminder_recognizer import ReminderRecognizer
+from .rule_based_recognizer import RuleBasedRecognizer
+
+
+def create_recognizer(config: DefaultConfig = None):
+    """
+    Builds the recognizer selected by `config.RECOGNIZER`:
+    "luis", "rules", or "auto" (LUIS with the rule-based recognizer as a
+    fallback, or the rule-based recognizer alone when LUIS is not configured).
+
+    LUIS calls are bounded by `LUIS_LATENCY_BUDGET` and guarded by a
+    circuit breaker in both "luis" and "auto" modes.
+    """
+    config = config or DefaultConfig()
+    mode = config.RECOGNIZER.lower()
+    if mode == "rules" or (mode == "auto" and not config.LUIS_APP_ID):
+        return RuleBasedRecognizer()
+    return FallbackRecognizer(
+        ReminderRecognizer(),
+        RuleBasedRecognizer() if mode == "auto" else None,
+        latency_budget=config.LUIS_LATENCY_BUDGET,
+        circuit_breaker=CircuitBreaker(
+            config.LUIS_BREAKER_FAILURES, config.LUIS_BREAKER_COOLDOWN
+        ),
+        slow_call_threshold=config.LUIS_SLOW_CALL_THRESHOLD,
+    )
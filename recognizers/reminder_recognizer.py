@@ -1,8 +1,13 @@
+import copy
+from datetime import datetime
+from typing import Dict
 from botbuilder.ai.luis import LuisApplication, LuisRecognizer, LuisPredictionOptions
+from botbuilder.core import RecognizerResult, TurnContext
 import dotenv
 
 dotenv.load_dotenv()
 from config import DefaultConfig
+from helpers import TimezoneHelper
 
 
 class ReminderRecognizer(LuisRecognizer):
@@ -17,3 +22,23 @@ class ReminderRecognizer(LuisRecognizer):
             include_all_intents=True, include_instance_data=True
         )
         super().__init__(luis_application, luis_options, True)
+        self.luis_options = luis_options
+
+    async def recognize(  # pylint: disable=arguments-differ
+        self,
+        turn_context: TurnContext,
+        telemetry_properties: Dict[str, str] = None,
+        telemetry_metrics: Dict[str, float] = None,
+        luis_prediction_options: LuisPredictionOptions = None,
+    ) -> RecognizerResult:
+        if luis_prediction_options is None:
+            # LUIS resolves clock times relative to the user's local time.
+            offset = TimezoneHelper.for_turn(turn_context).utcoffset(datetime.utcnow())
+            luis_prediction_options = copy.copy(self.luis_options)
+            luis_prediction_options.timezone_offset = offset.total_seconds() / 60
+        return await super().recognize(
+            turn_context,
+            telemetry_properties,
+            telemetry_metrics,
+            luis_prediction_options,
+        )
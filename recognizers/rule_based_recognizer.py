@@ -0,0 +1,213 @@
+"""
+Offline recognizer built from compiled patterns, with the same recognize()
+contract as ReminderRecognizer
+"""
+
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List
+from botbuilder.core import IntentScore, RecognizerResult, TurnContext
+from clock import Clock, SYSTEM_CLOCK
+from helpers import DatetimeHelper, Intent, TimezoneHelper
+
+SNOOZE_PATTERN = re.compile(r"^update\s+\S+\s+in\s+", re.IGNORECASE)
+HELP_PATTERN = re.compile(r"^(help|\?|what can you do)\b", re.IGNORECASE)
+SHOW_PATTERN = re.compile(
+    r"^(show|list|view|display)\b|\b(my|all)\s+reminders\b", re.IGNORECASE
+)
+CREATE_PATTERN = re.compile(
+    r"\b(?:remind\s+me|set\s+(?:a\s+)?reminder|create\s+(?:a\s+)?reminder|add\s+(?:a\s+)?reminder)"
+    r"(?:\s+(?:to|about|for|that))?(?P<title>.*)$",
+    re.IGNORECASE,
+)
+RELATIVE_TIME_PATTERN = re.compile(
+    r"\bin\s+(?P<amount>\d+|an?|one)\s*(?P<unit>sec(?:ond)?|min(?:ute)?|hour|hr|day|week)s?\b",
+    re.IGNORECASE,
+)
+CLOCK_TIME_PATTERN = re.compile(
+    r"\b(?:(?P<day>today|tomorrow)\s+)?at\s+(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<meridiem>am|pm)?"
+    r"(?:\s+(?P<day_after>today|tomorrow))?\b",
+    re.IGNORECASE,
+)
+CALENDAR_PATTERN = re.compile(
+    r"\b(?:mon|tues?|wed(?:nes)?|thu(?:rs)?|fri|sat(?:ur)?|sun)(?:day)?\b"
+    r"|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d"
+    r"|\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}",
+    re.IGNORECASE,
+)
+WEEKDAY = r"(?:mon|tues?|wed(?:nes)?|thu(?:rs)?|fri|sat(?:ur)?|sun)(?:day)?\b"
+RECURRENCE_PATTERN = re.compile(
+    r"\b(?:every\s+day|daily"
+    r"|(?P<weekdays>every\s+weekday|on\s+weekdays)"
+    rf"|(?:every|weekly\s+on)\s+(?P<days>{WEEKDAY}(?:\s*(?:,|and|&)\s*{WEEKDAY})*)"
+    r"|(?:every\s+month|monthly)\s+on\s+the\s+(?P<month_day>\d{1,2})(?:st|nd|rd|th)?)"
+    r"(?:\s+at\s+(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<meridiem>am|pm)?)?\b",
+    re.IGNORECASE,
+)
+TRAILING_CONNECTORS = re.compile(r"(\s+(?:at|on|in|by|for))+$", re.IGNORECASE)
+UNITS = {
+    "sec": "seconds",
+    "second": "seconds",
+    "min": "minutes",
+    "minute": "minutes",
+    "hour": "hours",
+    "hr": "hours",
+    "day": "days",
+    "week": "weeks",
+}
+# LUIS numbers weekdays from Monday (1) to Sunday (7).
+WEEKDAY_NUMBERS = {"mon": 1, "tue": 2, "wed": 3, "thu": 4, "fri": 5, "sat": 6, "sun": 7}
+
+
+class RuleBasedRecognizer:
+    """
+    Extracts the CreateReminder, Snooze, ShowReminders and Help intents,
+    the reminder_title entity and datetime entities without a network call.
+    Datetime entities use the same timex shape as LUIS, as wall-clock times
+    in the user's timezone, and recurrences the same `set` entities.
+    """
+
+    def __init__(self, clock: Clock = SYSTEM_CLOCK):
+        self.clock = clock
+
+    async def recognize(self, turn_context: TurnContext) -> RecognizerResult:
+        now = self.clock.now(TimezoneHelper.for_turn(turn_context))
+        return self.recognize_text(turn_context.activity.text, now.replace(tzinfo=None))
+
+    def recognize_text(self, text: str, now: datetime = None) -> RecognizerResult:
+        """
+        Recognizes `text` relative to `now`, the user's local time (default:
+        UTC now).
+        """
+        text = (text or "").strip()
+        now = now or self.clock.utcnow()
+        entities: Dict[str, object] = {}
+        intent = "None"
+
+        if SNOOZE_PATTERN.match(text):
+            intent = Intent.SNOOZE_REMINDER.value
+            self._add_datetime(entities, text, now)
+        elif HELP_PATTERN.match(text):
+            intent = Intent.HELP.value
+        elif SHOW_PATTERN.search(text):
+            intent = Intent.SHOW_REMINDERS.value
+        else:
+            match = CREATE_PATTERN.search(text)
+            if match:
+                intent = Intent.CREATE_REMINDER.value
+                time_text = self._add_recurrence(entities, text)
+                if time_text is None:
+                    time_text = self._add_datetime(entities, text, now)
+                self._add_title(entities, match, time_text)
+
+        return RecognizerResult(
+            text=text,
+            altered_text=text,
+            intents={intent: IntentScore(1.0)},
+            entities=entities,
+        )
+
+    def _add_datetime(self, entities: Dict, text: str, now: datetime) -> str:
+        """
+        Adds a `datetime` entity to `entities` and returns the matched text.
+        """
+        match = RELATIVE_TIME_PATTERN.search(text)
+        if match:
+            amount = match.group("amount").lower()
+            amount = 1 if amount in ("a", "an", "one") else int(amount)
+            unit = UNITS[match.group("unit").lower()]
+            resolved = now + timedelta(**{unit: amount})
+            entities["datetime"] = self._datetime_entity(resolved)
+            return match.group(0)
+
+        match = CLOCK_TIME_PATTERN.search(text)
+        if match and not CALENDAR_PATTERN.search(text):
+            resolved = self._resolve_clock_time(match, now)
+            if resolved is not None:
+                entities["datetime"] = self._datetime_entity(resolved)
+                return match.group(0)
+
+        datetime_entities = DatetimeHelper.resolve_datetime_entities(text, now)
+        if datetime_entities:
+            entities["datetime"] = datetime_entities
+            return datetime_entities[0]["text"]
+        return None
+
+    @staticmethod
+    def _add_recurrence(entities: Dict, text: str) -> str:
+        """
+        Adds a LUIS-style `set` datetime entity for phrases such as "every
+        Monday at 9" and returns the matched text. Times are the user's local
+        time, and default to 9am.
+        """
+        match = RECURRENCE_PATTERN.search(text)
+        if match is None:
+            return None
+        hour = int(match.group("hour") or 9)
+        minute = int(match.group("minute") or 0)
+        meridiem = (match.group("meridiem") or "").lower()
+        if meridiem == "pm" and hour < 12:
+            hour += 12
+        elif meridiem == "am" and hour == 12:
+            hour = 0
+        if hour > 23 or minute > 59:
+            return None
+
+        at = f"T{hour:02d}:{minute:02d}"
+        if match.group("weekdays"):
+            timex = [f"XXXX-WXX-{day}{at}" for day in range(1, 6)]
+        elif match.group("days"):
+            days = re.findall(WEEKDAY, match.group("days"), re.IGNORECASE)
+            timex = [f"XXXX-WXX-{WEEKDAY_NUMBERS[day[:3].lower()]}{at}" for day in days]
+        elif match.group("month_day"):
+            day = int(match.group("month_day"))
+            if not 1 <= day <= 31:
+                return None
+            timex = [f"XXXX-XX-{day:02d}{at}"]
+        else:
+            timex = ["P1D", at]
+        entities["datetime"] = [{"timex": timex, "type": "set"}]
+        return match.group(0)
+
+    @staticmethod
+    def _resolve_clock_time(match, now: datetime) -> datetime:
+        hour = int(match.group("hour"))
+        minute = int(match.group("minute") or 0)
+        meridiem = (match.group("meridiem") or "").lower()
+        if meridiem == "pm" and hour < 12:
+            hour += 12
+        elif meridiem == "am" and hour == 12:
+            hour = 0
+        if hour > 23 or minute > 59:
+            return None
+
+        resolved = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        day = (match.group("day") or match.group("day_after") or "").lower()
+        if day == "tomorrow":
+            resolved += timedelta(days=1)
+        elif resolved < now and not day:
+            resolved += timedelta(days=1)
+        return resolved
+
+    @staticmethod
+    def _datetime_entity(resolved: datetime) -> List[Dict]:
+        return [{"timex": [resolved.strftime("%Y-%m-%dT%H:%M:%S")], "type": "datetime"}]
+
+    @staticmethod
+    def _add_title(entities: Dict, match, time_text: str):
+        title = match.group("title")
+        if time_text:
+            title = title.replace(time_text, " ")
+        title = TRAILING_CONNECTORS.sub("", " ".join(title.split())).strip()
+        if title:
+            start = match.start("title") + match.group("title").index(title.split()[0])
+            entities["$instance"] = {
+                "reminder_title": [
+                    {
+                        "startIndex": start,
+                        "endIndex": start + len(title),
+                        "text": title,
+                        "type": "reminder_title",
+                    }
+                ]
+            }
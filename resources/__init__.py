@@ -1,3 +1,4 @@
+from .card_template import CardTemplate, Slot
 from .cards import Cards
 
-__all__ = ["Cards"]
+__all__ = ["CardTemplate", "Cards", "Slot"]
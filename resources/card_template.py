@@ -0,0 +1,62 @@
+from typing import Any, Dict, List, Tuple
+
+
+class Slot:
+    """
+    Placeholder for a per-card value inside a card skeleton.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        if not name.isidentifier():
+            raise ValueError(f"Slot name {name!r} is not a valid identifier")
+        self.name = name
+
+
+class CardTemplate:
+    """
+    An Adaptive Card skeleton whose slot paths are found once, up front.
+    Binding only copies the dicts and lists on the path to a `Slot`; every other
+    part of the card is shared between bound cards and must not be mutated.
+    """
+
+    def __init__(self, card: Dict[str, Any]):
+        self.card = card
+        self.slots = []
+        # (parent copy index, key, node) for every node on a slot path, parents
+        # first, and (copy index, key, slot name) for every slot.
+        self._copies: List[Tuple[int, Any, Any]] = []
+        self._fills: List[Tuple[int, Any, str]] = []
+        self._find_slots(card, 0)
+
+    def bind(self, **values) -> Dict[str, Any]:
+        missing = [name for name in self.slots if name not in values]
+        if missing:
+            raise TypeError(f"bind() is missing values for {', '.join(missing)}")
+        copies = [self.card.copy()]
+        for parent, key, node in self._copies:
+            copy = copies[parent][key] = node.copy()
+            copies.append(copy)
+        for index, key, name in self._fills:
+            copies[index][key] = values[name]
+        return copies[0]
+
+    def _find_slots(self, node, index: int) -> bool:
+        items = node.items() if isinstance(node, dict) else enumerate(node)
+        has_slots = False
+        for key, child in items:
+            if isinstance(child, Slot):
+                if child.name not in self.slots:
+                    self.slots.append(child.name)
+                self._fills.append((index, key, child.name))
+                has_slots = True
+            elif isinstance(child, (dict, list)):
+                start = len(self._copies)
+                self._copies.append((index, key, child))
+                if self._find_slots(child, start + 1):
+                    has_slots = True
+                else:
+                    # No slots below: share the node instead of copying it.
+                    del self._copies[start:]
+        return has_slots
@@ -1,157 +1,221 @@
 from data_models import Reminder
-from datetime import datetime
+from datetime import datetime, tzinfo
+from .card_template import CardTemplate, Slot
 
 
-class Cards:
-    @staticmethod
-    def reminder_card(reminder: Reminder):
-        return {
-            "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-            "type": "AdaptiveCard",
-            "version": "1.0",
-            "id": "",
-            "body": [
-                {
-                    "type": "TextBlock",
-                    "text": reminder.title,
-                    "size": "Large",
-                    "weight": "Bolder",
-                },
-                {
-                    "type": "TextBlock",
-                    "text": datetime.strftime(
-                        reminder.reminder_time, "%Y-%m-%d %I:%M %p"
-                    ),
-                    "isSubtle": True,
-                    "spacing": "None",
+def format_time(_datetime: datetime) -> str:
+    # Same output as strftime("%Y-%m-%d %I:%M %p") at about half the cost.
+    hour = _datetime.hour
+    return (
+        f"{_datetime.year:04d}-{_datetime.month:02d}-{_datetime.day:02d} "
+        f"{hour % 12 or 12:02d}:{_datetime.minute:02d} {'PM' if hour >= 12 else 'AM'}"
+    )
+
+
+REMINDER_CARD = CardTemplate(
+    {
+        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
+        "type": "AdaptiveCard",
+        "version": "1.0",
+        "id": "",
+        "body": [
+            {
+                "type": "TextBlock",
+                "text": Slot("title"),
+                "size": "Large",
+                "weight": "Bolder",
+            },
+            {
+                "type": "TextBlock",
+                "text": Slot("time"),
+                "isSubtle": True,
+                "spacing": "None",
+            },
+        ],
+        "actions": [
+            {
+                "type": "Action.Submit",
+                "title": "Delete",
+                "data": {
+                    "action": "delete",
+                    "reminder_id": Slot("reminder_id"),
+                    "activity_id": "",
                 },
-            ],
-            "actions": [
-                {
-                    "type": "Action.Submit",
-                    "title": "Delete",
-                    "data": {"action": "delete", "reminder_id": "", "activity_id": ""},
-                }
-            ],
-        }
+            }
+        ],
+    }
+)
 
-    @staticmethod
-    def snooze_card(reminder: Reminder):
-        return {
-            "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-            "type": "AdaptiveCard",
-            "version": "1.0",
-            "speak": "<s>Your  meeting about \"Adaptive Card design session\"<break strength='weak'/> is starting at 12:30pm</s><s>Do you want to snooze <break strength='weak'/> or do you want to send a late notification to the attendees?</s>",
-            "body": [
-                {
-                    "type": "ColumnSet",
-                    "columns": [
-                        {
-                            "type": "Column",
-                            "width": 50,
-                            "items": [
-                                {
-                                    "type": "TextBlock",
-                                    "text": (
-                                        reminder.title
-                                        if hasattr(reminder, "title")
-                                        else ""
-                                    ),
-                                    "size": "Large",
-                                    "weight": "Bolder",
-                                },
-                                {
-                                    "type": "TextBlock",
-                                    "text": (
-                                        datetime.strftime(
-                                            reminder.reminder_time, "%Y-%m-%d %I:%M %p"
-                                        )
-                                        if hasattr(reminder, "reminder_time")
-                                        else ""
-                                    ),
-                                    "isSubtle": True,
-                                    "spacing": "None",
-                                },
-                                {"type": "TextBlock", "text": "Snooze for"},
-                                {
-                                    "type": "Input.ChoiceSet",
-                                    "id": "snooze",
-                                    "value": "5 minutes",
-                                    "choices": [
-                                        {"title": "5 minutes", "value": "5 minutes"},
-                                        {"title": "10 minutes", "value": "10 minutes"},
-                                        {"title": "30 minutes", "value": "30 minutes"},
-                                    ],
-                                },
-                            ],
-                            "separator": True,
-                        },
-                        {
-                            "type": "Column",
-                            "width": "auto",
-                            "horizontalAlignment": "Center",
-                            "style": "default",
-                            "backgroundImage": {
-                                "url": "",
-                                "horizontalAlignment": "Center",
+SNOOZE_CARD = CardTemplate(
+    {
+        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
+        "type": "AdaptiveCard",
+        "version": "1.0",
+        "speak": "<s>Your  meeting about \"Adaptive Card design session\"<break strength='weak'/> is starting at 12:30pm</s><s>Do you want to snooze <break strength='weak'/> or do you want to send a late notification to the attendees?</s>",
+        "body": [
+            {
+                "type": "ColumnSet",
+                "columns": [
+                    {
+                        "type": "Column",
+                        "width": 50,
+                        "items": [
+                            {
+                                "type": "TextBlock",
+                                "text": Slot("title"),
+                                "size": "Large",
+                                "weight": "Bolder",
+                            },
+                            {
+                                "type": "TextBlock",
+                                "text": Slot("time"),
+                                "isSubtle": True,
+                                "spacing": "None",
+                            },
+                            {"type": "TextBlock", "text": "Snooze for"},
+                            {
+                                "type": "Input.ChoiceSet",
+                                "id": "snooze",
+                                "value": "5 minutes",
+                                "choices": [
+                                    {"title": "5 minutes", "value": "5 minutes"},
+                                    {"title": "10 minutes", "value": "10 minutes"},
+                                    {"title": "30 minutes", "value": "30 minutes"},
+                                ],
                             },
-                            "verticalContentAlignment": "Center",
-                            "height": "stretch",
-                            "spacing": "None",
-                            "items": [
-                                {"type": "ImageSet"},
-                                {
-                                    "type": "Image",
-                                    "altText": "",
-                                    "url": "https://i.ibb.co/RvYB9Gc/bell-200-transparent.gif",
-                                },
-                            ],
+                        ],
+                        "separator": True,
+                    },
+                    {
+                        "type": "Column",
+                        "width": "auto",
+                        "horizontalAlignment": "Center",
+                        "style": "default",
+                        "backgroundImage": {
+                            "url": "",
+                            "horizontalAlignment": "Center",
                         },
-                    ],
-                }
-            ],
-            "actions": [
-                {
-                    "type": "Action.Submit",
-                    "title": "Snooze",
-                    "data": {"action": "snooze", "reminder_id": reminder.id},
-                },
-                {
-                    "type": "Action.Submit",
-                    "title": "Dismiss",
-                    "data": {
-                        "action": "delete",
-                        "reminder_id": reminder.id,
-                        "activity_id": "",
+                        "verticalContentAlignment": "Center",
+                        "height": "stretch",
+                        "spacing": "None",
+                        "items": [
+                            {"type": "ImageSet"},
+                            {
+                                "type": "Image",
+                                "altText": "",
+                                "url": "https://i.ibb.co/RvYB9Gc/bell-200-transparent.gif",
+                            },
+                        ],
                     },
+                ],
+            }
+        ],
+        "actions": [
+            {
+                "type": "Action.Submit",
+                "title": "Snooze",
+                "data": {"action": "snooze", "reminder_id": Slot("reminder_id")},
+            },
+            {
+                "type": "Action.Submit",
+                "title": "Dismiss",
+                "data": {
+                    "action": "delete",
+                    "reminder_id": Slot("reminder_id"),
+                    "activity_id": "",
                 },
-            ],
-        }
+            },
+        ],
+    }
+)
+
+HELP_CARD = CardTemplate(
+    {
+        "type": "AdaptiveCard",
+        "body": [
+            {
+                "type": "TextBlock",
+                "size": "Medium",
+                "weight": "Bolder",
+                "text": "Help",
+            },
+            {
+                "type": "FactSet",
+                "facts": [
+                    {"title": "Set Reminder:", "value": "Sets a reminder"},
+                    {
+                        "title": "Show all Reminders:",
+                        "value": "Displays All reminders",
+                    },
+                    {"title": "Exit:", "value": "Exit"},
+                    {"title": "Cancel:", "value": "Cancels a Dialog"},
+                ],
+            },
+        ],
+        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
+        "version": "1.0",
+    }
+)
+
+
+def format_reminder_time(reminder: Reminder, timezone: tzinfo = None) -> str:
+    text = format_time(reminder.local_time(timezone))
+    recurrence = reminder.get_recurrence()
+    if recurrence is not None:
+        text += f" ({recurrence.describe()})"
+    return text
+
+
+class Cards:
+    @staticmethod
+    def reminder_card(reminder: Reminder, timezone: tzinfo = None):
+        return REMINDER_CARD.bind(
+            title=reminder.title,
+            time=format_reminder_time(reminder, timezone),
+            reminder_id=reminder.id,
+        )
+
+    @staticmethod
+    def snooze_card(reminder: Reminder, timezone: tzinfo = None):
+        return SNOOZE_CARD.bind(
+            title=reminder.title,
+            time=format_reminder_time(reminder, timezone),
+            reminder_id=reminder.id,
+        )
 
     @staticmethod
     def help_card():
+        return HELP_CARD.bind()
+
+    @staticmethod
+    def page_card(page: int, page_count: int):
+        actions = []
+        if page > 0:
+            actions.append(
+                {
+                    "type": "Action.Submit",
+                    "title": "Previous",
+                    "data": {"action": "page", "page": page - 1},
+                }
+            )
+        if page < page_count - 1:
+            actions.append(
+                {
+                    "type": "Action.Submit",
+                    "title": "Next",
+                    "data": {"action": "page", "page": page + 1},
+                }
+            )
         return {
+            "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
             "type": "AdaptiveCard",
+            "version": "1.0",
             "body": [
                 {
                     "type": "TextBlock",
-                    "size": "Medium",
-                    "weight": "Bolder",
-                    "text": "Help",
-                },
-                {
-                    "type": "FactSet",
-                    "facts": [
-                        {"title": "Set Reminder:", "value": "Sets a reminder"},
-                        {
-                            "title": "Show all Reminders:",
-                            "value": "Displays All reminders",
-                        },
-                        {"title": "Exit:", "value": "Exit"},
-                        {"title": "Cancel:", "value": "Cancels a Dialog"},
-                    ],
-                },
+                    "text": f"Page {page + 1} of {page_count}",
+                    "isSubtle": True,
+                }
             ],
-            "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-            "version": "1.0",
+            "actions": actions,
         }
@@ -0,0 +1,12 @@
+from .reminder_index import ReminderIndex
+from .reminder_scheduler import ReminderScheduler
+from .lease_manager import LeaseManager
+from .proactive_dispatcher import ProactiveDispatcher, DispatchReport
+
+__all__ = [
+    "ReminderIndex",
+    "ReminderScheduler",
+    "LeaseManager",
+    "ProactiveDispatcher",
+    "DispatchReport",
+]
@@ -0,0 +1,209 @@
+"""
+Lease-based ownership of scheduler partitions across bot instances
+"""
+
+import asyncio
+import copy
+import time
+import traceback
+from typing import Callable, Dict, List, Set, Tuple
+from botbuilder.core import Storage
+from storage import ConversationRegistry, StorageConflictError, compare_and_swap
+from storage.conversation_registry import MAX_WRITE_ATTEMPTS
+
+
+class LeaseManager:
+    """
+    Each conversation registry shard is a scheduler partition. An instance only
+    dispatches reminders for the partitions it holds a lease on.
+
+    Leases are documents in the shared storage, updated with e_tag
+    compare-and-swap: an instance renews its leases every `renew_interval`
+    seconds, takes over leases that have expired, and asks the holder to hand
+    a partition back when the hash ring prefers it as the owner.
+
+    Reminders scheduled on an instance that does not own the user's partition
+    are posted to the partition's inbox document, which the owner drains.
+    """
+
+    KEY_PREFIX = "SchedulerLease"
+    INBOX_PREFIX = "SchedulerInbox"
+
+    def __init__(
+        self,
+        storage: Storage,
+        registry: ConversationRegistry,
+        lease_duration: float = 30.0,
+        renew_interval: float = 10.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.storage = storage
+        self.registry = registry
+        self.instance_id = registry.instance_id
+        self.lease_duration = lease_duration
+        self.renew_interval = renew_interval
+        self.clock = clock
+        self.owned: Set[int] = set()
+        self.takeovers = 0
+        self._expires: Dict[int, float] = {}
+        self._absent_since: Dict[int, float] = {}
+        registry.leases = self
+
+    def lease_key(self, shard: int) -> str:
+        return f"{self.KEY_PREFIX}-{shard}"
+
+    def inbox_key(self, shard: int) -> str:
+        return f"{self.INBOX_PREFIX}-{shard}"
+
+    def owns(self, shard: int) -> bool:
+        # Stop acting on a lease before it can expire for the other instances.
+        return shard in self.owned and self._expires[shard] > self.clock()
+
+    def owns_user(self, user_id: str) -> bool:
+        return self.owns(self.registry.shard_for(user_id))
+
+    async def renew(self) -> Tuple[Set[int], Set[int]]:
+        """
+        Renews, acquires and hands back leases; returns the shards acquired and
+        lost since the previous call.
+        """
+        now = self.clock()
+        shards = range(self.registry.shard_count)
+        items = await self.storage.read([self.lease_key(shard) for shard in shards])
+        acquired, lost = set(), set()
+        for shard in shards:
+            lease = items.get(self.lease_key(shard))
+            try:
+                owned = await self._renew_shard(shard, lease, now)
+            except StorageConflictError:
+                # Another instance updated the lease since we read it.
+                owned = False
+            if owned and shard not in self.owned:
+                acquired.add(shard)
+            elif not owned and shard in self.owned:
+                lost.add(shard)
+            if owned:
+                self._expires[shard] = now + self.lease_duration
+                self.owned.add(shard)
+            else:
+                self._expires.pop(shard, None)
+                self.owned.discard(shard)
+        return acquired, lost
+
+    async def release(self):
+        items = await self.storage.read([self.lease_key(shard) for shard in self.owned])
+        for shard in list(self.owned):
+            lease = items.get(self.lease_key(shard))
+            if lease and lease["owner"] == self.instance_id:
+                try:
+                    await self._write_lease(shard, lease, None, 0)
+                except StorageConflictError:
+                    pass
+        self.owned.clear()
+        self._expires.clear()
+
+    async def post(self, user_id: str, entry: list):
+        """
+        Queues an index entry for the owner of `user_id`'s partition.
+        """
+        key = self.inbox_key(self.registry.shard_for(user_id))
+        for attempt in range(MAX_WRITE_ATTEMPTS):
+            stored = (await self.storage.read([key])).get(key)
+            document = copy.deepcopy(stored) if stored else {"entries": []}
+            document["entries"].append([user_id] + list(entry))
+            try:
+                await compare_and_swap(self.storage, key, document)
+                return
+            except StorageConflictError:
+                if attempt == MAX_WRITE_ATTEMPTS - 1:
+                    raise
+
+    async def drain(self) -> List[list]:
+        """
+        Removes and returns the entries posted to the inboxes of owned shards.
+        """
+        keys = [self.inbox_key(shard) for shard in sorted(self.owned)]
+        if not keys:
+            return []
+        items = await self.storage.read(keys)
+        entries = []
+        for key, document in items.items():
+            if not document or not document.get("entries"):
+                continue
+            try:
+                await compare_and_swap(
+                    self.storage,
+                    key,
+                    {"entries": [], "e_tag": document.get("e_tag", "*")},
+                )
+            except StorageConflictError:
+                # Posted to concurrently; drain it on the next round.
+                continue
+            entries.extend(document["entries"])
+        return entries
+
+    async def run(self, on_change: Callable):
+        """
+        Renews leases every `renew_interval` seconds and awaits
+        `on_change(acquired, lost)` after each round.
+        """
+        while True:
+            try:
+                acquired, lost = await self.renew()
+                await on_change(acquired, lost)
+            except Exception as exception:
+                print(f"\n [LeaseManager] lease renewal failed: {exception}")
+                traceback.print_exc()
+            await asyncio.sleep(self.renew_interval)
+
+    async def _renew_shard(self, shard: int, lease: dict, now: float) -> bool:
+        preferred = self.registry.ring.instance_for(shard) == self.instance_id
+        if lease is None:
+            self._absent_since.setdefault(shard, now)
+            # Only the preferred instance creates a lease, unless it never shows up.
+            absent_for = now - self._absent_since[shard]
+            if preferred or absent_for >= self.lease_duration:
+                await self._write_lease(shard, {}, self.instance_id)
+                return True
+            return False
+        self._absent_since.pop(shard, None)
+
+        owner, requested_by = lease["owner"], lease.get("requested_by")
+        if owner == self.instance_id:
+            if requested_by and requested_by != self.instance_id:
+                # The requester has one lease duration to take the shard over.
+                await self._write_lease(shard, lease, None, None, requested_by)
+                return False
+            await self._write_lease(shard, lease, self.instance_id)
+            return True
+
+        if owner is None and requested_by and requested_by != self.instance_id:
+            if lease["expires"] > now:
+                # Handed back to the instance that asked for it.
+                return False
+        if owner is None or lease["expires"] <= now:
+            await self._write_lease(shard, lease, self.instance_id)
+            if owner is not None:
+                self.takeovers += 1
+            return True
+
+        if preferred and requested_by != self.instance_id:
+            await self._write_lease(
+                shard, lease, owner, lease["expires"], self.instance_id
+            )
+        return False
+
+    async def _write_lease(
+        self,
+        shard: int,
+        lease: dict,
+        owner: str,
+        expires: float = None,
+        requested_by: str = None,
+    ):
+        if expires is None:
+            expires = self.clock() + self.lease_duration
+        document = {"owner": owner, "expires": expires, "requested_by": requested_by}
+        if "e_tag" in lease:
+            document["e_tag"] = lease["e_tag"]
+        await compare_and_swap(self.storage, self.lease_key(shard), document)
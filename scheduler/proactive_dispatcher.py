@@ -0,0 +1,153 @@
+"""
+Bounded-concurrency fan-out of proactive turns over conversation references
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List
+from botbuilder.core import BotAdapter, TurnContext
+from botbuilder.schema import ConversationReference
+
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class DispatchReport:
+    def __init__(self):
+        self.attempted = 0
+        self.delivered = 0
+        self.failed = 0
+        self.retries = 0
+        self.latency = 0.0
+        self.failed_references: List[ConversationReference] = []
+
+    def __str__(self):
+        return (
+            f"dispatched {self.delivered}/{self.attempted} "
+            f"(failed={self.failed}, retries={self.retries}) "
+            f"in {self.latency * 1000:.1f}ms"
+        )
+
+
+class ChannelRateLimiter:
+    """
+    Spaces out calls per channel so that no channel sees more than
+    `rate` calls per second. A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float = 0):
+        self.rate = rate
+        self._next_slot: Dict[str, float] = {}
+
+    async def acquire(self, channel_id: str):
+        if not self.rate:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(channel_id, now))
+        self._next_slot[channel_id] = slot + 1 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class ProactiveDispatcher:
+    def __init__(
+        self,
+        adapter: BotAdapter,
+        bot_id: str,
+        concurrency: int = 100,
+        channel_rate: float = 0,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        batch_size: int = 1000,
+    ):
+        self.adapter = adapter
+        self.bot_id = bot_id
+        self.concurrency = concurrency
+        self.rate_limiter = ChannelRateLimiter(channel_rate)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.last_report: DispatchReport = None
+
+    async def dispatch(
+        self,
+        conversation_references: Iterable[ConversationReference],
+        callback: Callable[[TurnContext], Awaitable],
+    ) -> DispatchReport:
+        report = DispatchReport()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.monotonic()
+
+        batch: List[ConversationReference] = []
+        for conversation_reference in conversation_references:
+            batch.append(conversation_reference)
+            if len(batch) >= self.batch_size:
+                await self._dispatch_batch(batch, callback, semaphore, report)
+                batch = []
+        if batch:
+            await self._dispatch_batch(batch, callback, semaphore, report)
+
+        report.latency = time.monotonic() - start
+        self.last_report = report
+        return report
+
+    async def _dispatch_batch(self, batch, callback, semaphore, report):
+        await asyncio.gather(
+            *[
+                self._dispatch_one(reference, callback, semaphore, report)
+                for reference in batch
+            ]
+        )
+
+    async def _dispatch_one(self, conversation_reference, callback, semaphore, report):
+        report.attempted += 1
+        attempt = 0
+        while True:
+            async with semaphore:
+                await self.rate_limiter.acquire(conversation_reference.channel_id)
+                try:
+                    await self._continue_conversation(conversation_reference, callback)
+                    report.delivered += 1
+                    return
+                except Exception as exception:
+                    status_code = self._status_code(exception)
+                    if (
+                        status_code not in RETRYABLE_STATUS_CODES
+                        or attempt >= self.max_retries
+                    ):
+                        report.failed += 1
+                        report.failed_references.append(conversation_reference)
+                        print(f"\n [ProactiveDispatcher] delivery failed: {exception}")
+                        return
+            attempt += 1
+            report.retries += 1
+            await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+
+    async def _continue_conversation(self, conversation_reference, callback):
+        """
+        Runs `callback` in a proactive turn and raises what it raised. The
+        error is caught inside the turn because the adapter's on_turn_error
+        would otherwise handle it and the turn would look delivered.
+        """
+        errors = []
+
+        async def run_callback(turn_context: TurnContext):
+            try:
+                await callback(turn_context)
+            except Exception as exception:
+                errors.append(exception)
+
+        await self.adapter.continue_conversation(
+            conversation_reference, run_callback, self.bot_id
+        )
+        if errors:
+            raise errors[0]
+
+    @staticmethod
+    def _status_code(exception: Exception) -> int:
+        response = getattr(exception, "response", None)
+        status_code = getattr(response, "status_code", None)
+        return (
+            status_code
+            if status_code is not None
+            else getattr(exception, "status", None)
+        )
@@ -0,0 +1,228 @@
+"""
+Global index of pending reminders sorted by due minute
+"""
+
+import bisect
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, List, Set, Tuple, Union
+from botbuilder.core import Storage
+
+SECONDS_PER_MINUTE = 60
+SECONDS_PER_PARTITION = 3600
+USER_SHARDS = 64
+
+
+class ReminderIndex:
+    """
+    Maps due minute -> reminder id -> user id so that a tick is a range scan
+    over the reminders that are due instead of a read of every user's state.
+
+    The index is persisted next to the bot state as a root document listing
+    the due hours, one document per due hour and the user id -> state key map
+    in USER_SHARDS documents. A save only writes the documents that changed.
+    """
+
+    ROOT_KEY = "ReminderIndex"
+
+    def __init__(self):
+        self.users: Dict[str, str] = {}
+        self._entries: Dict[str, Tuple[int, str]] = {}
+        self._buckets: Dict[int, Set[str]] = {}
+        self._minutes: List[int] = []
+        self._hours: Dict[int, Set[str]] = {}
+        self._user_shards: Dict[int, Set[str]] = {}
+        self._partitions: Set[int] = set()
+        self._dirty_partitions: Set[int] = set()
+        self._dirty_user_shards: Set[int] = set()
+        self._root_dirty = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, reminder_id: str):
+        return reminder_id in self._entries
+
+    def add(
+        self,
+        reminder_id: str,
+        user_id: str,
+        due_time: Union[datetime, int],
+        user_key: str = None,
+    ):
+        """
+        Indexes a reminder due at `due_time`, a datetime or epoch seconds.
+        """
+        self.remove(reminder_id)
+        due = due_time if isinstance(due_time, int) else int(due_time.timestamp())
+        self._add_entry(reminder_id, due, user_id)
+        if user_key:
+            self.add_users({user_id: user_key})
+
+    def add_users(self, users: Dict[str, str]):
+        for user_id, user_key in users.items():
+            if self.users.get(user_id) != user_key:
+                shard = self._user_shard(user_id)
+                self.users[user_id] = user_key
+                self._user_shards.setdefault(shard, set()).add(user_id)
+                self._dirty_user_shards.add(shard)
+
+    def remove(self, reminder_id: str):
+        entry = self._entries.pop(reminder_id, None)
+        if entry is None:
+            return
+        due, _ = entry
+        minute = due // SECONDS_PER_MINUTE
+        bucket = self._buckets[minute]
+        bucket.discard(reminder_id)
+        if not bucket:
+            del self._buckets[minute]
+            del self._minutes[bisect.bisect_left(self._minutes, minute)]
+        hour = due // SECONDS_PER_PARTITION
+        self._hours[hour].discard(reminder_id)
+        if not self._hours[hour]:
+            del self._hours[hour]
+        self._dirty_partitions.add(hour)
+
+    def next_due(self) -> int:
+        if not self._minutes:
+            return None
+        bucket = self._buckets[self._minutes[0]]
+        return min(self._entries[reminder_id][0] for reminder_id in bucket)
+
+    def pop_due(self, now: float) -> List[Tuple[str, str]]:
+        """
+        Removes and returns (user id, reminder id) for every reminder due at `now`.
+        """
+        due_entries = []
+        current_minute = int(now) // SECONDS_PER_MINUTE
+        end = bisect.bisect_right(self._minutes, current_minute)
+        for minute in self._minutes[:end]:
+            for reminder_id in list(self._buckets[minute]):
+                due, user_id = self._entries[reminder_id]
+                if due <= now:
+                    due_entries.append((due, user_id, reminder_id))
+        due_entries.sort()
+        for _, _, reminder_id in due_entries:
+            self.remove(reminder_id)
+        return [(user_id, reminder_id) for _, user_id, reminder_id in due_entries]
+
+    async def load(self, storage: Storage):
+        items = await storage.read([self.ROOT_KEY])
+        root = items.get(self.ROOT_KEY)
+        if not root:
+            return
+        hours = root["hours"]
+        partition_keys = [self._partition_key(hour) for hour in hours]
+        user_shard_keys = [self._user_shard_key(shard) for shard in range(USER_SHARDS)]
+        items = await storage.read(partition_keys + user_shard_keys)
+        for key in partition_keys:
+            document = items.get(key) or {}
+            for reminder_id, (due, user_id) in document.get("entries", {}).items():
+                self._add_entry(reminder_id, due, user_id)
+        for key in user_shard_keys:
+            self.add_users((items.get(key) or {}).get("users", {}))
+        self._partitions.update(hours)
+        self._dirty_partitions.clear()
+        self._dirty_user_shards.clear()
+
+    async def save(self, storage: Storage):
+        if (
+            not self._dirty_partitions
+            and not self._dirty_user_shards
+            and not self._root_dirty
+        ):
+            return
+        changes = {}
+        deleted = []
+        for hour in self._dirty_partitions:
+            if hour in self._hours:
+                changes[self._partition_key(hour)] = {
+                    "entries": {
+                        reminder_id: list(self._entries[reminder_id])
+                        for reminder_id in self._hours[hour]
+                    },
+                    "e_tag": "*",
+                }
+                if hour not in self._partitions:
+                    self._partitions.add(hour)
+                    self._root_dirty = True
+            elif hour in self._partitions:
+                deleted.append(self._partition_key(hour))
+                self._partitions.discard(hour)
+                self._root_dirty = True
+        for shard in self._dirty_user_shards:
+            changes[self._user_shard_key(shard)] = {
+                "users": {
+                    user_id: self.users[user_id] for user_id in self._user_shards[shard]
+                },
+                "e_tag": "*",
+            }
+        if self._root_dirty:
+            changes[self.ROOT_KEY] = {
+                "hours": sorted(self._partitions),
+                "e_tag": "*",
+            }
+        if changes:
+            await storage.write(changes)
+        if deleted:
+            await storage.delete(deleted)
+        self._dirty_partitions.clear()
+        self._dirty_user_shards.clear()
+        self._root_dirty = False
+
+    async def rebuild(
+        self, storage: Storage, property_name: str, user_ids: Iterable[str] = None
+    ):
+        """
+        Re-reads the reminder logs of `user_ids` (default: every known user)
+        from their user state documents and replaces their index entries.
+        """
+        user_ids = set(self.users if user_ids is None else user_ids)
+        user_keys = {
+            self.users[user_id]: user_id
+            for user_id in user_ids
+            if user_id in self.users
+        }
+        items = await storage.read(list(user_keys))
+
+        stale = [
+            reminder_id
+            for reminder_id, (_, user_id) in self._entries.items()
+            if user_id in user_ids
+        ]
+        for reminder_id in stale:
+            self.remove(reminder_id)
+
+        for user_key, document in items.items():
+            reminder_log = (
+                document.get(property_name)
+                if isinstance(document, dict)
+                else getattr(document, property_name, None)
+            )
+            if reminder_log is None:
+                continue
+            for reminder in reminder_log.new_reminders:
+                if reminder.due is not None:
+                    self.add(reminder.id, user_keys[user_key], reminder.due)
+
+    def _add_entry(self, reminder_id: str, due: int, user_id: str):
+        self._entries[reminder_id] = (due, user_id)
+        minute = due // SECONDS_PER_MINUTE
+        if minute not in self._buckets:
+            self._buckets[minute] = set()
+            bisect.insort(self._minutes, minute)
+        self._buckets[minute].add(reminder_id)
+        hour = due // SECONDS_PER_PARTITION
+        self._hours.setdefault(hour, set()).add(reminder_id)
+        self._dirty_partitions.add(hour)
+
+    def _partition_key(self, hour: int) -> str:
+        return f"{self.ROOT_KEY}-hour-{hour}"
+
+    def _user_shard_key(self, shard: int) -> str:
+        return f"{self.ROOT_KEY}-users-{shard}"
+
+    @staticmethod
+    def _user_shard(user_id: str) -> int:
+        return zlib.crc32(user_id.encode("utf-8")) % USER_SHARDS
@@ -0,0 +1,163 @@
+"""
+In-process scheduler that wakes up when the next reminder is due
+"""
+
+import asyncio
+import traceback
+from typing import Awaitable, Callable, List, Tuple
+from botbuilder.core import Storage
+from clock import Clock, SYSTEM_CLOCK
+from data_models import Reminder
+from metrics import METRICS
+from .lease_manager import LeaseManager
+from .reminder_index import ReminderIndex
+
+TICK_DURATION = METRICS.histogram("scheduler.tick_duration")
+TICK_FAILURES = METRICS.counter("scheduler.tick_failures")
+
+
+class ReminderScheduler:
+    """
+    Keeps pending reminders in a ReminderIndex and calls `callback` with the
+    (user id, reminder id) pairs that are due, sleeping in between.
+
+    With a LeaseManager, reminders of users in partitions owned by another
+    instance are handed to that instance instead of being indexed here, and
+    the index is rebuilt per acquired partition instead of being persisted.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[List[Tuple[str, str]]], Awaitable],
+        storage: Storage = None,
+        reminders_property: str = "RemindersState",
+        leases: LeaseManager = None,
+        clock: Clock = SYSTEM_CLOCK,
+    ):
+        self.callback = callback
+        self.storage = storage
+        self.reminders_property = reminders_property
+        self.leases = leases
+        self.clock = clock
+        self.index = ReminderIndex()
+        self._wakeup: asyncio.Event = None
+        self._task: asyncio.Task = None
+        self._lease_task: asyncio.Task = None
+
+    async def schedule(self, reminder: Reminder, user_id: str, user_key: str = None):
+        if self.leases is not None and not self.leases.owns_user(user_id):
+            await self.leases.post(user_id, [reminder.id, reminder.due, user_key])
+            return
+        next_due = self.index.next_due()
+        self.index.add(reminder.id, user_id, reminder.due, user_key)
+        await self._save_index()
+        if next_due is None or self.index.next_due() < next_due:
+            self._notify()
+
+    async def reschedule(self, due: List[Tuple[str, str]], delay: float):
+        """
+        Puts (user id, reminder id) pairs whose dispatch failed back in the
+        index to be retried after `delay` seconds. Recurring reminders that
+        were already re-armed for their next occurrence are left alone.
+        """
+        retry_at = int(self.clock.time() + delay)
+        for user_id, reminder_id in due:
+            if reminder_id not in self.index:
+                self.index.add(reminder_id, user_id, retry_at)
+        await self._save_index()
+        self._notify()
+
+    async def unschedule(self, reminder_id: str):
+        self.index.remove(reminder_id)
+        await self._save_index()
+
+    def next_due(self) -> float:
+        return self.index.next_due()
+
+    async def pop_due(self, now: float = None) -> List[Tuple[str, str]]:
+        now = self.clock.time() if now is None else now
+        due = self.index.pop_due(now)
+        if due:
+            await self._save_index()
+        return due
+
+    async def start(self):
+        if self._task is None:
+            if self.storage is not None and self.leases is None:
+                await self.index.load(self.storage)
+                await self.index.rebuild(self.storage, self.reminders_property)
+                await self._save_index()
+            self._wakeup = asyncio.Event()
+            if self.leases is not None:
+                await self.on_leases_changed(*await self.leases.renew())
+                self._lease_task = asyncio.ensure_future(
+                    self.leases.run(self.on_leases_changed)
+                )
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        for task in (self._lease_task, self._task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._lease_task = None
+        if self.leases is not None:
+            await self.leases.release()
+
+    async def rebuild(self):
+        """
+        Re-reads the indexed users' reminders after they were changed in
+        storage, e.g. when recurring reminders were moved on by reconciliation.
+        """
+        if self.storage is not None:
+            await self.index.rebuild(self.storage, self.reminders_property)
+            await self._save_index()
+            self._notify()
+
+    async def on_leases_changed(self, acquired, lost):
+        """
+        Indexes the users of newly acquired partitions and the reminders other
+        instances posted for owned partitions.
+        """
+        if acquired and self.storage is not None:
+            users = await self.leases.registry.shard_users(acquired)
+            self.index.add_users(users)
+            await self.index.rebuild(self.storage, self.reminders_property, users)
+        for user_id, reminder_id, due, user_key in await self.leases.drain():
+            self.index.add(reminder_id, user_id, due, user_key)
+        await self._save_index()
+        self._notify()
+
+    def _notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _save_index(self):
+        if self.storage is not None and self.leases is None:
+            await self.index.save(self.storage)
+
+    async def tick(self):
+        """
+        Pops the reminders that are due and passes them to `callback`.
+        """
+        with TICK_DURATION.time():
+            due = await self.pop_due()
+            if due:
+                await self.callback(due)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            next_due = self.next_due()
+            timeout = None if next_due is None else max(0, next_due - self.clock.time())
+            await self.clock.wait(self._wakeup, timeout)
+
+            try:
+                await self.tick()
+            except Exception as exception:
+                TICK_FAILURES.inc()
+                print(f"\n [ReminderScheduler] dispatch failed: {exception}")
+                traceback.print_exc()
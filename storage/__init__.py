@@ -0,0 +1,21 @@
+from .compare_and_swap import StorageConflictError, compare_and_swap
+from .conversation_registry import ConversationRegistry, HashRing
+from .dispatch_journal import DispatchJournal
+from .instrumented_storage import InstrumentedStorage
+from .latency_storage import LatencyStorage
+from .sqlite_storage import SqliteStorage
+from .reminder_archive import ReminderArchive
+from .write_behind_storage import WriteBehindStorage
+
+__all__ = [
+    "ConversationRegistry",
+    "HashRing",
+    "DispatchJournal",
+    "InstrumentedStorage",
+    "LatencyStorage",
+    "SqliteStorage",
+    "ReminderArchive",
+    "WriteBehindStorage",
+    "StorageConflictError",
+    "compare_and_swap",
+]
@@ -0,0 +1,69 @@
+"""
+Storage-neutral optimistic concurrency for shared coordination documents
+"""
+
+from typing import Dict
+from botbuilder.core import Storage
+
+CONFLICT_STATUS_CODES = (409, 412)
+NOT_FOUND_STATUS_CODE = 404
+# Marks a write that must create the document. SqliteStorage e_tags are never
+# negative, so it rejects this e_tag for an existing document, but
+# MemoryStorage stores the first e_tag as given and would accept a second
+# create, so compare_and_swap also checks that the key is still absent.
+CREATE_E_TAG = "-1"
+
+
+class StorageConflictError(Exception):
+    def __init__(self, conflicts: Dict[str, Exception]):
+        super().__init__(f"Optimistic concurrency conflict on {sorted(conflicts)}")
+        self.conflicts = conflicts
+
+
+def status_code(exception: Exception) -> int:
+    return getattr(exception, "status_code", None) or getattr(
+        getattr(exception, "response", None), "status_code", None
+    )
+
+
+def is_conflict(exception: Exception) -> bool:
+    """
+    MemoryStorage and SqliteStorage report e_tag conflicts as KeyError,
+    CosmosDbStorage as HTTP 409/412 errors.
+    """
+    return (
+        isinstance(exception, KeyError)
+        or status_code(exception) in CONFLICT_STATUS_CODES
+        or "etag" in str(exception).lower()
+    )
+
+
+async def compare_and_swap(
+    storage: Storage, key: str, document: dict, exclusive: bool = True
+):
+    """
+    Writes `document` to `key` unless another writer got there first, and
+    raises StorageConflictError if one did.
+
+    A document read from `storage` carries its e_tag and is replaced only if
+    it is unchanged. A new document, without an e_tag, is created only if
+    `key` still does not exist when `exclusive`, or upserted otherwise.
+    CosmosDbStorage cannot create conditionally (any e_tag but "*" is a
+    replace, which fails with 404 for a new document), so there the first
+    write of a document falls back to an upsert.
+    """
+    create = exclusive and "e_tag" not in document
+    if "e_tag" not in document:
+        document["e_tag"] = CREATE_E_TAG if exclusive else "*"
+    if create and key in await storage.read([key]):
+        raise StorageConflictError({key: KeyError(f"{key} already exists")})
+    try:
+        await storage.write({key: document})
+    except Exception as exception:
+        if create and status_code(exception) == NOT_FOUND_STATUS_CODE:
+            document["e_tag"] = "*"
+            await storage.write({key: document})
+            return
+        if is_conflict(exception):
+            raise StorageConflictError({key: exception}) from exception
+        raise
@@ -0,0 +1,204 @@
+"""
+Durable, sharded registry of conversation references
+"""
+
+import bisect
+import copy
+import hashlib
+from typing import Dict, Iterable, List
+from botbuilder.core import Storage
+from botbuilder.schema import ConversationReference
+from .compare_and_swap import StorageConflictError, compare_and_swap
+
+SHARD_COUNT = 64
+MAX_WRITE_ATTEMPTS = 3
+
+
+def stable_hash(value: str) -> int:
+    # hash() is salted per process, so instances would disagree on placement.
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Consistent-hash ring that assigns shards to bot instances, so adding or
+    removing an instance only moves the shards next to it on the ring.
+    """
+
+    def __init__(self, instances: Iterable[str], replicas: int = 100):
+        self.instances = sorted(set(instances))
+        self._ring = sorted(
+            (stable_hash(f"{instance}#{replica}"), instance)
+            for instance in self.instances
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in self._ring]
+
+    def instance_for(self, shard: int) -> str:
+        if not self._ring:
+            return None
+        index = bisect.bisect(self._hashes, stable_hash(f"shard-{shard}"))
+        return self._ring[index % len(self._ring)][1]
+
+
+class ConversationRegistry:
+    """
+    Conversation references keyed by user id, persisted in `shard_count` shard
+    documents with a write-through cache. Only changed references are written.
+
+    Each instance owns the shards the hash ring assigns to `instance_id`, or
+    the shards it holds a lease on when a scheduler LeaseManager is attached,
+    and only dispatches proactive messages to the users in them.
+    """
+
+    KEY_PREFIX = "ConversationReferences"
+
+    def __init__(
+        self,
+        storage: Storage,
+        instance_id: str = "default",
+        instances: Iterable[str] = None,
+        shard_count: int = SHARD_COUNT,
+    ):
+        self.storage = storage
+        self.instance_id = instance_id
+        self.shard_count = shard_count
+        self.ring = HashRing(instances or [instance_id])
+        self.leases = None
+        self.writes = 0
+        self._references: Dict[str, dict] = {}
+        self._loaded_shards = set()
+
+    def __len__(self):
+        return len(self._references)
+
+    def __contains__(self, user_id: str):
+        return user_id in self._references
+
+    def shard_for(self, user_id: str) -> int:
+        return stable_hash(user_id) % self.shard_count
+
+    def shard_key(self, shard: int) -> str:
+        return f"{self.KEY_PREFIX}-{shard}"
+
+    def owned_shards(self) -> List[int]:
+        if self.leases is not None:
+            return sorted(self.leases.owned)
+        return [
+            shard
+            for shard in range(self.shard_count)
+            if self.ring.instance_for(shard) == self.instance_id
+        ]
+
+    def owns(self, user_id: str) -> bool:
+        shard = self.shard_for(user_id)
+        if self.leases is not None:
+            return self.leases.owns(shard)
+        return self.ring.instance_for(shard) == self.instance_id
+
+    async def add(self, reference: ConversationReference) -> bool:
+        """
+        Stores `reference` if it differs from the stored one; returns whether it
+        was written.
+        """
+        user_id = reference.user.id
+        document = reference.serialize()
+        # The activity id changes on every message and is not needed to resume.
+        document.pop("activityId", None)
+        if self._references.get(user_id) == document:
+            return False
+        shard = self.shard_for(user_id)
+        if shard not in self._loaded_shards:
+            await self._load_shards([shard])
+            if self._references.get(user_id) == document:
+                return False
+
+        await self._write_reference(shard, user_id, document)
+        self._references[user_id] = document
+        return True
+
+    async def get(self, user_id: str) -> ConversationReference:
+        shard = self.shard_for(user_id)
+        if user_id not in self._references and shard not in self._loaded_shards:
+            await self._load_shards([shard])
+        document = self._references.get(user_id)
+        return ConversationReference.deserialize(document) if document else None
+
+    async def get_many(
+        self, user_ids: Iterable[str], owned_only: bool = True
+    ) -> List[ConversationReference]:
+        user_ids = [
+            user_id for user_id in user_ids if not owned_only or self.owns(user_id)
+        ]
+        # Other instances may have added these users since the shard was cached.
+        missing = {
+            self.shard_for(user_id)
+            for user_id in user_ids
+            if user_id not in self._references
+        }
+        if missing:
+            await self._load_shards(sorted(missing))
+        return [
+            ConversationReference.deserialize(self._references[user_id])
+            for user_id in user_ids
+            if user_id in self._references
+        ]
+
+    async def owned_references(self) -> List[ConversationReference]:
+        await self.load()
+        return [
+            ConversationReference.deserialize(document)
+            for user_id, document in self._references.items()
+            if self.owns(user_id)
+        ]
+
+    async def shard_users(self, shards: Iterable[int]) -> Dict[str, str]:
+        """
+        Re-reads `shards` and returns user id -> user state key for their users.
+        """
+        shards = set(shards)
+        await self._load_shards(sorted(shards))
+        return {
+            user_id: f"{document['channelId']}/users/{user_id}"
+            for user_id, document in self._references.items()
+            if self.shard_for(user_id) in shards
+        }
+
+    async def load(self):
+        """
+        Reads the shards this instance owns that are not cached yet.
+        """
+        shards = [
+            shard for shard in self.owned_shards() if shard not in self._loaded_shards
+        ]
+        if shards:
+            await self._load_shards(shards)
+
+    async def _load_shards(self, shards: List[int]):
+        keys = [self.shard_key(shard) for shard in shards]
+        items = await self.storage.read(keys)
+        for key in keys:
+            document = items.get(key)
+            if document:
+                self._references.update(document["references"])
+        self._loaded_shards.update(shards)
+
+    async def _write_reference(self, shard: int, user_id: str, reference: dict):
+        key = self.shard_key(shard)
+        for attempt in range(MAX_WRITE_ATTEMPTS):
+            stored = (await self.storage.read([key])).get(key)
+            # Storage may hand back its live copy; never mutate it in place.
+            document = copy.deepcopy(stored) if stored else {"references": {}}
+            document["references"][user_id] = reference
+            try:
+                # Only instances sharing shards through leases write concurrently.
+                await compare_and_swap(
+                    self.storage, key, document, exclusive=self.leases is not None
+                )
+                self.writes += 1
+                self._references.update(document["references"])
+                return
+            except StorageConflictError:
+                # Another instance wrote the shard since we read it; retry.
+                if attempt == MAX_WRITE_ATTEMPTS - 1:
+                    raise
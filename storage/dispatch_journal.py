@@ -0,0 +1,113 @@
+"""
+Per-user journal of reminder deliveries
+"""
+
+import copy
+from typing import Dict, Iterable, List
+from botbuilder.core import Storage
+from clock import Clock, SYSTEM_CLOCK
+from data_models import Reminder, ReminderLog
+
+RECONCILE_BATCH_SIZE = 100
+
+
+class DispatchJournal:
+    """
+    Records every delivery attempt of a reminder under an idempotency key of
+    reminder id and due time, as {key: [attempts, status, updated]} in a
+    per-user journal document.
+
+    A reminder whose delivery was journaled as sent is never sent again, even
+    if the user state that marks it done was not saved.
+    """
+
+    SENT = "sent"
+    FAILED = "failed"
+
+    def __init__(
+        self, storage: Storage, max_entries: int = 200, clock: Clock = SYSTEM_CLOCK
+    ):
+        self.storage = storage
+        self.max_entries = max_entries
+        self.clock = clock
+
+    @staticmethod
+    def journal_key(user_key: str) -> str:
+        return f"{user_key}/journal"
+
+    @staticmethod
+    def idempotency_key(reminder: Reminder) -> str:
+        due = reminder.due
+        return f"{reminder.id}@{due if due is not None else ''}"
+
+    async def load(self, user_key: str) -> Dict[str, list]:
+        key = self.journal_key(user_key)
+        document = (await self.storage.read([key])).get(key)
+        return dict(document["entries"]) if document else {}
+
+    async def save(self, user_key: str, entries: Dict[str, list]):
+        # Entries are kept in insertion order, so the oldest are dropped first.
+        entries = dict(list(entries.items())[-self.max_entries :])
+        await self.storage.write(
+            {self.journal_key(user_key): {"entries": entries, "e_tag": "*"}}
+        )
+
+    def record(self, entries: Dict[str, list], reminder: Reminder, status: str):
+        key = self.idempotency_key(reminder)
+        attempts = entries.pop(key, [0])[0] + 1
+        entries[key] = [attempts, status, int(self.clock.time())]
+
+    @staticmethod
+    def is_sent(entries: Dict[str, list], reminder: Reminder) -> bool:
+        entry = entries.get(DispatchJournal.idempotency_key(reminder))
+        return entry is not None and entry[1] == DispatchJournal.SENT
+
+    async def reconcile(self, user_keys: Iterable[str], property_name: str) -> int:
+        """
+        Marks pending reminders that the journal shows as sent as done in the
+        stored user state, or moves recurring ones to their next occurrence,
+        and returns how many were reconciled.
+        """
+        user_keys = list(user_keys)
+        reconciled = 0
+        for start in range(0, len(user_keys), RECONCILE_BATCH_SIZE):
+            batch = user_keys[start : start + RECONCILE_BATCH_SIZE]
+            items = await self.storage.read(
+                batch + [self.journal_key(user_key) for user_key in batch]
+            )
+            for user_key in batch:
+                journal = items.get(self.journal_key(user_key))
+                document = items.get(user_key)
+                if journal and document:
+                    reconciled += await self._reconcile_document(
+                        user_key, document, journal["entries"], property_name
+                    )
+        return reconciled
+
+    async def _reconcile_document(
+        self, user_key: str, document, entries: Dict[str, list], property_name: str
+    ) -> int:
+        # Storage may hand back its live copy; never mutate it in place.
+        document = copy.deepcopy(document)
+        reminder_log: ReminderLog = (
+            document.get(property_name)
+            if isinstance(document, dict)
+            else getattr(document, property_name, None)
+        )
+        if reminder_log is None:
+            return 0
+        sent: List[Reminder] = [
+            reminder
+            for reminder in reminder_log.new_reminders
+            if self.is_sent(entries, reminder)
+        ]
+        for reminder in sent:
+            reminder_log.remove(reminder.id)
+            if reminder.advance(self.clock.time()):
+                reminder_log.add(reminder)
+                continue
+            reminder.done = True
+            reminder_log.old_reminders.append(reminder)
+        if sent:
+            await self.storage.write({user_key: document})
+        return len(sent)
@@ -0,0 +1,60 @@
+from typing import Dict, Iterable, List, Sequence
+from botbuilder.core import Storage, StoreItem
+from metrics import METRICS, MetricsRegistry
+
+OTHER = "other"
+
+
+class InstrumentedStorage(Storage):
+    """
+    Times every call to `storage` and counts the documents read and written per
+    bot state property, e.g. `storage.writes.RemindersState`. Documents that
+    hold none of `state_properties` are counted as `other`.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        state_properties: Sequence[str] = (),
+        metrics: MetricsRegistry = METRICS,
+    ):
+        super(InstrumentedStorage, self).__init__()
+        self.storage = storage
+        self.state_properties = tuple(state_properties)
+        self.read_latency = metrics.histogram("storage.read_latency")
+        self.write_latency = metrics.histogram("storage.write_latency")
+        self.delete_latency = metrics.histogram("storage.delete_latency")
+        self.reads = {
+            name: metrics.counter(f"storage.reads.{name}")
+            for name in self.state_properties + (OTHER,)
+        }
+        self.writes = {
+            name: metrics.counter(f"storage.writes.{name}")
+            for name in self.state_properties + (OTHER,)
+        }
+
+    async def read(self, keys: List[str]):
+        with self.read_latency.time():
+            items = await self.storage.read(keys)
+        self._count(self.reads, items.values())
+        return items
+
+    async def write(self, changes: Dict[str, StoreItem]):
+        with self.write_latency.time():
+            await self.storage.write(changes)
+        self._count(self.writes, changes.values())
+
+    async def delete(self, keys: List[str]):
+        with self.delete_latency.time():
+            await self.storage.delete(keys)
+
+    def _count(self, counters, documents: Iterable):
+        for document in documents:
+            counted = False
+            if isinstance(document, dict):
+                for name in self.state_properties:
+                    if name in document:
+                        counters[name].inc()
+                        counted = True
+            if not counted:
+                counters[OTHER].inc()
@@ -0,0 +1,41 @@
+import asyncio
+from typing import Dict, List
+from botbuilder.core import MemoryStorage, Storage, StoreItem
+
+
+class LatencyStorage(Storage):
+    """
+    Local stand-in for a remote storage: delays every call by a fixed latency
+    and counts the calls and keys it sees.
+    """
+
+    def __init__(
+        self,
+        storage: Storage = None,
+        read_latency: float = 0.0,
+        write_latency: float = 0.0,
+    ):
+        super(LatencyStorage, self).__init__()
+        self.storage = storage if storage is not None else MemoryStorage()
+        self.read_latency = read_latency
+        self.write_latency = write_latency
+        self.reads = 0
+        self.writes = 0
+        self.deletes = 0
+        self.keys_written = 0
+
+    async def read(self, keys: List[str]):
+        self.reads += 1
+        await asyncio.sleep(self.read_latency)
+        return await self.storage.read(keys)
+
+    async def write(self, changes: Dict[str, StoreItem]):
+        self.writes += 1
+        self.keys_written += len(changes)
+        await asyncio.sleep(self.write_latency)
+        await self.storage.write(changes)
+
+    async def delete(self, keys: List[str]):
+        self.deletes += 1
+        await asyncio.sleep(self.write_latency)
+        await self.storage.delete(keys)
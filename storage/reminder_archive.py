@@ -0,0 +1,97 @@
+"""
+Cold archive for completed reminders
+"""
+
+from datetime import datetime, timedelta
+from typing import List
+import pytz
+from botbuilder.core import Storage
+from data_models import Reminder, ReminderLog
+
+
+class ReminderArchive:
+    """
+    Keeps `ReminderLog.old_reminders` bounded: completed reminders beyond
+    `max_reminders`, or older than `max_age`, are moved to a per-user archive
+    document that is only read on demand.
+
+    Compaction runs in the turns that change the reminder log, through
+    `compact_turn`: bot state is written without e_tags, so a job writing
+    user documents outside a turn would overwrite the turn's changes.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        max_reminders: int = 50,
+        max_age: timedelta = timedelta(days=30),
+        archive_limit: int = 1000,
+    ):
+        self.storage = storage
+        self.max_reminders = max_reminders
+        self.max_age = max_age
+        self.archive_limit = archive_limit
+        self.archived = 0
+
+    @staticmethod
+    def archive_key(user_key: str) -> str:
+        return f"{user_key}/archive"
+
+    def compact(
+        self, reminder_log: ReminderLog, now: datetime = None
+    ) -> List[Reminder]:
+        """
+        Removes and returns the completed reminders the retention policy evicts.
+        """
+        now = now or datetime.now(pytz.utc)
+        cutoff = (now - self.max_age).timestamp()
+        keep, evicted = [], []
+        for reminder in reminder_log.old_reminders:
+            expired = reminder.due is not None and reminder.due < cutoff
+            (evicted if expired else keep).append(reminder)
+        overflow = len(keep) - self.max_reminders
+        if overflow > 0:
+            evicted.extend(keep[:overflow])
+            keep = keep[overflow:]
+        reminder_log.old_reminders = keep
+        return evicted
+
+    async def compact_turn(self, user_key: str, reminder_log: ReminderLog):
+        evicted = self.compact(reminder_log)
+        if evicted:
+            await self.archive(user_key, evicted)
+
+    async def archive(self, user_key: str, reminders: List[Reminder]):
+        key = self.archive_key(user_key)
+        archived = await self._read(key)
+        # A turn retried after a failed save archives the same reminders again.
+        archived_ids = {reminder.id for reminder in archived}
+        reminders = [
+            reminder for reminder in reminders if reminder.id not in archived_ids
+        ]
+        if not reminders:
+            return
+        archived.extend(reminders)
+        document = {
+            "reminders": [
+                reminder.to_compact() for reminder in archived[-self.archive_limit :]
+            ],
+            "e_tag": "*",
+        }
+        await self.storage.write({key: document})
+        self.archived += len(reminders)
+
+    async def load(self, user_key: str) -> List[Reminder]:
+        return await self._read(self.archive_key(user_key))
+
+    async def find(self, user_key: str, reminder_id: str) -> Reminder:
+        for reminder in await self.load(user_key):
+            if reminder.id == reminder_id:
+                return reminder
+        return None
+
+    async def _read(self, key: str) -> List[Reminder]:
+        document = (await self.storage.read([key])).get(key)
+        if not document:
+            return []
+        return [Reminder.from_compact(values) for values in document["reminders"]]
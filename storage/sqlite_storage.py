@@ -0,0 +1,174 @@
+"""
+Embedded on-disk Storage backed by SQLite in WAL mode
+"""
+
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+import jsonpickle
+from botbuilder.core import Storage, StoreItem
+
+MAX_VARIABLES = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS store (
+    key TEXT PRIMARY KEY,
+    e_tag INTEGER NOT NULL,
+    document TEXT NOT NULL
+);
+"""
+
+
+class SqliteStorage(Storage):
+    """
+    Stores items as jsonpickle documents in a SQLite database.
+
+    Calls run on a small thread pool, each worker holding its own connection,
+    so the event loop never blocks on disk I/O. E_tags follow MemoryStorage
+    semantics: writing an item whose e_tag is neither None nor "*" fails with
+    KeyError when it does not match the stored one.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4, timeout: float = 30.0):
+        super(SqliteStorage, self).__init__()
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="sqlite-storage"
+        )
+        with self._connect() as connection:
+            connection.executescript(SCHEMA)
+
+    async def read(self, keys: List[str]):
+        if not keys:
+            return {}
+        return await self._run(self._read, list(keys))
+
+    async def write(self, changes: Dict[str, StoreItem]):
+        if changes is None:
+            raise Exception("Changes are required when writing")
+        if not changes:
+            return
+        await self._run(self._write, dict(changes))
+
+    async def delete(self, keys: List[str]):
+        if keys:
+            await self._run(self._delete, list(keys))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+
+    async def _run(self, function, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, function, *args)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Each connection is only used by the thread that opened it;
+            # check_same_thread is relaxed so close() can release them all.
+            connection = sqlite3.connect(
+                self.path,
+                timeout=self.timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def _read(self, keys: List[str]) -> Dict[str, object]:
+        connection = self._connect()
+        data = {}
+        for start in range(0, len(keys), MAX_VARIABLES):
+            chunk = keys[start : start + MAX_VARIABLES]
+            rows = connection.execute(
+                f"SELECT key, e_tag, document FROM store WHERE key IN ({_placeholders(chunk)})",
+                chunk,
+            )
+            for key, e_tag, document in rows:
+                item = jsonpickle.decode(document)
+                _set_e_tag(item, str(e_tag))
+                data[key] = item
+        return data
+
+    def _write(self, changes: Dict[str, object]):
+        connection = self._connect()
+        keys = list(changes)
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            current = {}
+            for start in range(0, len(keys), MAX_VARIABLES):
+                chunk = keys[start : start + MAX_VARIABLES]
+                current.update(
+                    connection.execute(
+                        f"SELECT key, e_tag FROM store WHERE key IN ({_placeholders(chunk)})",
+                        chunk,
+                    ).fetchall()
+                )
+
+            rows = []
+            for key, change in changes.items():
+                e_tag = _get_e_tag(change)
+                if e_tag == "":
+                    raise Exception("sqlite_storage.write(): etag missing")
+                if (
+                    key in current
+                    and e_tag not in (None, "*")
+                    and str(e_tag) != str(current[key])
+                ):
+                    raise KeyError(
+                        f"Etag conflict.\nOriginal: {e_tag}\r\nCurrent: {current[key]}"
+                    )
+                rows.append((key, current.get(key, 0) + 1, jsonpickle.encode(change)))
+
+            connection.executemany(
+                "INSERT OR REPLACE INTO store (key, e_tag, document) VALUES (?, ?, ?)",
+                rows,
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _delete(self, keys: List[str]):
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "DELETE FROM store WHERE key = ?", [(key,) for key in keys]
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+
+def _placeholders(values: List) -> str:
+    return ", ".join("?" * len(values))
+
+
+def _get_e_tag(item: object) -> str:
+    if isinstance(item, dict):
+        return item.get("e_tag")
+    return getattr(item, "e_tag", None)
+
+
+def _set_e_tag(item: object, e_tag: str):
+    if isinstance(item, dict):
+        if "e_tag" in item:
+            item["e_tag"] = e_tag
+    elif hasattr(item, "e_tag"):
+        item.e_tag = e_tag
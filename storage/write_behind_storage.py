@@ -0,0 +1,172 @@
+"""
+Storage wrapper with a bounded read cache and write-behind batching
+"""
+
+import asyncio
+import traceback
+from collections import OrderedDict
+from copy import deepcopy
+from typing import Dict, List
+from botbuilder.core import Storage, StoreItem
+from .compare_and_swap import StorageConflictError, is_conflict
+
+
+class WriteBehindStorage(Storage):
+    """
+    Wraps any Storage with:
+
+    - a bounded LRU read cache; items carrying a concrete e_tag are dropped
+      after they are flushed so the next read sees the backend's new e_tag,
+    - write-behind batching: writes are coalesced per key and flushed every
+      `flush_interval` seconds or as soon as `max_batch_size` keys are pending.
+
+    E_tag conflicts detected while flushing are recorded in `conflicts`, the
+    key is evicted from the cache and `flush()` raises StorageConflictError.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        cache_size: int = 10000,
+        flush_interval: float = 0.5,
+        max_batch_size: int = 100,
+    ):
+        super(WriteBehindStorage, self).__init__()
+        self.storage = storage
+        self.cache_size = cache_size
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.conflicts: Dict[str, Exception] = {}
+        self._cache: "OrderedDict[str, object]" = OrderedDict()
+        self._pending: Dict[str, object] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task = None
+
+    async def read(self, keys: List[str]):
+        data = {}
+        missing = []
+        for key in keys or []:
+            if key in self._pending:
+                data[key] = deepcopy(self._pending[key])
+            elif key in self._cache:
+                self._cache.move_to_end(key)
+                data[key] = deepcopy(self._cache[key])
+            else:
+                missing.append(key)
+
+        if missing:
+            items = await self.storage.read(missing)
+            for key, value in items.items():
+                self._cache_item(key, value)
+                data[key] = deepcopy(value)
+        return data
+
+    async def write(self, changes: Dict[str, StoreItem]):
+        if changes is None:
+            raise Exception("Changes are required when writing")
+        for key, change in changes.items():
+            self._check_e_tag(key, change)
+            value = deepcopy(change)
+            self._pending[key] = value
+            self._cache_item(key, value)
+        if len(self._pending) >= self.max_batch_size:
+            await self.flush()
+
+    async def delete(self, keys: List[str]):
+        for key in keys:
+            self._pending.pop(key, None)
+            self._cache.pop(key, None)
+        await self.storage.delete(keys)
+
+    async def flush(self):
+        async with self._flush_lock:
+            pending, self._pending = list(self._pending.items()), {}
+            conflicts = {}
+            for start in range(0, len(pending), self.max_batch_size):
+                batch = dict(pending[start : start + self.max_batch_size])
+                conflicts.update(await self._write_batch(batch))
+            if conflicts:
+                raise StorageConflictError(conflicts)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except StorageConflictError as error:
+                print(f"\n [WriteBehindStorage] {error}")
+            except Exception as exception:
+                print(f"\n [WriteBehindStorage] flush failed: {exception}")
+                traceback.print_exc()
+
+    async def _write_batch(self, batch: Dict[str, object]) -> Dict[str, Exception]:
+        try:
+            await self.storage.write(batch)
+        except Exception as exception:
+            if len(batch) > 1:
+                # Isolate the failing keys by writing the batch one item at a time.
+                conflicts = {}
+                for key, value in batch.items():
+                    conflicts.update(await self._write_batch({key: value}))
+                return conflicts
+
+            key, value = next(iter(batch.items()))
+            self._cache.pop(key, None)
+            if is_conflict(exception):
+                self.conflicts[key] = exception
+                return {key: exception}
+            # Transient failure: retry on the next flush unless a newer write is queued.
+            print(f"\n [WriteBehindStorage] write of {key} failed: {exception}")
+            self._pending.setdefault(key, value)
+            return {}
+
+        self._after_write(batch)
+        return {}
+
+    def _after_write(self, batch: Dict[str, object]):
+        for key, value in batch.items():
+            if self._e_tag(value) not in (None, "*"):
+                self._cache.pop(key, None)
+
+    def _cache_item(self, key: str, value: object):
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _check_e_tag(self, key: str, change: object):
+        e_tag = self._e_tag(change)
+        cached_e_tag = self._e_tag(self._cache.get(key))
+        if (
+            e_tag not in (None, "*")
+            and cached_e_tag is not None
+            and key not in self._pending
+            and e_tag != cached_e_tag
+        ):
+            raise StorageConflictError(
+                {
+                    key: KeyError(
+                        f"Etag conflict. Original: {e_tag} Current: {cached_e_tag}"
+                    )
+                }
+            )
+
+    @staticmethod
+    def _e_tag(item: object) -> str:
+        if isinstance(item, dict):
+            return item.get("e_tag")
+        return getattr(item, "e_tag", None)
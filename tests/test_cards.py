@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import pytest
+import pytz
+from data_models import Reminder
+from resources import Cards, CardTemplate, Slot
+
+
+def make_reminder(hour):
+    reminder = Reminder("Call Mom")
+    reminder.reminder_time = datetime(2020, 5, 1, hour, 5)
+    return reminder
+
+
+class TestCardTemplate:
+    def test_bind_copies_only_slot_paths(self):
+        template = CardTemplate(
+            {"body": [{"text": Slot("title")}, {"text": "static"}], "id": ""}
+        )
+
+        first = template.bind(title="first")
+        second = template.bind(title="second")
+
+        assert first["body"][0]["text"] == "first"
+        assert second["body"][0]["text"] == "second"
+        assert first["body"][1] is template.card["body"][1]
+        assert isinstance(template.card["body"][0]["text"], Slot)
+
+    def test_missing_values_are_rejected(self):
+        template = CardTemplate({"text": Slot("title")})
+        with pytest.raises(TypeError):
+            template.bind()
+
+
+class TestCards:
+    @pytest.mark.parametrize("hour", [0, 9, 12, 23])
+    def test_reminder_card_matches_strftime(self, hour):
+        reminder = make_reminder(hour)
+        card = Cards.reminder_card(reminder)
+
+        assert card["body"][0]["text"] == "Call Mom"
+        assert card["body"][1]["text"] == reminder.reminder_time.strftime(
+            "%Y-%m-%d %I:%M %p"
+        )
+        assert card["actions"][0]["data"]["reminder_id"] == reminder.id
+
+    def test_times_are_shown_in_the_given_timezone(self):
+        reminder = Reminder("Call Mom")
+        reminder.reminder_time = datetime(2020, 5, 1, 9, 5, tzinfo=pytz.utc)
+
+        card = Cards.reminder_card(reminder, pytz.timezone("America/New_York"))
+
+        assert card["body"][1]["text"] == "2020-05-01 05:05 AM"
+
+    def test_snooze_card_binds_reminder_id(self):
+        reminder = make_reminder(9)
+        card = Cards.snooze_card(reminder)
+
+        assert [action["data"]["reminder_id"] for action in card["actions"]] == [
+            reminder.id,
+            reminder.id,
+        ]
@@ -0,0 +1,286 @@
+from copy import deepcopy
+from datetime import datetime, timedelta
+
+import jsonpickle
+import pytest
+import pytz
+from clock import SYSTEM_CLOCK, VirtualClock
+from data_models import (
+    ActivityMappingState,
+    RecurrenceRule,
+    Reminder,
+    ReminderLog,
+)
+from data_models.activity_mapping_state import EVICTIONS, MAX_ACTIVITIES, MAX_AGE
+
+LEGACY_DOCUMENT = (
+    '{"py/object": "data_models.reminder_log.ReminderLog", "new_reminders": ['
+    '{"py/object": "data_models.reminder.Reminder", "title": "Legacy", '
+    '"_reminder_time": {"py/object": "datetime.datetime", "__reduce__": '
+    '[{"py/type": "datetime.datetime"}, ["B+QFAQ0AAAAAAA==", {"py/reduce": '
+    '[{"py/function": "pytz._p"}, {"py/tuple": ["Africa/Nairobi", 10800, 0, "EAT"]}]}]]}, '
+    '"done": false, "id": "Reminder-6f1c3a1e-0000-4000-8000-000000000000"}], '
+    '"old_reminders": [], "e_tag": "*"}'
+)
+
+
+def make_reminder(title, due_time):
+    reminder = Reminder(title)
+    reminder.reminder_time = due_time
+    return reminder
+
+
+class TestReminderLog:
+    def test_peek_returns_earliest_reminder(self):
+        now = datetime.now(pytz.utc).replace(microsecond=0)
+        reminder_log = ReminderLog()
+        for minutes in (30, 5, 60, 10):
+            reminder_log.add(
+                make_reminder(str(minutes), now + timedelta(minutes=minutes))
+            )
+
+        assert reminder_log.peek().title == "5"
+        assert reminder_log.next_due_time == now + timedelta(minutes=5)
+
+    def test_pop_due_returns_all_due_reminders_in_order(self):
+        now = datetime.now()
+        reminder_log = ReminderLog()
+        for minutes in (1, -5, 0, -1):
+            reminder_log.add(
+                make_reminder(str(minutes), now + timedelta(minutes=minutes))
+            )
+
+        due = reminder_log.pop_due(now)
+
+        assert [reminder.title for reminder in due] == ["-5", "-1", "0"]
+        assert [reminder.title for reminder in reminder_log.new_reminders] == ["1"]
+        assert reminder_log.pop_due(now) == []
+
+    def test_remove_keeps_heap_order(self):
+        now = datetime.now()
+        reminder_log = ReminderLog()
+        reminders = [
+            make_reminder(str(minutes), now + timedelta(minutes=minutes))
+            for minutes in (5, 1, 10, 3)
+        ]
+        for reminder in reminders:
+            reminder_log.add(reminder)
+        done = make_reminder("done", now)
+        reminder_log.old_reminders.append(done)
+
+        assert reminder_log.remove(reminders[1].id) is reminders[1]
+        assert reminder_log.remove(done.id) is done
+        assert reminder_log.remove("missing") is None
+        assert [reminder_log.pop().title for _ in range(3)] == ["3", "5", "10"]
+
+    def test_unsorted_legacy_log_is_heapified(self):
+        now = datetime.now()
+        reminder_log = ReminderLog()
+        del reminder_log.heap_version
+        reminder_log.new_reminders = [
+            make_reminder(str(minutes), now + timedelta(minutes=minutes))
+            for minutes in (10, 1, 5)
+        ]
+
+        assert reminder_log.pop().title == "1"
+
+
+class TestReminderSerialization:
+    def make_log(self):
+        reminder_log = ReminderLog()
+        reminder = Reminder("Call Mom")
+        reminder.reminder_time = datetime(2020, 5, 1, 10, 0, tzinfo=pytz.utc)
+        reminder_log.add(reminder)
+        reminder_log.old_reminders.append(Reminder("Done", done=True))
+        return reminder_log
+
+    def test_compact_round_trip(self):
+        reminder_log = self.make_log()
+        restored = jsonpickle.decode(jsonpickle.encode(reminder_log))
+
+        original = reminder_log.new_reminders[0]
+        reminder = restored.new_reminders[0]
+        assert (reminder.id, reminder.title, reminder.done) == (
+            original.id,
+            original.title,
+            False,
+        )
+        assert reminder.reminder_time == original.reminder_time
+        assert restored.old_reminders[0].done
+        assert restored.e_tag == "*"
+
+    def test_deepcopy_uses_compact_state(self):
+        reminder_log = self.make_log()
+        copied = deepcopy(reminder_log)
+
+        assert copied.peek().id == reminder_log.peek().id
+
+    def test_due_time_is_utc_epoch_seconds(self):
+        reminder = Reminder("Call Mom")
+        reminder.reminder_time = pytz.timezone("America/New_York").localize(
+            datetime(2020, 5, 1, 6)
+        )
+
+        assert reminder.due == 1588327200
+        assert reminder.to_compact()[2] == reminder.due
+        assert reminder.local_time(pytz.utc) == datetime(
+            2020, 5, 1, 10, tzinfo=pytz.utc
+        )
+
+    def test_non_uuid_ids_are_preserved(self):
+        reminder = Reminder("Custom")
+        reminder.id = "custom-id"
+
+        assert Reminder.from_compact(reminder.to_compact()).id == "custom-id"
+
+    def test_legacy_documents_are_migrated(self):
+        reminder_log = jsonpickle.decode(LEGACY_DOCUMENT)
+
+        reminder = reminder_log.peek()
+        assert reminder.title == "Legacy"
+        assert reminder.id == "Reminder-6f1c3a1e-0000-4000-8000-000000000000"
+        assert reminder.reminder_time == datetime(2020, 5, 1, 10, 0, tzinfo=pytz.utc)
+        assert '"v": 1' in jsonpickle.encode(reminder_log)
+
+
+class TestReminderTime:
+    def test_clock_times_resolve_to_the_clock_date(self):
+        Reminder.clock = VirtualClock(datetime(2020, 2, 29, 8).timestamp())
+        try:
+            reminder = make_reminder("Standup", "09:30")
+        finally:
+            Reminder.clock = SYSTEM_CLOCK
+
+        assert reminder.reminder_time.date() == datetime(2020, 2, 29).date()
+        assert (reminder.reminder_time.hour, reminder.reminder_time.minute) == (9, 30)
+
+
+def epoch(timezone, *args):
+    return int(pytz.timezone(timezone).localize(datetime(*args)).timestamp())
+
+
+class TestRecurrenceRule:
+    def test_weekly_rule_fires_on_the_next_matching_day(self):
+        rule = RecurrenceRule.weekly([1], 9)
+        # Friday 1 May 2020, 10:00 in Nairobi.
+        after = epoch("Africa/Nairobi", 2020, 5, 1, 10)
+
+        assert rule.next_after(after) == epoch("Africa/Nairobi", 2020, 5, 4, 9)
+        assert rule.next_after(epoch("Africa/Nairobi", 2020, 5, 4, 9)) == epoch(
+            "Africa/Nairobi", 2020, 5, 11, 9
+        )
+
+    def test_weekday_rule_skips_the_weekend(self):
+        rule = RecurrenceRule.weekdays(8, 30)
+        after = epoch("Africa/Nairobi", 2020, 5, 1, 9)
+
+        assert rule.next_after(after) == epoch("Africa/Nairobi", 2020, 5, 4, 8, 30)
+
+    def test_monthly_rule_skips_months_without_the_day(self):
+        rule = RecurrenceRule.monthly(31, 12)
+        after = epoch("Africa/Nairobi", 2020, 3, 31, 13)
+
+        assert rule.next_after(after) == epoch("Africa/Nairobi", 2020, 5, 31, 12)
+
+    def test_local_time_is_kept_across_daylight_saving_changes(self):
+        rule = RecurrenceRule("0 9 * * *", "America/New_York")
+        # New York moved to daylight saving time on 8 March 2020.
+        first = rule.next_after(epoch("America/New_York", 2020, 3, 6, 10))
+        second = rule.next_after(first)
+
+        assert first == epoch("America/New_York", 2020, 3, 7, 9)
+        assert second == epoch("America/New_York", 2020, 3, 8, 9)
+        assert second - first == 23 * 3600
+
+    def test_cron_day_fields_match_either_day(self):
+        rule = RecurrenceRule("0 9 1 * mon")
+        after = epoch("Africa/Nairobi", 2020, 5, 1, 10)
+
+        assert rule.next_after(after) == epoch("Africa/Nairobi", 2020, 5, 4, 9)
+
+    def test_rules_from_luis_set_entities(self):
+        assert RecurrenceRule.from_timex(["XXXX-WXX-1T09"]).expression == "0 9 * * 1"
+        assert RecurrenceRule.from_timex(["P1D", "T07"]).expression == "0 7 * * *"
+        assert (
+            RecurrenceRule.from_timex(["P1M", "XXXX-XX-15T10"]).expression
+            == "0 10 15 * *"
+        )
+        assert RecurrenceRule.from_timex(["P1M"]) is None
+
+    def test_invalid_expressions_are_rejected(self):
+        with pytest.raises(ValueError):
+            RecurrenceRule("0 25 * * *")
+
+    def test_descriptions(self):
+        assert RecurrenceRule.weekdays(9).describe() == "weekdays at 09:00"
+        assert RecurrenceRule.weekly([1, 4], 18).describe() == (
+            "every Mon, Thu at 18:00"
+        )
+        assert RecurrenceRule("*/15 * * * *").describe() == "cron */15 * * * *"
+
+    def test_recurring_reminders_keep_their_rule_when_stored(self):
+        reminder = Reminder("Standup")
+        reminder.recurrence = RecurrenceRule.weekdays(9, 30)
+        reminder.due = reminder.recurrence.next_after(0)
+
+        restored = Reminder.from_compact(reminder.to_compact())
+
+        assert restored.recurrence.to_compact() == ["30 9 * * 1-5", None]
+        assert restored.due == reminder.due
+        assert len(Reminder("One-off").to_compact()) == 4
+
+    def test_advance_skips_missed_occurrences(self):
+        reminder = Reminder("Standup")
+        reminder.recurrence = RecurrenceRule.daily(9)
+        reminder.due = epoch("Africa/Nairobi", 2020, 5, 1, 9)
+
+        assert reminder.advance(epoch("Africa/Nairobi", 2020, 5, 3, 12))
+        assert reminder.due == epoch("Africa/Nairobi", 2020, 5, 4, 9)
+        assert not Reminder("One-off").advance(0)
+
+
+class TestActivityMappingState:
+    def test_least_recently_used_entries_are_evicted(self):
+        state = ActivityMappingState()
+        for index in range(MAX_ACTIVITIES):
+            state.set(f"r{index}", f"a{index}", now=0)
+        assert state.get("r0", now=0) == "a0"
+        evictions = EVICTIONS.value
+
+        state.set("new", "a-new", now=0)
+
+        assert state.get("r1", now=0) is None
+        assert state.get("r0", now=0) == "a0"
+        assert len(state.activities) == MAX_ACTIVITIES
+        assert state.evictions == 1
+        assert EVICTIONS.value == evictions + 1
+
+    def test_expired_entries_are_evicted(self):
+        state = ActivityMappingState()
+        state.set("old", "a1", now=0)
+        state.set("recent", "a1", now=MAX_AGE)
+
+        assert state.pop("old", now=MAX_AGE + 1) is None
+        assert state.is_referenced("a1", now=MAX_AGE + 1)
+        assert state.pop("recent", now=MAX_AGE + 1) == "a1"
+        assert not state.is_referenced("a1", now=MAX_AGE + 1)
+
+    def test_compact_round_trip(self):
+        reminder = Reminder("Call Mom")
+        state = ActivityMappingState()
+        state.set(reminder.id, "activity-1", now=100)
+        state.set("Other", "activity-2", now=200)
+
+        encoded = jsonpickle.encode(state)
+        restored = jsonpickle.decode(encoded)
+
+        assert reminder.id not in encoded
+        assert list(restored.activities.items()) == list(state.activities.items())
+
+    def test_legacy_mapping_is_migrated(self):
+        restored = jsonpickle.decode(
+            '{"py/object": "data_models.activity_mapping_state.ActivityMappingState",'
+            ' "activities": {"Reminder-1": "activity-1"}}'
+        )
+
+        assert restored.get("Reminder-1") == "activity-1"
@@ -0,0 +1,360 @@
+from datetime import datetime, timedelta
+
+import aiounittest
+import pytz
+from botbuilder.core import (
+    IntentScore,
+    MemoryStorage,
+    RecognizerResult,
+    TurnContext,
+    UserState,
+)
+from botbuilder.core.adapters import TestAdapter
+from botbuilder.schema import (
+    Activity,
+    ActivityTypes,
+    ChannelAccount,
+    ConversationAccount,
+)
+from data_models import RecurrenceRule, Reminder, ReminderLog
+from helpers import (
+    CircuitBreaker,
+    CommandRouter,
+    Intent,
+    Messages,
+    RecognizerCache,
+    ReminderHelper,
+    TimezoneHelper,
+)
+from helpers.reminder_helper import DISPATCH_LAG
+from recognizers import RuleBasedRecognizer
+from scheduler import ReminderScheduler
+from storage import DispatchJournal
+
+
+class TestCommandRouter:
+    def test_routes_exact_commands(self):
+        assert CommandRouter.route("Help") == (Intent.HELP.value, None)
+        assert CommandRouter.route("?") == (Intent.HELP.value, None)
+        assert CommandRouter.route("quit") == (Intent.CANCEL.value, None)
+        assert CommandRouter.route("Show All Reminders") == (
+            Intent.SHOW_REMINDERS.value,
+            None,
+        )
+        assert CommandRouter.route("DELETE Reminder-1") == (
+            Intent.DELETE_REMINDER.value,
+            None,
+        )
+
+    def test_routes_show_page(self):
+        assert CommandRouter.route("SHOW PAGE 3") == (Intent.SHOW_REMINDERS.value, 3)
+
+    def test_routes_snooze_card_action(self):
+        intent, reminder = CommandRouter.route("UPDATE Reminder-1 in 10 minutes")
+        expected = datetime.now().astimezone(pytz.timezone("Africa/Nairobi"))
+
+        assert intent == Intent.SNOOZE_REMINDER.value
+        assert reminder.id == "Reminder-1"
+        delta = reminder.reminder_time - expected
+        assert timedelta(minutes=9) < delta <= timedelta(minutes=10)
+
+    def test_snooze_is_relative_to_now(self):
+        now = datetime(2020, 1, 1, 12, tzinfo=pytz.utc)
+        _, reminder = CommandRouter.route("UPDATE Reminder-1 in 2 hours", now)
+
+        assert reminder.reminder_time == now + timedelta(hours=2)
+
+    def test_routes_timezone_command(self):
+        assert CommandRouter.route("set timezone to Europe/London") == (
+            Intent.SET_TIMEZONE.value,
+            "Europe/London",
+        )
+        assert CommandRouter.route("timezone America/New_York") == (
+            Intent.SET_TIMEZONE.value,
+            "America/New_York",
+        )
+
+    def test_free_form_text_falls_through(self):
+        assert CommandRouter.route("remind me to go in 10 seconds") is None
+        assert CommandRouter.route("delete") is None
+        assert CommandRouter.route(None) is None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def make_result(text, entities=None):
+    return RecognizerResult(
+        text=text,
+        intents={"CreateReminder": IntentScore(0.9)},
+        entities=entities or {},
+    )
+
+
+class TestRecognizerCache:
+    def test_hits_on_normalized_utterance(self):
+        cache = RecognizerCache()
+        cache.set("Show all reminders", make_result("Show all reminders"))
+
+        result = cache.get("  show ALL   reminders! ")
+
+        assert result.intents["CreateReminder"].score == 0.9
+        assert result.text == "  show ALL   reminders! "
+        assert (cache.hits, cache.misses) == (1, 0)
+
+    def test_expires_and_evicts_least_recently_used(self):
+        clock = FakeClock()
+        cache = RecognizerCache(max_size=2, ttl=10, clock=clock)
+        cache.set("a", make_result("a"))
+        cache.set("b", make_result("b"))
+        cache.get("a")
+        cache.set("c", make_result("c"))
+
+        assert cache.get("b") is None
+        assert cache.evictions == 1
+        clock.now = 11
+        assert cache.get("a") is None
+        assert cache.misses == 2
+
+    def test_re_resolves_relative_datetimes(self):
+        stale = {"datetime": [{"timex": ["2000-01-01T00:00:00"], "type": "datetime"}]}
+        cache = RecognizerCache()
+        cache.set("remind me to go in 10 minutes", make_result("", stale))
+
+        result = cache.get("remind me to go in 10 minutes")
+        resolved = datetime.strptime(
+            result.entities["datetime"][0]["timex"][0], "%Y-%m-%dT%H:%M:%S"
+        )
+
+        assert abs(resolved - datetime.utcnow() - timedelta(minutes=10)) < timedelta(
+            seconds=5
+        )
+
+    def test_keeps_recurrences(self):
+        text = "remind me to stand up every weekday at 9:30am"
+        recognizer_result = RuleBasedRecognizer().recognize_text(text)
+        cache = RecognizerCache()
+        cache.set(text, recognizer_result)
+
+        result = cache.get(text)
+
+        assert result.entities["datetime"] == recognizer_result.entities["datetime"]
+        assert result.entities["datetime"][0]["type"] == "set"
+        assert cache.hits == 1
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_and_half_opens_after_timeout(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_request()
+
+        clock.now = 30
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_trial_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.trips == 2
+
+
+class FailingAdapter(TestAdapter):
+    def __init__(self, fail_on):
+        super().__init__()
+        self.fail_on = fail_on
+        self.sent = 0
+
+    async def send_activities(self, context, activities):
+        self.sent += 1
+        if self.sent in self.fail_on:
+            raise ConnectionError("send failed")
+        return await super().send_activities(context, activities)
+
+
+class TestTimezoneHelper(aiounittest.AsyncTestCase):
+    async def test_channel_timezone_is_kept_in_user_state(self):
+        user_state = UserState(MemoryStorage())
+        accessor = user_state.create_property("TimezoneState")
+        activity = Activity(
+            type=ActivityTypes.message,
+            channel_id="test",
+            from_property=ChannelAccount(id="user"),
+            conversation=ConversationAccount(id="conversation"),
+            local_timezone="America/New_York",
+        )
+        turn_context = TurnContext(TestAdapter(), activity)
+
+        timezone = await TimezoneHelper.resolve(turn_context, accessor)
+        activity.local_timezone = "Asia/Tokyo"
+
+        assert timezone.zone == "America/New_York"
+        assert (await TimezoneHelper.resolve(turn_context, accessor)) is timezone
+
+    async def test_unknown_timezones_fall_back_to_the_default(self):
+        activity = Activity(
+            channel_id="test",
+            from_property=ChannelAccount(id="user"),
+            local_timezone="Mars/Olympus_Mons",
+        )
+        turn_context = TurnContext(TestAdapter(), activity)
+        user_state = UserState(MemoryStorage())
+
+        timezone = await TimezoneHelper.resolve(
+            turn_context, user_state.create_property("TimezoneState")
+        )
+
+        assert timezone.zone == "Africa/Nairobi"
+        assert TimezoneHelper.get_timezone("Mars/Olympus_Mons") is None
+
+
+class TestReminderHelper(aiounittest.AsyncTestCase):
+    def setUp(self):
+        self.storage = MemoryStorage()
+        self.journal = DispatchJournal(self.storage)
+
+    def make_context(self, adapter):
+        activity = Activity(
+            type=ActivityTypes.message,
+            channel_id="test",
+            from_property=ChannelAccount(id="user"),
+            recipient=ChannelAccount(id="bot"),
+            conversation=ConversationAccount(id="conversation"),
+        )
+        return TurnContext(adapter, activity)
+
+    async def remind(self, adapter, now=None, scheduler=None):
+        user_state = UserState(self.storage)
+        accessor = user_state.create_property("RemindersState")
+        turn_context = self.make_context(adapter)
+        try:
+            await ReminderHelper.remind_user(
+                turn_context,
+                accessor,
+                journal=self.journal,
+                now=now,
+                scheduler=scheduler,
+            )
+        finally:
+            await user_state.save_changes(turn_context)
+
+    async def add_due_reminders(self, *titles):
+        reminder_log = ReminderLog()
+        for minutes, title in enumerate(titles):
+            reminder = Reminder(title)
+            reminder.reminder_time = datetime.now(pytz.utc) - timedelta(
+                minutes=len(titles) - minutes
+            )
+            reminder_log.add(reminder)
+        await self.storage.write({"test/users/user": {"RemindersState": reminder_log}})
+        return reminder_log
+
+    async def test_failed_send_keeps_unsent_reminders_pending(self):
+        await self.add_due_reminders("first", "second")
+
+        with self.assertRaises(ConnectionError):
+            await self.remind(FailingAdapter(fail_on={2}))
+        adapter = FailingAdapter(fail_on=set())
+        await self.remind(adapter)
+
+        [activity] = adapter.activity_buffer
+        assert "second" in str(activity.attachments[0].content)
+        entries = await self.journal.load("test/users/user")
+        assert sorted(entry[:2] for entry in entries.values()) == [
+            [1, "sent"],
+            [2, "sent"],
+        ]
+
+    async def test_dispatch_lag_is_recorded_per_sent_reminder(self):
+        await self.add_due_reminders("first", "second")
+        count = DISPATCH_LAG.count
+
+        await self.remind(FailingAdapter(fail_on=set()))
+
+        assert DISPATCH_LAG.count == count + 2
+
+    async def test_journaled_reminders_are_not_resent(self):
+        reminder_log = await self.add_due_reminders("sent")
+        entries = {}
+        self.journal.record(entries, reminder_log.peek(), self.journal.SENT)
+        await self.journal.save("test/users/user", entries)
+
+        adapter = FailingAdapter(fail_on=set())
+        await self.remind(adapter)
+
+        assert adapter.sent == 0
+        stored = (await self.storage.read(["test/users/user"]))["test/users/user"]
+        assert stored["RemindersState"].old_reminders[0].done
+
+    async def test_reminders_later_in_the_minute_are_not_sent_early(self):
+        now = datetime(2030, 1, 1, 9, 0, 10, tzinfo=pytz.utc)
+        reminder_log = ReminderLog()
+        reminder = Reminder("later")
+        reminder.reminder_time = now + timedelta(seconds=40)
+        reminder_log.add(reminder)
+        await self.storage.write({"test/users/user": {"RemindersState": reminder_log}})
+
+        adapter = FailingAdapter(fail_on=set())
+        await self.remind(adapter, now=now)
+
+        assert adapter.sent == 0
+        stored = (await self.storage.read(["test/users/user"]))["test/users/user"]
+        assert [r.title for r in stored["RemindersState"].new_reminders] == ["later"]
+
+    async def test_missed_reminders_are_batched_after_downtime(self):
+        await self.add_due_reminders(*[str(index) for index in range(12)])
+        on_time = Reminder("on time")
+        on_time.reminder_time = datetime.now(pytz.utc) + timedelta(hours=1)
+        upcoming = Reminder("upcoming")
+        upcoming.reminder_time = datetime.now(pytz.utc) + timedelta(hours=2)
+        stored = (await self.storage.read(["test/users/user"]))["test/users/user"]
+        stored["RemindersState"].add(on_time)
+        stored["RemindersState"].add(upcoming)
+
+        adapter = FailingAdapter(fail_on=set())
+        await self.remind(adapter, now=on_time.reminder_time + timedelta(seconds=30))
+
+        catch_up, last_catch_up, reminder = adapter.activity_buffer
+        assert catch_up.text == Messages.missed_reminders.format(count=12)
+        assert [len(catch_up.attachments), len(last_catch_up.attachments)] == [10, 2]
+        assert "on time" in str(reminder.attachments[0].content)
+        stored = (await self.storage.read(["test/users/user"]))["test/users/user"]
+        assert [r.title for r in stored["RemindersState"].new_reminders] == ["upcoming"]
+        assert len(stored["RemindersState"].old_reminders) == 13
+
+    async def test_recurring_reminders_are_rearmed_after_delivery(self):
+        reminder_log = await self.add_due_reminders("standup")
+        reminder = reminder_log.peek()
+        reminder.recurrence = RecurrenceRule.daily(9)
+        await self.storage.write({"test/users/user": {"RemindersState": reminder_log}})
+        scheduler = ReminderScheduler(None)
+
+        adapter = FailingAdapter(fail_on=set())
+        await self.remind(adapter, scheduler=scheduler)
+
+        assert adapter.sent == 1
+        stored = (await self.storage.read(["test/users/user"]))["test/users/user"]
+        [rearmed] = stored["RemindersState"].new_reminders
+        assert stored["RemindersState"].old_reminders == []
+        assert (rearmed.id, rearmed.done) == (reminder.id, False)
+        assert rearmed.due > datetime.now(pytz.utc).timestamp()
+        assert rearmed.local_time().hour == 9
+        assert scheduler.next_due() == rearmed.due
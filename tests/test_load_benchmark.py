@@ -0,0 +1,14 @@
+import aiounittest
+from benchmarks.load_benchmark import LoadBenchmark
+
+
+class TestLoadBenchmark(aiounittest.AsyncTestCase):
+    async def test_users_create_receive_and_snooze_reminders(self):
+        report = await LoadBenchmark(users=3, reminders=2).run()
+
+        # Two reminders and "show" per user, then a snooze per reminder and "show".
+        assert report.turns == 3 * (2 + 1) * 2
+        assert report.dispatched == 6
+        assert len(report.latencies) == report.turns
+        assert report.writes["RemindersState"] > 0
+        assert report.state_bytes > 0
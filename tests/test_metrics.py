@@ -0,0 +1,67 @@
+import json
+
+import aiounittest
+from botbuilder.core import MemoryStorage
+from metrics import LatencyHistogram, MetricsRegistry
+from storage import InstrumentedStorage
+
+
+class TestLatencyHistogram:
+    def test_observations_land_in_upper_bounded_buckets(self):
+        histogram = LatencyHistogram(buckets=(0.01, 0.1, 1.0))
+        for seconds in (0.005, 0.01, 0.05, 0.5, 2.0):
+            histogram.observe(seconds)
+
+        assert histogram.counts == [2, 1, 1, 1]
+        assert histogram.count == 5
+        assert histogram.percentile(0.5) == 0.1
+        assert histogram.percentile(0.99) is None
+        assert histogram.to_dict()["buckets"]["+Inf"] == 1
+        assert (
+            json.loads(json.dumps(histogram.to_dict(), allow_nan=False))["p99"] is None
+        )
+
+    def test_empty_histogram(self):
+        assert LatencyHistogram().percentile(0.99) == 0.0
+
+
+class TestMetricsRegistry:
+    def test_metrics_are_created_once_and_reported_by_name(self):
+        registry = MetricsRegistry()
+        registry.counter("turns").inc()
+        registry.counter("turns").inc(2)
+        registry.histogram("latency").observe(0.02)
+
+        report = registry.to_dict()
+        assert list(report) == ["latency", "turns"]
+        assert report["turns"] == 3
+        assert report["latency"]["count"] == 1
+
+
+class TestInstrumentedStorage(aiounittest.AsyncTestCase):
+    async def test_reads_and_writes_are_counted_per_state_property(self):
+        registry = MetricsRegistry()
+        storage = InstrumentedStorage(
+            MemoryStorage(), ("RemindersState", "DialogState"), registry
+        )
+
+        await storage.write(
+            {
+                "user": {"RemindersState": {}},
+                "conversation": {"DialogState": {}},
+                "lease": {"owner": None},
+            }
+        )
+        items = await storage.read(["user", "missing"])
+        await storage.delete(["lease"])
+
+        report = registry.to_dict()
+        assert "user" in items
+        assert report["storage.writes.RemindersState"] == 1
+        assert report["storage.writes.DialogState"] == 1
+        assert report["storage.writes.other"] == 1
+        assert report["storage.reads.RemindersState"] == 1
+        assert report["storage.reads.DialogState"] == 0
+        assert report["storage.write_latency"]["count"] == 1
+        assert report["storage.read_latency"]["count"] == 1
+        assert report["storage.delete_latency"]["count"] == 1
@@ -0,0 +1,92 @@
+import asyncio
+
+import aiounittest
+from botbuilder.core.adapters import TestAdapter
+from botbuilder.schema import ChannelAccount, ConversationAccount, ConversationReference
+from scheduler import ProactiveDispatcher
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FakeHttpError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code)
+
+
+class FakeAdapter:
+    def __init__(self, failures=None):
+        self.failures = failures or {}
+        self.delivered = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def continue_conversation(self, reference, callback, bot_id):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            pending = self.failures.get(reference.activity_id, [])
+            if pending:
+                raise FakeHttpError(pending.pop(0))
+            self.delivered.append(reference.activity_id)
+        finally:
+            self.in_flight -= 1
+
+
+def make_references(count):
+    return [
+        ConversationReference(activity_id=str(index), channel_id="test")
+        for index in range(count)
+    ]
+
+
+class TestProactiveDispatcher(aiounittest.AsyncTestCase):
+    async def test_fans_out_to_every_conversation(self):
+        adapter = FakeAdapter()
+        dispatcher = ProactiveDispatcher(adapter, "bot", concurrency=5, batch_size=7)
+        report = await dispatcher.dispatch(make_references(20), None)
+
+        assert sorted(adapter.delivered, key=int) == [str(i) for i in range(20)]
+        assert adapter.max_in_flight == 5
+        assert report.attempted == report.delivered == 20
+
+    async def test_retries_transient_failures_only(self):
+        adapter = FakeAdapter(failures={"0": [429, 503], "1": [403]})
+        dispatcher = ProactiveDispatcher(adapter, "bot", backoff=0.001)
+        report = await dispatcher.dispatch(make_references(2), None)
+
+        assert adapter.delivered == ["0"]
+        assert report.retries == 2
+        assert report.failed == 1
+        assert [reference.activity_id for reference in report.failed_references] == [
+            "1"
+        ]
+
+    async def test_callback_failures_are_reported_despite_on_turn_error(self):
+        handled = []
+
+        async def on_turn_error(turn_context, error):
+            handled.append(error)
+
+        async def callback(turn_context):
+            raise ConnectionError("send failed")
+
+        adapter = TestAdapter()
+        adapter.on_turn_error = on_turn_error
+        reference = ConversationReference(
+            channel_id="test",
+            service_url="https://test.com",
+            user=ChannelAccount(id="user"),
+            bot=ChannelAccount(id="bot"),
+            conversation=ConversationAccount(id="conversation"),
+        )
+        dispatcher = ProactiveDispatcher(adapter, "bot")
+        report = await dispatcher.dispatch([reference], callback)
+
+        assert handled == []
+        assert (report.delivered, report.failed) == (0, 1)
+        assert report.failed_references == [reference]
@@ -0,0 +1,116 @@
+import asyncio
+from datetime import datetime
+
+import aiounittest
+from botbuilder.ai.luis import LuisRecognizer
+from botbuilder.core import IntentScore, RecognizerResult
+from data_models import RecurrenceRule
+from helpers import CircuitBreaker
+from metrics import METRICS
+from recognizers import (
+    FallbackRecognizer,
+    RecognizerUnavailableError,
+    RuleBasedRecognizer,
+)
+
+NOW = datetime(2020, 5, 1, 8, 0, 0)
+
+
+class TestRuleBasedRecognizer:
+    def recognize(self, text):
+        result = RuleBasedRecognizer().recognize_text(text, NOW)
+        return LuisRecognizer.top_intent(result), result
+
+    def test_create_reminder_with_title_and_relative_time(self):
+        intent, result = self.recognize("remind me to go in 10 seconds")
+
+        assert intent == "CreateReminder"
+        assert result.entities["$instance"]["reminder_title"][0]["text"] == "go"
+        assert result.entities["datetime"][0]["timex"] == ["2020-05-01T08:00:10"]
+
+    def test_create_reminder_with_clock_time(self):
+        intent, result = self.recognize("set a reminder to pay rent tomorrow at 9:30pm")
+
+        assert intent == "CreateReminder"
+        assert result.entities["$instance"]["reminder_title"][0]["text"] == "pay rent"
+        assert result.entities["datetime"][0]["timex"] == ["2020-05-02T21:30:00"]
+
+    def test_create_recurring_reminder(self):
+        intent, result = self.recognize("remind me to call mom every Monday at 9")
+
+        assert intent == "CreateReminder"
+        assert result.entities["$instance"]["reminder_title"][0]["text"] == "call mom"
+        assert result.entities["datetime"] == [
+            {"timex": ["XXXX-WXX-1T09:00"], "type": "set"}
+        ]
+        rule = RecurrenceRule.from_timex(result.entities["datetime"][0]["timex"])
+        assert rule.expression == "0 9 * * 1"
+
+    def test_create_reminder_every_weekday(self):
+        _, result = self.recognize("remind me to stand up every weekday at 9:30am")
+
+        rule = RecurrenceRule.from_timex(result.entities["datetime"][0]["timex"])
+        assert rule.expression == "30 9 * * 1,2,3,4,5"
+
+    def test_create_reminder_without_entities(self):
+        intent, result = self.recognize("Set Reminder")
+
+        assert intent == "CreateReminder"
+        assert result.entities == {}
+
+    def test_other_intents(self):
+        assert self.recognize("Show All Reminders")[0] == "ShowReminders"
+        assert self.recognize("help")[0] == "Help"
+        assert self.recognize("UPDATE Reminder-1 in 5 minutes")[0] == "Snooze"
+        assert self.recognize("good morning")[0] == "None"
+
+
+class SlowRecognizer:
+    async def recognize(self, turn_context):
+        await asyncio.sleep(1)
+        return RecognizerResult(intents={"Help": IntentScore(1.0)}, entities={})
+
+
+class StaticRecognizer:
+    async def recognize(self, turn_context):
+        return RecognizerResult(
+            intents={"ShowReminders": IntentScore(1.0)}, entities={}
+        )
+
+
+class TestFallbackRecognizer(aiounittest.AsyncTestCase):
+    async def test_falls_back_when_over_latency_budget(self):
+        recognizer = FallbackRecognizer(SlowRecognizer(), StaticRecognizer(), 0.01)
+        result = await recognizer.recognize(None)
+
+        assert LuisRecognizer.top_intent(result) == "ShowReminders"
+
+    async def test_open_circuit_skips_recognizer(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        recognizer = FallbackRecognizer(
+            SlowRecognizer(), StaticRecognizer(), 0.01, circuit_breaker=breaker
+        )
+        luis_calls = recognizer.latency.count
+        fallback_calls = recognizer.fallback_latency.count
+        await recognizer.recognize(None)
+        await recognizer.recognize(None)
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert recognizer.latency.count == luis_calls + 1
+        assert recognizer.fallback_latency.count == fallback_calls + 2
+        assert recognizer.fallbacks == 2
+        metrics = METRICS.to_dict()
+        assert metrics["recognizer.luis_latency"]["count"] == luis_calls + 1
+        assert metrics["recognizer.fallback_latency"]["count"] == fallback_calls + 2
+
+    async def test_slow_calls_count_as_failures(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        recognizer = FallbackRecognizer(
+            StaticRecognizer(), circuit_breaker=breaker, slow_call_threshold=0
+        )
+        result = await recognizer.recognize(None)
+
+        assert LuisRecognizer.top_intent(result) == "ShowReminders"
+        assert breaker.state == CircuitBreaker.OPEN
+        with self.assertRaises(RecognizerUnavailableError):
+            await recognizer.recognize(None)
@@ -1,6 +1,159 @@
-import pytest
+from datetime import datetime, timedelta
 
+import aiounittest
+import pytz
+from botbuilder.core import ConversationState, MemoryStorage, UserState
+from botbuilder.core.adapters import TestAdapter
+from bots import ReminderBot
+from data_models import Reminder
+from dialogs import RemindersDialog
+from helpers import Messages
+from storage import ConversationRegistry, ReminderArchive
 
-class TestReminderBot:
-    def test_reminder_bot(self):
-        assert True
+
+class CountingStorage(MemoryStorage):
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    async def write(self, changes):
+        self.writes.append(sorted(changes))
+        await super().write(changes)
+
+
+def make_bot(storage, page_size=10, registry=None, archive=None):
+    user_state = UserState(storage)
+    conversation_state = ConversationState(storage)
+    accessor = user_state.create_property("RemindersState")
+    dialog = RemindersDialog(
+        user_state, conversation_state, accessor, archive=archive, page_size=page_size
+    )
+    if registry is None:
+        registry = ConversationRegistry(MemoryStorage())
+    return ReminderBot(conversation_state, user_state, dialog, registry, accessor)
+
+
+class TestReminderBot(aiounittest.AsyncTestCase):
+    async def test_state_writes_are_coalesced_and_skipped_when_unchanged(self):
+        storage = CountingStorage()
+        adapter = TestAdapter(make_bot(storage).on_turn)
+
+        await adapter.send("show reminders")
+        assert len(storage.writes) == 1
+        assert len(storage.writes[0]) == 2
+
+        await adapter.send("show reminders")
+        await adapter.send("help")
+        assert len(storage.writes) == 1
+
+    async def test_completed_reminders_are_archived_in_the_turn(self):
+        storage = MemoryStorage()
+        archive = ReminderArchive(storage, max_reminders=2)
+        adapter = TestAdapter(make_bot(storage, archive=archive).on_turn)
+        for title in ("first", "second", "third"):
+            await adapter.send(f"remind me to {title} in 10 minutes")
+        # Bot state is written without an e_tag, as BotState writes it.
+        document = (await storage.read(["Channels.test/users/User1"]))[
+            "Channels.test/users/User1"
+        ]
+        reminder_log = document["RemindersState"]
+        while reminder_log.new_reminders:
+            reminder = reminder_log.pop()
+            reminder.done = True
+            reminder_log.old_reminders.append(reminder)
+        await storage.write({"Channels.test/users/User1": document})
+
+        await adapter.send("show reminders")
+
+        document = (await storage.read(["Channels.test/users/User1"]))[
+            "Channels.test/users/User1"
+        ]
+        assert "e_tag" not in document
+        assert len(document["RemindersState"].old_reminders) == 2
+        assert [r.title for r in await archive.load("Channels.test/users/User1")] == [
+            "First"
+        ]
+
+    async def test_prompted_times_are_resolved_in_the_users_timezone(self):
+        # The default user timezone, Africa/Nairobi, is ahead of a UTC server.
+        adapter = TestAdapter(make_bot(MemoryStorage()).on_turn)
+
+        await adapter.send("remind me to call mom")
+        assert adapter.activity_buffer[-1].text == Messages.get_time
+        await adapter.send("in 10 minutes")
+
+        assert Messages.done in [activity.text for activity in adapter.activity_buffer]
+        shown = adapter.activity_buffer[-1].attachments[0].content["body"][1]["text"]
+        expected = datetime.now(pytz.timezone("Africa/Nairobi")) + timedelta(minutes=10)
+        assert shown[:13] == expected.strftime("%Y-%m-%d %I")
+
+    async def test_reminders_are_shown_one_page_per_activity(self):
+        storage = MemoryStorage()
+        adapter = TestAdapter(make_bot(storage, page_size=3).on_turn)
+        for title in ("one", "two", "three", "four"):
+            await adapter.send(f"remind me to {title} in 10 minutes")
+        adapter.activity_buffer.clear()
+
+        await adapter.send("show reminders")
+        [first_page] = adapter.activity_buffer
+        assert len(first_page.attachments) == 3
+        assert first_page.attachment_layout == "carousel"
+
+        await adapter.send("SHOW PAGE 1")
+        last_page = adapter.activity_buffer[-1]
+        assert len(last_page.attachments) == 3
+        assert "Page 2 of 2" in str(last_page.attachments[-1].content)
+
+    async def test_pages_fit_the_channel_carousel_limit(self):
+        adapter = TestAdapter(make_bot(MemoryStorage()).on_turn)
+        for index in range(11):
+            await adapter.send(f"remind me to call {index} in 10 minutes")
+        adapter.activity_buffer.clear()
+
+        await adapter.send("show reminders")
+
+        [first_page] = adapter.activity_buffer
+        assert len(first_page.attachments) == 10
+
+    async def test_conversation_reference_is_written_only_when_changed(self):
+        registry_storage = CountingStorage()
+        registry = ConversationRegistry(registry_storage)
+        adapter = TestAdapter(make_bot(MemoryStorage(), registry=registry).on_turn)
+
+        await adapter.send("help")
+        await adapter.send("show reminders")
+
+        assert registry.writes == 1
+        assert len(registry_storage.writes) == 1
+        assert (await registry.get("User1")).conversation.id == "Convo1"
+
+    async def test_reminders_are_shown_in_the_users_timezone(self):
+        adapter = TestAdapter(make_bot(MemoryStorage()).on_turn)
+
+        await adapter.send("set timezone America/New_York")
+        assert adapter.activity_buffer[-1].text == Messages.timezone_set.format(
+            timezone="America/New_York"
+        )
+        await adapter.send("remind me to call mom in 10 minutes")
+        adapter.activity_buffer.clear()
+        await adapter.send("show reminders")
+
+        [activity] = adapter.activity_buffer
+        shown = activity.attachments[0].content["body"][1]["text"]
+        expected = datetime.now(pytz.timezone("America/New_York")) + timedelta(
+            minutes=10
+        )
+        assert shown[:10] == expected.strftime("%Y-%m-%d")
+        assert shown[11:13] == expected.strftime("%I")
+
+    async def test_clock_times_are_resolved_in_the_users_timezone(self):
+        adapter = TestAdapter(make_bot(MemoryStorage()).on_turn)
+
+        await adapter.send("set timezone America/New_York")
+        await adapter.send("remind me to call mom at 9pm")
+        adapter.activity_buffer.clear()
+        await adapter.send("show reminders")
+
+        [activity] = adapter.activity_buffer
+        shown = activity.attachments[0].content["body"][1]["text"]
+        assert shown[11:] == "09:00 PM"
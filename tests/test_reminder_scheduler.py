@@ -0,0 +1,331 @@
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import aiounittest
+from botbuilder.core import MemoryStorage
+from benchmarks.scheduler_simulation import SchedulerSimulation
+from clock import VirtualClock
+from data_models import Reminder, ReminderLog
+from scheduler import LeaseManager, ReminderIndex, ReminderScheduler
+from storage import ConversationRegistry, SqliteStorage
+
+INSTANCES = ["node-1", "node-2", "node-3"]
+
+
+def make_reminder(due_time):
+    reminder = Reminder("Test")
+    reminder.reminder_time = due_time
+    return reminder
+
+
+class TestReminderIndex(aiounittest.AsyncTestCase):
+    def test_pop_due_returns_only_due_reminders_in_order(self):
+        index = ReminderIndex()
+        now = datetime.now()
+        index.add("late", "user-1", now + timedelta(minutes=2))
+        index.add("early", "user-2", now - timedelta(minutes=1))
+        index.add("now", "user-1", now)
+
+        assert index.pop_due(now.timestamp()) == [
+            ("user-2", "early"),
+            ("user-1", "now"),
+        ]
+        assert len(index) == 1
+        assert index.next_due() == int((now + timedelta(minutes=2)).timestamp())
+
+    async def test_persists_and_reloads_from_storage(self):
+        storage = MemoryStorage()
+        index = ReminderIndex()
+        now = datetime.now()
+        index.add("a", "user-1", now, "test/users/user-1")
+        index.add("b", "user-1", now + timedelta(days=3))
+        await index.save(storage)
+        index.remove("b")
+        await index.save(storage)
+
+        reloaded = ReminderIndex()
+        await reloaded.load(storage)
+        assert "a" in reloaded and "b" not in reloaded
+        assert reloaded.users == {"user-1": "test/users/user-1"}
+        # The root, the day of "a" and the user shard of user-1.
+        assert len(storage.memory) == 3
+
+    async def test_save_writes_only_the_changed_documents(self):
+        storage = MemoryStorage()
+        index = ReminderIndex()
+        now = datetime(2030, 1, 1, 10)
+        for user in range(100):
+            index.add(f"r{user}", f"user-{user}", now, f"test/users/user-{user}")
+        await index.save(storage)
+        writes = []
+        write = storage.write
+
+        async def recording_write(changes):
+            writes.append(sorted(changes))
+            await write(changes)
+
+        storage.write = recording_write
+        index.add("next", "user-1", now + timedelta(minutes=1))
+        await index.save(storage)
+
+        assert writes == [[f"ReminderIndex-hour-{int(now.timestamp()) // 3600}"]]
+
+    async def test_rebuild_from_user_state(self):
+        storage = MemoryStorage()
+        reminder_log = ReminderLog()
+        reminder_log.new_reminders.append(make_reminder(datetime.now()))
+        await storage.write({"test/users/user-1": {"RemindersState": reminder_log}})
+
+        index = ReminderIndex()
+        index.add("stale", "user-1", datetime.now(), "test/users/user-1")
+        await index.rebuild(storage, "RemindersState")
+
+        assert "stale" not in index
+        assert reminder_log.new_reminders[0].id in index
+
+
+class TestReminderScheduler(aiounittest.AsyncTestCase):
+    async def test_wakes_up_when_reminder_is_due(self):
+        fired = []
+
+        async def callback(due):
+            fired.extend(due)
+
+        scheduler = ReminderScheduler(callback)
+        await scheduler.start()
+        later = make_reminder(datetime.now() + timedelta(minutes=10))
+        soon = make_reminder(datetime.now() + timedelta(milliseconds=50))
+        await scheduler.schedule(later, "user-1")
+        await scheduler.schedule(soon, "user-2")
+        await asyncio.sleep(1.2)
+        await scheduler.stop()
+
+        assert fired == [("user-2", soon.id)]
+
+    async def test_runs_on_a_virtual_clock(self):
+        fired = []
+
+        async def callback(due):
+            fired.extend(due)
+
+        async def settle():
+            for _ in range(10):
+                await asyncio.sleep(0)
+
+        clock = VirtualClock(datetime(2020, 1, 1).timestamp())
+        scheduler = ReminderScheduler(callback, clock=clock)
+        await scheduler.start()
+        reminder = make_reminder(clock.now() + timedelta(days=7))
+        await scheduler.schedule(reminder, "user-1")
+        await settle()
+
+        clock.advance(timedelta(days=7).total_seconds() - 1)
+        await settle()
+        assert fired == []
+        clock.advance(1)
+        await settle()
+        await scheduler.stop()
+
+        assert fired == [("user-1", reminder.id)]
+
+
+class TestSchedulerSimulation(aiounittest.AsyncTestCase):
+    async def test_every_reminder_is_dispatched_once_despite_failures(self):
+        report = await SchedulerSimulation(
+            5000, users=100, days=2, failure_rate=0.05
+        ).run()
+
+        assert report.retries > 0
+        assert report.delivered == 5000
+        assert report.duplicates == 0
+        assert report.missed == 0
+        assert report.lags[0] > 0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_leases(storage, clock, instances=INSTANCES, shard_count=16):
+    return [
+        LeaseManager(
+            storage,
+            ConversationRegistry(storage, instance, instances, shard_count),
+            lease_duration=30,
+            clock=clock,
+        )
+        for instance in instances
+    ]
+
+
+def assert_exclusive(leases, shard_count=16):
+    owners = [
+        [manager.instance_id for manager in leases if manager.owns(shard)]
+        for shard in range(shard_count)
+    ]
+    assert all(len(owner) <= 1 for owner in owners), owners
+    return owners
+
+
+class TestLeaseManager(aiounittest.AsyncTestCase):
+    async def test_instances_acquire_their_preferred_partitions(self):
+        clock = FakeClock()
+        leases = make_leases(MemoryStorage(), clock)
+        for manager in leases:
+            await manager.renew()
+
+        owners = assert_exclusive(leases)
+
+        assert all(owners)
+        for manager in leases:
+            assert all(
+                manager.registry.ring.instance_for(shard) == manager.instance_id
+                for shard in manager.owned
+            )
+
+    async def test_expired_leases_are_taken_over_and_handed_back(self):
+        clock = FakeClock()
+        first, *others = leases = make_leases(MemoryStorage(), clock)
+        for manager in leases:
+            await manager.renew()
+        preferred = set(first.owned)
+
+        for step in (20, 11):
+            clock.now += step
+            for manager in others:
+                await manager.renew()
+        assert not first.owns(next(iter(preferred)))
+        assert all(assert_exclusive(leases))
+        assert sum(manager.takeovers for manager in others) == len(preferred)
+
+        for _ in range(2):
+            for manager in leases:
+                await manager.renew()
+                assert_exclusive(leases)
+        assert first.owned == preferred
+
+    async def test_handed_back_leases_are_taken_if_the_requester_dies(self):
+        clock = FakeClock()
+        first, *others = leases = make_leases(MemoryStorage(), clock)
+        for manager in others:
+            await manager.renew()
+        clock.now += 31
+        for manager in others:
+            await manager.renew()
+        assert all(assert_exclusive(others))
+
+        # The preferred instance asks for its shards back, then dies.
+        await first.renew()
+        for manager in others:
+            await manager.renew()
+        requested = {
+            shard
+            for shard in range(16)
+            if not any(manager.owns(shard) for manager in others)
+        }
+        assert requested
+
+        clock.now += 31
+        for manager in others:
+            await manager.renew()
+        assert all(assert_exclusive(others))
+
+    async def test_reminders_are_posted_to_the_partition_owner(self):
+        storage = MemoryStorage()
+        clock = FakeClock()
+        leases = make_leases(storage, clock, instances=["node-1", "node-2"])
+        for manager in leases:
+            await manager.renew()
+        user_id = next(
+            f"user-{index}"
+            for index in range(100)
+            if leases[1].owns_user(f"user-{index}")
+        )
+        schedulers = [
+            ReminderScheduler(None, storage, leases=manager) for manager in leases
+        ]
+        reminder = make_reminder(datetime.now() + timedelta(minutes=5))
+
+        await schedulers[0].schedule(reminder, user_id, f"test/users/{user_id}")
+        assert reminder.id not in schedulers[0].index
+
+        await schedulers[1].on_leases_changed(set(), set())
+        assert reminder.id in schedulers[1].index
+        assert schedulers[1].index.users[user_id] == f"test/users/{user_id}"
+
+
+def run_lease_worker(path, instance, run_for, results):
+    async def work():
+        storage = SqliteStorage(path)
+        registry = ConversationRegistry(storage, instance, INSTANCES, 16)
+        manager = LeaseManager(storage, registry, lease_duration=0.6)
+        rounds = []
+        deadline = time.time() + run_for
+        while time.time() < deadline:
+            started = time.time()
+            await manager.renew()
+            rounds.append((started, time.time(), dict(manager._expires)))
+            await asyncio.sleep(0.05)
+        rounds.append((time.time(), None, {}))
+        storage.close()
+        return rounds
+
+    results.put((instance, asyncio.new_event_loop().run_until_complete(work())))
+
+
+class TestLeaseManagerProcesses:
+    def test_processes_never_own_a_partition_at_the_same_time(self):
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "leases.db")
+            SqliteStorage(path).close()
+            # node-3 stops renewing without releasing, as if it had crashed.
+            processes = [
+                context.Process(
+                    target=run_lease_worker,
+                    args=(
+                        path,
+                        instance,
+                        1.0 if instance == "node-3" else 3.0,
+                        results,
+                    ),
+                )
+                for instance in INSTANCES
+            ]
+            for process in processes:
+                process.start()
+            rounds = dict(results.get(timeout=60) for _ in processes)
+            for process in processes:
+                process.join()
+
+        # A process may act on a shard from the end of the round that granted it
+        # until the next round starts or its lease expires locally.
+        intervals = {}
+        for instance, instance_rounds in rounds.items():
+            for (_, ended, expires), (next_started, _, _) in zip(
+                instance_rounds, instance_rounds[1:]
+            ):
+                for shard, expiry in expires.items():
+                    intervals.setdefault(shard, []).append(
+                        (ended, min(next_started, expiry), instance)
+                    )
+        for shard_intervals in intervals.values():
+            shard_intervals.sort()
+            for (_, end, owner), (start, _, other) in zip(
+                shard_intervals, shard_intervals[1:]
+            ):
+                assert owner == other or end <= start
+
+        final = set()
+        for instance in ("node-1", "node-2"):
+            final.update(rounds[instance][-2][2])
+        assert final == set(range(16))
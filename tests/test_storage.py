@@ -0,0 +1,370 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import aiounittest
+import pytz
+from botbuilder.core import MemoryStorage
+from botbuilder.schema import (
+    ChannelAccount,
+    ConversationAccount,
+    ConversationReference,
+)
+from clock import VirtualClock
+from data_models import Reminder, ReminderLog
+from storage import (
+    ConversationRegistry,
+    DispatchJournal,
+    HashRing,
+    LatencyStorage,
+    ReminderArchive,
+    SqliteStorage,
+    StorageConflictError,
+    WriteBehindStorage,
+    compare_and_swap,
+)
+
+
+class TestWriteBehindStorage(aiounittest.AsyncTestCase):
+    async def test_writes_are_coalesced_until_flush(self):
+        backend = LatencyStorage(read_latency=0.001, write_latency=0.001)
+        storage = WriteBehindStorage(backend, max_batch_size=10)
+
+        for count in range(5):
+            await storage.write({"a": {"count": count}, "b": {"count": count}})
+        assert backend.writes == 0
+        assert (await storage.read(["a"]))["a"]["count"] == 4
+
+        await storage.flush()
+        assert backend.writes == 1
+        assert backend.keys_written == 2
+        assert (await backend.read(["b"]))["b"]["count"] == 4
+
+    async def test_flushes_when_batch_is_full(self):
+        backend = LatencyStorage()
+        storage = WriteBehindStorage(backend, max_batch_size=3)
+        for key in "abc":
+            await storage.write({key: {"value": key}})
+
+        assert backend.writes == 1
+        assert backend.keys_written == 3
+
+    async def test_reads_are_served_from_cache(self):
+        backend = LatencyStorage()
+        await backend.write({"a": {"value": 1}, "b": {"value": 2}})
+        storage = WriteBehindStorage(backend, cache_size=1)
+
+        await storage.read(["a"])
+        await storage.read(["a"])
+        assert backend.reads == 1
+
+        await storage.read(["b"])
+        await storage.read(["a"])
+        assert backend.reads == 3
+
+    async def test_conflicts_are_surfaced(self):
+        memory = MemoryStorage()
+        await memory.write({"a": {"value": 1, "e_tag": "*"}})
+        await memory.write({"a": {"value": 2, "e_tag": "*"}})
+        storage = WriteBehindStorage(memory)
+        await storage.write({"a": {"value": 3, "e_tag": "0"}, "b": {"value": 1}})
+
+        with self.assertRaises(StorageConflictError) as context:
+            await storage.flush()
+
+        assert list(context.exception.conflicts) == ["a"]
+        assert "a" in storage.conflicts
+        assert (await memory.read(["b"]))["b"]["value"] == 1
+        assert (await memory.read(["a"]))["a"]["value"] == 2
+
+    async def test_stop_flushes_pending_writes(self):
+        backend = LatencyStorage()
+        storage = WriteBehindStorage(backend, flush_interval=60)
+        storage.start()
+        await storage.write({"a": {"value": 1}})
+        await storage.stop()
+
+        assert (await backend.read(["a"]))["a"]["value"] == 1
+
+
+class TestSqliteStorage(aiounittest.AsyncTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage = SqliteStorage(os.path.join(self.directory.name, "bot.db"))
+
+    def tearDown(self):
+        self.storage.close()
+        self.directory.cleanup()
+
+    async def test_round_trips_state_documents(self):
+        reminder = Reminder("Call Mom")
+        reminder.reminder_time = datetime.now(pytz.utc).replace(microsecond=0)
+        reminder_log = ReminderLog()
+        reminder_log.add(reminder)
+        await self.storage.write(
+            {"test/users/1": {"RemindersState": reminder_log}, "other": {"a": 1}}
+        )
+
+        items = await self.storage.read(["test/users/1", "other", "missing"])
+
+        assert sorted(items) == ["other", "test/users/1"]
+        restored = items["test/users/1"]["RemindersState"].peek()
+        assert (restored.id, restored.title) == (reminder.id, "Call Mom")
+        assert restored.reminder_time == reminder.reminder_time
+
+    async def test_e_tag_conflicts(self):
+        await self.storage.write({"lease": {"owner": "a", "e_tag": "*"}})
+        lease = (await self.storage.read(["lease"]))["lease"]
+        stale = dict(lease)
+
+        lease["owner"] = "b"
+        await self.storage.write({"lease": lease})
+        with self.assertRaises(KeyError):
+            await self.storage.write({"lease": stale})
+
+        assert (await self.storage.read(["lease"]))["lease"]["owner"] == "b"
+
+
+class TestReminderArchive(aiounittest.AsyncTestCase):
+    def make_log(self, ages_in_days):
+        now = datetime.now(pytz.utc)
+        reminder_log = ReminderLog()
+        for days in ages_in_days:
+            reminder = Reminder(str(days), done=True)
+            reminder.reminder_time = now - timedelta(days=days)
+            reminder_log.old_reminders.append(reminder)
+        return reminder_log
+
+    def test_compact_applies_count_and_age_limits(self):
+        archive = ReminderArchive(MemoryStorage(), 2, timedelta(days=30))
+        reminder_log = self.make_log([40, 5, 4, 3])
+
+        evicted = archive.compact(reminder_log)
+
+        assert [reminder.title for reminder in evicted] == ["40", "5"]
+        assert [reminder.title for reminder in reminder_log.old_reminders] == [
+            "4",
+            "3",
+        ]
+
+    async def test_compact_turn_moves_reminders_to_cold_document(self):
+        reminder_log = self.make_log([3, 2, 1])
+        archived_id = reminder_log.old_reminders[0].id
+        archive = ReminderArchive(MemoryStorage(), max_reminders=2)
+
+        await archive.compact_turn("test/users/1", reminder_log)
+        await archive.compact_turn("test/users/1", reminder_log)
+
+        assert len(reminder_log.old_reminders) == 2
+        assert (await archive.find("test/users/1", archived_id)).title == "3"
+        assert len(await archive.load("test/users/1")) == 1
+
+
+def make_reference(user_id, conversation_id="conversation", activity_id="1"):
+    return ConversationReference(
+        activity_id=activity_id,
+        user=ChannelAccount(id=user_id),
+        bot=ChannelAccount(id="bot"),
+        conversation=ConversationAccount(id=conversation_id),
+        channel_id="test",
+        service_url="https://test.com",
+    )
+
+
+class HttpError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class CosmosLikeStorage(MemoryStorage):
+    """
+    Upserts on e_tag "*", otherwise replaces if-match, failing with 404 for a
+    missing document and 412 for a stale e_tag, as CosmosDbStorage does.
+    """
+
+    async def write(self, changes):
+        for key, change in changes.items():
+            e_tag = change.get("e_tag")
+            if e_tag not in (None, "*"):
+                if key not in self.memory:
+                    raise HttpError(404)
+                if self.memory[key]["e_tag"] != e_tag:
+                    raise HttpError(412)
+            self._e_tag += 1
+            self.memory[key] = dict(change, e_tag=str(self._e_tag))
+
+
+class TestCompareAndSwap(aiounittest.AsyncTestCase):
+    async def test_conflicts_of_every_backend_raise_one_error(self):
+        for storage in (MemoryStorage(), CosmosLikeStorage()):
+            await compare_and_swap(storage, "doc", {"value": 1})
+            stale = dict((await storage.read(["doc"]))["doc"])
+            await compare_and_swap(storage, "doc", dict(stale, value=2))
+
+            with self.assertRaises(StorageConflictError):
+                await compare_and_swap(storage, "doc", dict(stale, value=3))
+            with self.assertRaises(StorageConflictError):
+                await compare_and_swap(storage, "doc", {"value": 4})
+            assert (await storage.read(["doc"]))["doc"]["value"] == 2
+
+    async def test_only_the_first_of_two_creates_succeeds(self):
+        for storage in (MemoryStorage(), CosmosLikeStorage()):
+            await compare_and_swap(storage, "doc", {"value": 1})
+
+            with self.assertRaises(StorageConflictError):
+                await compare_and_swap(storage, "doc", {"value": 2})
+            assert (await storage.read(["doc"]))["doc"]["value"] == 1
+
+    async def test_registry_writes_new_shards_on_cosmos(self):
+        storage = CosmosLikeStorage()
+        registry = ConversationRegistry(storage, shard_count=1)
+
+        assert await registry.add(make_reference("a"))
+        assert await registry.add(make_reference("b"))
+        assert (
+            len(await ConversationRegistry(storage, shard_count=1).get_many(["a", "b"]))
+            == 2
+        )
+
+
+class TestConversationRegistry(aiounittest.AsyncTestCase):
+    async def test_references_survive_restart_and_are_written_on_change(self):
+        storage = LatencyStorage()
+        registry = ConversationRegistry(storage, shard_count=4)
+
+        assert await registry.add(make_reference("a"))
+        assert not await registry.add(make_reference("a", activity_id="2"))
+        assert await registry.add(make_reference("a", conversation_id="other"))
+        assert registry.writes == 2
+
+        restarted = ConversationRegistry(storage, shard_count=4)
+        reference = await restarted.get("a")
+        assert reference.conversation.id == "other"
+        assert reference.activity_id is None
+        assert await restarted.get("missing") is None
+
+    async def test_instances_own_disjoint_users(self):
+        storage = MemoryStorage()
+        instances = ["node-1", "node-2", "node-3"]
+        registries = [
+            ConversationRegistry(storage, instance, instances, shard_count=16)
+            for instance in instances
+        ]
+        user_ids = [f"user-{index}" for index in range(60)]
+        for user_id in user_ids:
+            await registries[0].add(make_reference(user_id))
+
+        owned = [
+            sorted(reference.user.id for reference in await registry.owned_references())
+            for registry in registries
+        ]
+
+        assert sorted(sum(owned, [])) == sorted(user_ids)
+        assert all(owned)
+        for registry, users in zip(registries, owned):
+            assert [
+                reference.user.id for reference in await registry.get_many(user_ids)
+            ] == [user_id for user_id in user_ids if user_id in users]
+
+    async def test_concurrent_writers_do_not_lose_references(self):
+        storage = MemoryStorage()
+        first = ConversationRegistry(storage, shard_count=1)
+        second = ConversationRegistry(storage, shard_count=1)
+        await first.add(make_reference("a"))
+        await second.add(make_reference("b"))
+        await first.add(make_reference("c"))
+
+        restarted = ConversationRegistry(storage, shard_count=1)
+        assert len(await restarted.get_many(["a", "b", "c"])) == 3
+
+    def test_hash_ring_moves_few_shards_when_an_instance_joins(self):
+        before = HashRing(["node-1", "node-2", "node-3"])
+        after = HashRing(["node-1", "node-2", "node-3", "node-4"])
+
+        moved = [
+            shard
+            for shard in range(256)
+            if before.instance_for(shard) != after.instance_for(shard)
+        ]
+
+        assert all(after.instance_for(shard) == "node-4" for shard in moved)
+        assert len(moved) < 128
+
+
+class TestDispatchJournal(aiounittest.AsyncTestCase):
+    async def test_entries_are_bounded_and_track_attempts(self):
+        journal = DispatchJournal(MemoryStorage(), max_entries=2)
+        reminders = [Reminder(str(index)) for index in range(3)]
+        for reminder in reminders:
+            reminder.reminder_time = datetime.now(pytz.utc)
+        entries = {}
+        journal.record(entries, reminders[0], journal.FAILED)
+        journal.record(entries, reminders[0], journal.SENT)
+        journal.record(entries, reminders[1], journal.SENT)
+        journal.record(entries, reminders[2], journal.FAILED)
+
+        await journal.save("test/users/1", entries)
+        entries = await journal.load("test/users/1")
+
+        assert list(entries) == [
+            journal.idempotency_key(reminder) for reminder in reminders[1:]
+        ]
+        assert journal.is_sent(entries, reminders[1])
+        assert not journal.is_sent(entries, reminders[2])
+
+    async def test_reconcile_marks_sent_reminders_done(self):
+        memory = MemoryStorage()
+        journal = DispatchJournal(memory)
+        reminder_log = ReminderLog()
+        sent, pending = Reminder("sent"), Reminder("pending")
+        for reminder in (sent, pending):
+            reminder.reminder_time = datetime.now(pytz.utc)
+            reminder_log.add(reminder)
+        await memory.write({"test/users/1": {"RemindersState": reminder_log}})
+        entries = {}
+        journal.record(entries, sent, journal.SENT)
+        journal.record(entries, pending, journal.FAILED)
+        await journal.save("test/users/1", entries)
+
+        assert await journal.reconcile(["test/users/1"], "RemindersState") == 1
+
+        stored = (await memory.read(["test/users/1"]))["test/users/1"]
+        reconciled_log = stored["RemindersState"]
+        assert [reminder.title for reminder in reconciled_log.new_reminders] == [
+            "pending"
+        ]
+        assert reconciled_log.old_reminders[0].done
+        assert await journal.reconcile(["test/users/1"], "RemindersState") == 0
+
+    async def test_journal_runs_on_the_injected_clock(self):
+        journal = DispatchJournal(MemoryStorage(), clock=VirtualClock(1_000_000))
+        reminder = Reminder("sent")
+        reminder.reminder_time = datetime.now(pytz.utc)
+        entries = {}
+        journal.record(entries, reminder, journal.SENT)
+
+        assert entries[journal.idempotency_key(reminder)] == [
+            1,
+            journal.SENT,
+            1_000_000,
+        ]
+
+    async def test_reconcile_does_not_mutate_the_read_document(self):
+        journal = DispatchJournal(MemoryStorage())
+        reminder_log = ReminderLog()
+        reminder = Reminder("sent")
+        reminder.reminder_time = datetime.now(pytz.utc)
+        reminder_log.add(reminder)
+        document = {"RemindersState": reminder_log}
+        entries = {}
+        journal.record(entries, reminder, journal.SENT)
+
+        assert (
+            await journal._reconcile_document(
+                "test/users/1", document, entries, "RemindersState"
+            )
+            == 1
+        )
+        assert reminder_log.new_reminders == [reminder]
+        assert not reminder.done